@@ -4,12 +4,21 @@ Features: Calendar filter, AI insights, improved metrics
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
 import os
 
+from core.data_loader import previous_version
+from core.downsampling import downsample
+from core.figure_cache import cached_figure
+from core.filter_state import FILTER_FIELDS, filtered_view, selected_version, shared_date_input, shared_selectbox
+from core.page_data import (
+    export_button, export_format_selector, get_cube, get_filter_engine, get_version_diff, render_chart
+)
+from core.startup import begin_page, end_page, lazy_import
+
+# Plotly loads on the first chart that is not already cached
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+
 # Page configuration
 st.set_page_config(
     page_title="UIDAI Dashboard - Home",
@@ -17,6 +26,10 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+page_run = begin_page("Home")
+
+# The detail table shows the latest rows only; downloads carry the full filtered set
+DETAIL_ROWS = 500
 
 # Custom CSS for enhanced styling
 st.markdown("""
@@ -54,24 +67,6 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Load data function
-@st.cache_data
-def load_data():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    paths = [
-        os.path.join(current_dir, "data", "processed_data.csv"),
-        os.path.join(current_dir, "..", "data", "processed_data.csv"),
-        "data/processed_data.csv"
-    ]
-    
-    for path in paths:
-        if os.path.exists(path):
-            df = pd.read_csv(path)
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'])
-            return df
-    return None
-
 # Logo
 current_dir = os.path.dirname(os.path.abspath(__file__))
 logo_path = os.path.join(current_dir, "assets", "uidai_logo.png")
@@ -86,9 +81,11 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load data
-df = load_data()
+version = selected_version()
+# Rollup cube: every KPI and chart below is answered from its pre-aggregated cells
+cube = get_cube(version) if version else None
 
-if df is None:
+if cube is None:
     st.error("🚨 Data file not found! Please run the data processor first.")
     st.stop()
 
@@ -97,83 +94,77 @@ st.sidebar.title("🔍 Filters & Controls")
 
 # Date Range Filter (Calendar)
 st.sidebar.subheader("📅 Select Date Range")
-if 'Date' in df.columns:
-    min_date = df['Date'].min().date()
-    max_date = df['Date'].max().date()
-    
-    # Handle single-day data case gracefully
-    if min_date == max_date:
-        st.sidebar.warning(f"⚠️ Data contains only one date: {min_date}")
-        start_date = min_date
-        end_date = max_date
-    else:
-        col1, col2 = st.sidebar.columns(2)
-        with col1:
-            start_date = st.date_input(
-                "From",
-                value=min_date,
-                min_value=min_date,
-                max_value=max_date
-            )
-        with col2:
-            end_date = st.date_input(
-                "To",
-                value=max_date,
-                min_value=min_date,
-                max_value=max_date
-            )
-    
-    # Filter data by date range
-    df = df[(df['Date'].dt.date >= start_date) & (df['Date'].dt.date <= end_date)]
-    
-    if min_date != max_date:
-        st.sidebar.info(f"📊 Showing data from {start_date} to {end_date}")
+min_date = cube.cells['Date'].min().date()
+max_date = cube.cells['Date'].max().date()
+
+# Handle single-day data case gracefully
+if min_date == max_date:
+    st.sidebar.warning(f"⚠️ Data contains only one date: {min_date}")
+    start_date = min_date
+    end_date = max_date
+else:
+    col1, col2 = st.sidebar.columns(2)
+    start_date = shared_date_input(col1, "From", 'start', min_date, min_date, max_date, key="home_start_date")
+    end_date = shared_date_input(col2, "To", 'end', max_date, min_date, max_date, key="home_end_date")
+
+# Filter cube cells by date range
+view = cube.slice(start=start_date, end=end_date)
+
+if min_date != max_date:
+    st.sidebar.info(f"📊 Showing data from {start_date} to {end_date}")
 
 # State Filter
-if 'State' in df.columns:
-    state_options = ["All India"] + sorted(df['State'].unique().tolist())
-    selected_state = st.sidebar.selectbox("🗺️ Select State", state_options)
-    
-    if selected_state != "All India":
-        df = df[df['State'] == selected_state]
+state_options = ["All India"] + view.values('State')
+selected_state = shared_selectbox(st.sidebar, "🗺️ Select State", state_options, 'State', "All India", key="home_state")
+
+if selected_state != "All India":
+    view = view.slice(state=selected_state)
 
 # Risk Level Filter
-if 'Risk_Level' in df.columns:
-    risk_options = ["All Levels"] + sorted(df['Risk_Level'].unique().tolist())
-    selected_risk = st.sidebar.selectbox("⚠️ Risk Level", risk_options)
-    
-    if selected_risk != "All Levels":
-        df = df[df['Risk_Level'] == selected_risk]
+risk_options = ["All Levels"] + view.values('Risk_Level')
+selected_risk = shared_selectbox(st.sidebar, "⚠️ Risk Level", risk_options, 'Risk_Level', "All Levels", key="home_risk")
+
+if selected_risk != "All Levels":
+    view = view.slice(risk=selected_risk)
 
 # Priority Filter
-if 'Priority' in df.columns:
-    priority_options = ["All Priorities"] + sorted(df['Priority'].unique().tolist())
-    selected_priority = st.sidebar.selectbox("🎯 Priority", priority_options)
-    
-    if selected_priority != "All Priorities":
-        df = df[df['Priority'] == selected_priority]
+priority_options = ["All Priorities"] + view.values('Priority')
+selected_priority = shared_selectbox(st.sidebar, "🎯 Priority", priority_options, 'Priority', "All Priorities", key="home_priority")
+
+if selected_priority != "All Priorities":
+    view = view.slice(priority=selected_priority)
+
+totals = view.totals()
+by_risk = view.by('Risk_Level').set_index('Risk_Level')['Records']
+high_risk_count = int(by_risk.get('High Risk', 0))
 
 st.sidebar.divider()
-st.sidebar.success(f"✅ {len(df)} records loaded")
+st.sidebar.success(f"✅ {totals['records']} records loaded")
 
 # Quick Stats in Sidebar
-if len(df) > 0:
+if totals['records'] > 0:
     st.sidebar.subheader("📈 Quick Stats")
-    st.sidebar.metric("States Covered", df['State'].nunique() if 'State' in df.columns else 0)
-    st.sidebar.metric("Districts", df['District'].nunique() if 'District' in df.columns else 0)
-    if 'Is_Anomaly' in df.columns:
-        anomaly_pct = (df['Is_Anomaly'].sum() / len(df) * 100)
-        st.sidebar.metric("Anomaly Rate", f"{anomaly_pct:.1f}%")
+    st.sidebar.metric("States Covered", totals['states'])
+    st.sidebar.metric("Districts", totals['districts'])
+    anomaly_pct = (totals['anomalies'] / totals['records'] * 100)
+    st.sidebar.metric("Anomaly Rate", f"{anomaly_pct:.1f}%")
+
+# Row-level data is only needed for downloads and the detail table, so it is built on demand
+def detail_view():
+    return filtered_view(get_filter_engine(version), version, FILTER_FIELDS)
+
+def detail_rows(column, value):
+    df = detail_view()
+    return df[df[column] == value]
 
 # ====================== MAIN DASHBOARD ======================
 
 # AI Executive Summary
 st.markdown("### 🤖 AI Executive Summary")
 
-if len(df) > 0:
-    total_districts = len(df)
-    high_risk_count = len(df[df['Risk_Level'] == 'High Risk']) if 'Risk_Level' in df.columns else 0
-    anomaly_count = df['Is_Anomaly'].sum() if 'Is_Anomaly' in df.columns else 0
+if totals['records'] > 0:
+    total_districts = totals['records']
+    anomaly_count = totals['anomalies']
     
     # Determine status
     if high_risk_count > total_districts * 0.2:
@@ -195,10 +186,10 @@ if len(df) > 0:
     - **{anomaly_count}** anomalies detected requiring immediate review
     """
     
-    if 'State' in df.columns and high_risk_count > 0:
-        top_risk_state = df[df['Risk_Level'] == 'High Risk']['State'].value_counts().head(1)
+    if high_risk_count > 0:
+        top_risk_state = view.slice(risk='High Risk').by('State').nlargest(1, 'Records')
         if not top_risk_state.empty:
-            summary += f"\n- 🎯 **Priority State**: {top_risk_state.index[0]} ({top_risk_state.values[0]} high-risk districts)"
+            summary += f"\n- 🎯 **Priority State**: {top_risk_state['State'].iloc[0]} ({top_risk_state['Records'].iloc[0]} high-risk districts)"
     
     if color == "error":
         st.error(summary)
@@ -207,43 +198,80 @@ if len(df) > 0:
     else:
         st.success(summary)
     
-    # Download buttons
+    # Download buttons (reports are only built when clicked)
     col_dl1, col_dl2, col_dl3 = st.columns([2, 1, 1])
+    export_filters = [start_date, end_date, selected_state, selected_risk, selected_priority]
+    
+    with col_dl1:
+        export_format = export_format_selector("home_export_format")
     
     with col_dl2:
-        if 'Risk_Level' in df.columns:
-            risk_report = df[df['Risk_Level'] == 'High Risk']
-            if len(risk_report) > 0:
-                csv = risk_report.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="📥 Download Risk Report",
-                    data=csv,
-                    file_name=f"high_risk_report_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv",
-                )
+        if high_risk_count > 0:
+            export_button(
+                "📥 Download Risk Report", "high_risk_report",
+                lambda: detail_rows('Risk_Level', 'High Risk'),
+                version, export_filters, export_format
+            )
     
     with col_dl3:
-        if 'Is_Anomaly' in df.columns:
-            anomaly_report = df[df['Is_Anomaly'] == True]
-            if len(anomaly_report) > 0:
-                csv = anomaly_report.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="📥 Download Anomalies",
-                    data=csv,
-                    file_name=f"anomalies_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv",
-                )
+        if anomaly_count > 0:
+            export_button(
+                "📥 Download Anomalies", "anomalies",
+                lambda: detail_rows('Is_Anomaly', True),
+                version, export_filters, export_format
+            )
 
 st.divider()
 
+# ====================== CHANGES SINCE LAST REFRESH ======================
+# District-by-district comparison with the version published before this one
+previous = previous_version(version)
+version_diff = get_version_diff(previous, version) if previous else None
+
+if version_diff is not None:
+    changes = version_diff.slice(state=None if selected_state == "All India" else selected_state)
+    counts = changes.counts()
+    changed_total = counts['new'] + counts['removed'] + counts['changed']
+    with st.expander(f"🔄 Changes since last refresh ({changed_total} districts)", expanded=False):
+        col_c1, col_c2, col_c3, col_c4 = st.columns(4)
+        col_c1.metric("New Districts", counts['new'])
+        col_c2.metric("Removed Districts", counts['removed'])
+        col_c3.metric("Changed Districts", counts['changed'])
+        col_c4.metric("Unchanged", counts['unchanged'])
+
+        col_t1, col_t2 = st.columns(2)
+        with col_t1:
+            st.markdown("#### ⚠️ Risk Tier Moves")
+            transitions = changes.transitions()
+            if transitions.empty:
+                st.info("No district changed risk tier")
+            else:
+                st.dataframe(transitions, use_container_width=True, hide_index=True)
+        with col_t2:
+            st.markdown("#### 📈 Largest Anomaly Score Changes")
+            movers = changes.top_movers('Anomaly_Score')
+            mover_cols = [col for col in ['State', 'District', 'Anomaly_Score_old', 'Anomaly_Score_new',
+                                          'Anomaly_Score_delta', 'Risk_Level_new'] if col in movers.columns]
+            st.dataframe(movers[mover_cols], use_container_width=True, hide_index=True)
+
+        if changed_total > 0:
+            col_f, col_b = st.columns([2, 1])
+            with col_f:
+                changes_format = export_format_selector("home_changes_format")
+            with col_b:
+                export_button("📥 Download Changes", "version_changes", changes.changes,
+                              f"{previous}..{version}", [selected_state], changes_format)
+
+    st.divider()
+
 # ====================== KEY METRICS ======================
 st.subheader("📊 Key Performance Indicators")
 
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_enrolments = df['Enrolments'].sum() if 'Enrolments' in df.columns else 0
-    avg_enrolments = df['Enrolments'].mean() if 'Enrolments' in df.columns else 0
+    total_enrolments = totals['enrolments']
+    avg_enrolments = totals['avg_enrolments']
     st.metric(
         "Total Enrolments",
         f"{total_enrolments:,}",
@@ -251,7 +279,7 @@ with col1:
     )
 
 with col2:
-    total_updates = df['Updates'].sum() if 'Updates' in df.columns else 0
+    total_updates = totals['updates']
     update_rate = (total_updates / total_enrolments * 100) if total_enrolments > 0 else 0
     st.metric(
         "Updates Processed",
@@ -260,20 +288,17 @@ with col2:
     )
 
 with col3:
-    if 'Risk_Level' in df.columns:
-        critical_alerts = len(df[df['Risk_Level'] == 'High Risk'])
-        st.metric(
-            "Critical Alerts",
-            critical_alerts,
-            delta="Needs Action" if critical_alerts > 0 else "All Clear",
-            delta_color="inverse" if critical_alerts > 0 else "normal"
-        )
-    else:
-        st.metric("Critical Alerts", "N/A")
+    critical_alerts = high_risk_count
+    st.metric(
+        "Critical Alerts",
+        critical_alerts,
+        delta="Needs Action" if critical_alerts > 0 else "All Clear",
+        delta_color="inverse" if critical_alerts > 0 else "normal"
+    )
 
 with col4:
-    if 'Confidence_Score' in df.columns:
-        avg_confidence = df['Confidence_Score'].mean()
+    if totals['avg_confidence'] is not None:
+        avg_confidence = totals['avg_confidence']
         st.metric(
             "Avg Confidence",
             f"{avg_confidence:.1f}%",
@@ -287,58 +312,70 @@ st.divider()
 # ====================== VISUALIZATIONS ======================
 st.subheader("📈 Trend Analysis")
 
+# Charts are only rebuilt when the data or the Home filters change
+chart_filters = [start_date, end_date, selected_state, selected_risk, selected_priority]
+
 col_chart1, col_chart2 = st.columns(2)
 
 with col_chart1:
     st.markdown("#### 📅 Daily Enrolment Trends")
-    if 'Date' in df.columns and 'Enrolments' in df.columns:
-        daily_data = df.groupby('Date')[['Enrolments', 'Updates']].sum().reset_index()
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=daily_data['Date'],
-            y=daily_data['Enrolments'],
-            name='Enrolments',
-            mode='lines+markers',
-            line=dict(color='#4facfe', width=3),
-            fill='tozeroy'
-        ))
-        fig.add_trace(go.Scatter(
-            x=daily_data['Date'],
-            y=daily_data['Updates'],
-            name='Updates',
-            mode='lines+markers',
-            line=dict(color='#f093fb', width=2)
-        ))
+    if totals['records'] > 0:
+        def daily_trends_figure():
+            # Long ranges are downsampled (LTTB) to a bounded number of points
+            daily_data = downsample(view.by('Date')[['Date', 'Enrolments', 'Updates']], 'Date', ['Enrolments', 'Updates'])
+            
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=daily_data['Date'],
+                y=daily_data['Enrolments'],
+                name='Enrolments',
+                mode='lines+markers',
+                line=dict(color='#4facfe', width=3),
+                fill='tozeroy'
+            ))
+            fig.add_trace(go.Scatter(
+                x=daily_data['Date'],
+                y=daily_data['Updates'],
+                name='Updates',
+                mode='lines+markers',
+                line=dict(color='#f093fb', width=2)
+            ))
+            
+            fig.update_layout(
+                hovermode='x unified',
+                height=350,
+                margin=dict(l=0, r=0, t=30, b=0)
+            )
+            return fig
         
-        fig.update_layout(
-            hovermode='x unified',
-            height=350,
-            margin=dict(l=0, r=0, t=30, b=0)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(cached_figure("home_daily_trends", version, chart_filters, daily_trends_figure),
+                        use_container_width=True)
     else:
         st.info("Date or Enrolments data not available")
 
 with col_chart2:
     st.markdown("#### 🗺️ State-wise Distribution")
-    if 'State' in df.columns and 'Enrolments' in df.columns:
-        state_data = df.groupby('State')['Enrolments'].sum().sort_values(ascending=False).head(10).reset_index()
+    if totals['records'] > 0:
+        def state_bars_figure():
+            state_data = view.by('State')[['State', 'Enrolments']].sort_values('Enrolments', ascending=False).head(10)
+            
+            fig = px.bar(
+                state_data,
+                x='Enrolments',
+                y='State',
+                orientation='h',
+                color='Enrolments',
+                color_continuous_scale='Viridis'
+            )
+            fig.update_layout(
+                showlegend=False,
+                height=350,
+                margin=dict(l=0, r=0, t=30, b=0)
+            )
+            return fig
         
-        fig = px.bar(
-            state_data,
-            x='Enrolments',
-            y='State',
-            orientation='h',
-            color='Enrolments',
-            color_continuous_scale='Viridis'
-        )
-        fig.update_layout(
-            showlegend=False,
-            height=350,
-            margin=dict(l=0, r=0, t=30, b=0)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(cached_figure("home_state_bars", version, chart_filters, state_bars_figure),
+                        use_container_width=True)
     else:
         st.info("State or Enrolments data not available")
 
@@ -349,60 +386,77 @@ col_risk1, col_risk2 = st.columns(2)
 
 with col_risk1:
     st.markdown("#### ⚠️ Risk Distribution")
-    if 'Risk_Level' in df.columns:
-        risk_data = df['Risk_Level'].value_counts().reset_index()
-        risk_data.columns = ['Risk Level', 'Count']
+    if totals['records'] > 0:
+        def risk_pie_figure():
+            risk_data = by_risk.sort_values(ascending=False).reset_index()
+            risk_data.columns = ['Risk Level', 'Count']
+            
+            fig = px.pie(
+                risk_data,
+                values='Count',
+                names='Risk Level',
+                color='Risk Level',
+                color_discrete_map={'High Risk': '#ff6b6b', 'Medium Risk': '#ffd43b', 'Low Risk': '#51cf66'},
+                hole=0.4
+            )
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            fig.update_layout(height=350, margin=dict(l=0, r=0, t=30, b=0))
+            return fig
         
-        fig = px.pie(
-            risk_data,
-            values='Count',
-            names='Risk Level',
-            color='Risk Level',
-            color_discrete_map={'High Risk': '#ff6b6b', 'Medium Risk': '#ffd43b', 'Low Risk': '#51cf66'},
-            hole=0.4
-        )
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        fig.update_layout(height=350, margin=dict(l=0, r=0, t=30, b=0))
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(cached_figure("home_risk_pie", version, chart_filters, risk_pie_figure),
+                        use_container_width=True)
     else:
         st.info("Risk Level data not available")
 
 with col_risk2:
     st.markdown("#### 🎯 Priority Actions")
-    if 'Priority' in df.columns:
-        priority_data = df['Priority'].value_counts().reset_index()
-        priority_data.columns = ['Priority', 'Count']
+    if totals['records'] > 0:
+        def priority_bar_figure():
+            priority_data = view.by('Priority')[['Priority', 'Records']].sort_values('Records', ascending=False)
+            priority_data.columns = ['Priority', 'Count']
+            
+            fig = px.bar(
+                priority_data,
+                x='Priority',
+                y='Count',
+                color='Priority',
+                color_discrete_map={'High': '#ff6b6b', 'Medium': '#ffd43b', 'Low': '#51cf66'}
+            )
+            fig.update_layout(
+                showlegend=False,
+                height=350,
+                margin=dict(l=0, r=0, t=30, b=0)
+            )
+            return fig
         
-        fig = px.bar(
-            priority_data,
-            x='Priority',
-            y='Count',
-            color='Priority',
-            color_discrete_map={'High': '#ff6b6b', 'Medium': '#ffd43b', 'Low': '#51cf66'}
-        )
-        fig.update_layout(
-            showlegend=False,
-            height=350,
-            margin=dict(l=0, r=0, t=30, b=0)
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        render_chart(cached_figure("home_priority_bar", version, chart_filters, priority_bar_figure),
+                        use_container_width=True)
     else:
         st.info("Priority data not available")
 
 st.divider()
 
 # ====================== DATA TABLE ======================
-with st.expander("📋 View Detailed Data Table", expanded=False):
-    display_cols = [col for col in ['State', 'District', 'Date', 'Enrolments', 'Updates', 
-                                     'Risk_Level', 'Priority', 'MEGR', 'Anomaly_Score'] 
-                    if col in df.columns]
-    
-    st.dataframe(
-        df[display_cols].sort_values('Date', ascending=False),
-        use_container_width=True,
-        hide_index=True
-    )
+# Rerun on toggle, so the rows are only selected while the table is open
+detail_table = st.expander("📋 View Detailed Data Table", expanded=False, key="home_detail_table", on_change="rerun")
+if detail_table.open:
+    with detail_table:
+        df = detail_view()
+        display_cols = [col for col in ['State', 'District', 'Date', 'Enrolments', 'Updates', 
+                                         'Risk_Level', 'Priority', 'MEGR', 'Anomaly_Score'] 
+                        if col in df.columns]
+        
+        # Partial selection of the latest rows instead of sorting the whole view
+        st.dataframe(
+            df[display_cols].nlargest(DETAIL_ROWS, 'Date'),
+            use_container_width=True,
+            hide_index=True
+        )
+        if len(df) > DETAIL_ROWS:
+            st.caption(f"Showing the latest {DETAIL_ROWS:,} of {len(df):,} rows. Use the downloads above for the full set.")
 
 # Footer
 st.markdown("---")
-st.caption("🇮🇳 Aadhaar Enrolment Intelligence System | Powered by AI Analytics | Real-time Monitoring")
\ No newline at end of file
+st.caption("🇮🇳 Aadhaar Enrolment Intelligence System | Powered by AI Analytics | Real-time Monitoring")
+
+end_page("Home", page_run)
@@ -0,0 +1,283 @@
+"""
+Read-only JSON Aggregate API for UIDAI Dashboard
+KPIs, state/district rollups, anomalies and forecasts as an ASGI app with ETag caching
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qsl
+
+import pandas as pd
+
+from core.anomaly import DEFAULT_SENSITIVITY, DEFAULT_SEVERITY_FILTER, SEVERITY_LEVELS, score_anomalies
+from core.data_loader import data_version, version_file
+from core.forecasting import SCENARIO_FACTORS, Z_SCORES, generate_forecast, historical_series, monthly_breakdown
+from core.query_engine import open_backend
+from core.rollup_cube import load_cube
+from core.shared_store import load_shared_engine
+
+RESPONSE_CACHE_SIZE = 1024
+MAX_ANOMALY_ROWS = 1000
+ANOMALY_COLUMNS = ['Date', 'State', 'District', 'Enrolments', 'Updates', 'Risk_Level', 'Severity_Score', 'Severity_Level']
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ====================== DATA CONTEXT ======================
+
+class DataContext:
+    """Engine, cube and query backend for one data version"""
+
+    def __init__(self, version):
+        # The file holding exactly this version, so the ETag and the rows always agree
+        path = version_file(version)
+        if path is None:
+            raise LookupError(f"Data version {version} is no longer available.")
+        self.version = version
+        self.engine = load_shared_engine(path)
+        self.cube = load_cube(path)
+        self.backend = open_backend(path)
+
+
+_CONTEXT = None
+_CONTEXT_LOCK = threading.Lock()
+
+
+def get_context():
+    """Current DataContext, rebuilt when the processed file changes"""
+    global _CONTEXT
+    version = data_version()
+    if version is None:
+        raise LookupError("Processed data not found. Run enchanced_data_processor.py first.")
+    if _CONTEXT is None or _CONTEXT.version != version:
+        with _CONTEXT_LOCK:
+            if _CONTEXT is None or _CONTEXT.version != version:
+                _CONTEXT = DataContext(version)
+    return _CONTEXT
+
+
+# ====================== PARAMETERS ======================
+
+def _param(params, name, default=None, cast=str, choices=None):
+    if name not in params or params[name] == "":
+        return default
+    try:
+        value = cast(params[name])
+    except ValueError:
+        raise BadRequest(f"Invalid value for '{name}': {params[name]}")
+    if choices is not None and value not in choices:
+        raise BadRequest(f"'{name}' must be one of: {', '.join(map(str, choices))}")
+    return value
+
+
+def _filters(params):
+    return {
+        'start': _param(params, 'start', cast=pd.Timestamp),
+        'end': _param(params, 'end', cast=pd.Timestamp),
+        'state': _param(params, 'state'),
+        'risk': _param(params, 'risk'),
+        'priority': _param(params, 'priority')
+    }
+
+
+def _records(df):
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+
+# ====================== HANDLERS ======================
+
+def kpis(ctx, params):
+    view = ctx.cube.slice(**_filters(params))
+    totals = view.totals()
+    totals['by_risk'] = dict(zip(*[view.by('Risk_Level')[c].tolist() for c in ['Risk_Level', 'Records']]))
+    return totals
+
+
+def states(ctx, params):
+    return _records(ctx.cube.slice(**_filters(params)).by('State'))
+
+
+def districts(ctx, params):
+    filters = _filters(params)
+    rollup = ctx.backend.aggregate({
+        'Records': ('count', '*'),
+        'Enrolments': ('sum', 'Enrolments'),
+        'Updates': ('sum', 'Updates')
+    }, by=['State', 'District'], start=filters['start'], end=filters['end'],
+        State=filters['state'], Risk_Level=filters['risk'], Priority=filters['priority'])
+    return _records(rollup)
+
+
+def anomalies(ctx, params):
+    sensitivity = _param(params, 'sensitivity', DEFAULT_SENSITIVITY, int, range(1, 11))
+    severity = _param(params, 'severity', ','.join(DEFAULT_SEVERITY_FILTER)).split(',')
+    if not set(severity) <= set(SEVERITY_LEVELS):
+        raise BadRequest(f"'severity' must be a comma-separated subset of: {', '.join(SEVERITY_LEVELS)}")
+    limit = min(max(_param(params, 'limit', 100, int), 1), MAX_ANOMALY_ROWS)
+
+    df = ctx.engine.filter(State=_param(params, 'state'))
+    _, flagged = score_anomalies(df, sensitivity, severity)
+    top = flagged.sort_values('Severity_Score', ascending=False).head(limit)
+    return {'total': len(flagged), 'rows': _records(top[[c for c in ANOMALY_COLUMNS if c in top.columns]])}
+
+
+def forecast(ctx, params):
+    months = _param(params, 'months', 3, int, range(1, 13))
+    scenario = _param(params, 'scenario', 'Baseline', choices=list(SCENARIO_FACTORS))
+    confidence = _param(params, 'confidence', 95, int, list(Z_SCORES))
+
+    historical = historical_series(ctx.engine.filter(State=_param(params, 'state')))
+    forecast_generated, recent_growth = generate_forecast(historical, months, scenario, confidence)
+    return {
+        'daily_growth': float(recent_growth),
+        'daily': _records(forecast_generated),
+        'monthly': _records(monthly_breakdown(forecast_generated)) if len(forecast_generated) else []
+    }
+
+
+def version(ctx, params):
+    return {'rows': len(ctx.engine)}
+
+
+ROUTES = {
+    '/api/version': version,
+    '/api/kpis': kpis,
+    '/api/states': states,
+    '/api/districts': districts,
+    '/api/anomalies': anomalies,
+    '/api/forecast': forecast
+}
+
+
+# ====================== RESPONSE CACHE ======================
+
+class ResponseCache:
+    """Serialized responses per (data version, path, query), LRU bounded"""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+RESPONSES = ResponseCache()
+
+
+def render(path, params):
+    """(etag, body) for a route, computed once per data version and query"""
+    ctx = get_context()
+    key = (ctx.version, path, tuple(sorted(params.items())))
+    entry = RESPONSES.get(key)
+    if entry is None:
+        body = json.dumps({'version': ctx.version, 'data': ROUTES[path](ctx, params)}).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        entry = (etag, body)
+        RESPONSES.put(key, entry)
+    return entry
+
+
+def cached(path, params):
+    """Cached (etag, body) if the loaded data is still current, else None"""
+    if _CONTEXT is None or _CONTEXT.version != data_version():
+        return None
+    return RESPONSES.get((_CONTEXT.version, path, tuple(sorted(params.items()))))
+
+
+# ====================== ASGI APP ======================
+
+async def _send(send, status, body=b"", headers=(), head=False):
+    """Response with its Content-Length; a HEAD response reports the length of the body it omits"""
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())] + list(headers)
+    })
+    await send({'type': 'http.response.body', 'body': b"" if head else body})
+
+
+def _error(message):
+    return json.dumps({'error': message}).encode()
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Load the data before the first request instead of on it
+                try:
+                    await asyncio.to_thread(get_context)
+                except LookupError:
+                    pass
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] != 'http':
+        return
+    head = scope['method'] == 'HEAD'
+    if scope['method'] not in ('GET', 'HEAD'):
+        await _send(send, 405, _error("Read-only API: use GET"), [(b'allow', b'GET, HEAD')])
+        return
+    if scope['path'] not in ROUTES:
+        await _send(send, 404, _error(f"Unknown endpoint. Available: {', '.join(ROUTES)}"), head=head)
+        return
+
+    params = dict(parse_qsl(scope['query_string'].decode()))
+    try:
+        # Cached responses are a dict lookup; new ones are computed off the event loop
+        etag, body = cached(scope['path'], params) or await asyncio.to_thread(render, scope['path'], params)
+    except BadRequest as e:
+        await _send(send, 400, _error(str(e)), head=head)
+        return
+    except LookupError as e:
+        await _send(send, 503, _error(str(e)), head=head)
+        return
+
+    headers = [(b'etag', etag.encode()), (b'cache-control', b'no-cache')]
+    request_headers = dict(scope['headers'])
+    if etag in request_headers.get(b'if-none-match', b'').decode():
+        await _send(send, 304, b"", headers)
+        return
+    await _send(send, 200, body, headers, head=head)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve UIDAI dashboard aggregates as JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Server processes (each keeps its own cache)")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ uvicorn is required to serve the API: pip install uvicorn")
+        return
+
+    print(f"🌐 Aggregate API on http://{args.host}:{args.port}/api/kpis")
+    uvicorn.run("aggregate_api:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Server Entry Point for the Dashboard
+Serves Home.py and its pages, and starts the cache warm-up for the current data version at server boot
+"""
+
+from contextlib import asynccontextmanager
+
+import streamlit as st
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Imported once the runtime is started, so the page caches bind to its storage like the sessions' do
+    from core.startup import start_boot_warm_up
+
+    start_boot_warm_up()
+    yield
+
+
+app = st.App("Home.py", lifespan=lifespan)
@@ -0,0 +1,382 @@
+"""
+Benchmark Suite for UIDAI Dashboard
+Times processor stages and page computations on synthetic data without Streamlit, and compares runs
+"""
+
+import argparse
+import contextlib
+import gc
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from core.anomaly import score_anomalies
+from core.data_loader import APP_DIR, DATA_DIR
+from core.forecasting import generate_forecast, historical_series, monthly_breakdown, scenario_comparison
+from core.map_data import build_map_frame
+from core.pipeline_profiler import peak_rss, reset_peak_rss
+from core.rollup_cube import RollupCube
+from core.synthetic_data import (
+    STATES, SyntheticConfig, build_forecast, config_for_rows, generate_frame, monthly_state_totals
+)
+from enchanced_data_processor import DataValidator
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+RESULTS_DIR = os.path.join(DATA_DIR, "benchmarks")
+
+# compare flags a benchmark whose median time grew by more than this fraction...
+DEFAULT_TOLERANCE = 0.15
+# ...and by more than this many combined spreads (robust standard deviations) of the two runs
+NOISE_SIGMAS = 3.0
+# Median absolute deviation -> standard deviation for normally distributed timings
+MAD_TO_SIGMA = 1.4826
+# Timings below this are dominated by noise and never flagged
+MIN_COMPARE_SECONDS = 0.05
+# Fast benchmarks keep repeating (up to MAX_REPEATS) until this much time has been sampled
+MIN_SAMPLE_SECONDS = 0.5
+MAX_REPEATS = 25
+
+
+# ====================== SYNTHETIC INPUTS ======================
+
+def synthetic_master(rows, seed=0):
+    """`rows` master-file rows from the seeded generator (12 months, districts first)"""
+    master, _ = generate_frame(config_for_rows(rows, seed=seed))
+    return master.head(rows)
+
+
+def single_month_master(rows, seed=0):
+    """One month with one row per district, the shape generate_history expands"""
+    states = min(len(STATES), rows)
+    config = SyntheticConfig(states=states, districts_per_state=-(-rows // states), months=1, seed=seed)
+    master, _ = generate_frame(config)
+    return master.head(rows)
+
+
+class Inputs:
+    """Synthetic inputs for one size, built once (untimed) and shared by the benchmarks"""
+
+    def __init__(self, rows, seed, workdir):
+        self.rows = rows
+        self.seed = seed
+        self.workdir = workdir
+        self._cache = {}
+
+    def _get(self, name, build):
+        if name not in self._cache:
+            with contextlib.redirect_stdout(io.StringIO()):
+                self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def master(self):
+        return self._get('master', lambda: synthetic_master(self.rows, self.seed))
+
+    @property
+    def single_month(self):
+        # generate_history expands one month into twelve
+        return self._get('single_month', lambda: single_month_master(max(self.rows // 12, 1), self.seed))
+
+    @property
+    def validator(self):
+        def build():
+            forecast_file = os.path.join(self.workdir, "forecast.csv")
+            build_forecast(monthly_state_totals(self.master)).to_csv(forecast_file, index=False)
+            return DataValidator(None, forecast_file)
+        return self._get('validator', build)
+
+    @property
+    def enriched(self):
+        return self._get('enriched', lambda: self.validator.enrich_data(self.master.copy()))
+
+    @property
+    def processed(self):
+        return self._get('processed', lambda: self.validator.merge_forecast_data(self.enriched.copy()))
+
+    @property
+    def cube(self):
+        return self._get('cube', lambda: RollupCube.build(self.processed))
+
+
+# ====================== BENCHMARKS ======================
+# Each takes Inputs, does its (untimed) setup and returns the callable to time
+
+def bench_generate_history(inputs):
+    df = inputs.single_month.copy()
+    return lambda: inputs.validator.generate_history(df)
+
+
+def bench_enrich_data(inputs):
+    df = inputs.master.copy()
+    return lambda: inputs.validator.enrich_data(df)
+
+
+def bench_merge_forecast_data(inputs):
+    df = inputs.enriched
+    return lambda: inputs.validator.merge_forecast_data(df)
+
+
+def bench_severity_scoring(inputs):
+    df = inputs.processed
+    return lambda: score_anomalies(df)
+
+
+def bench_forecasting_loop(inputs):
+    df = inputs.processed
+
+    def run():
+        # All India plus every state, as the report generator and API do
+        for _, part in [(None, df)] + list(df.groupby('State', observed=True)):
+            forecast_generated, _ = generate_forecast(historical_series(part), 3, "Baseline", 95)
+            if len(forecast_generated):
+                monthly_breakdown(forecast_generated)
+                scenario_comparison(forecast_generated)
+    return run
+
+
+def bench_map_coordinates(inputs):
+    df = inputs.processed
+    return lambda: build_map_frame(df)
+
+
+def bench_home_cube_build(inputs):
+    df = inputs.processed
+    return lambda: RollupCube.build(df)
+
+
+def bench_home_kpis(inputs):
+    cube = inputs.cube
+    states = cube.values('State')
+    start, end = cube.cells['Date'].min(), cube.cells['Date'].max()
+
+    def run():
+        # The Home page's KPI row, breakdowns and one state drill-down
+        for state in [None, states[0]]:
+            view = cube.slice(start=start, end=end, state=state)
+            view.totals()
+            for dim in ['State', 'Risk_Level', 'Priority', 'Date']:
+                view.by(dim)
+            view.slice(risk='High Risk').by('State')
+    return run
+
+
+BENCHMARKS = {
+    'generate_history': bench_generate_history,
+    'enrich_data': bench_enrich_data,
+    'merge_forecast_data': bench_merge_forecast_data,
+    'severity_scoring': bench_severity_scoring,
+    'forecasting_loop': bench_forecasting_loop,
+    'map_coordinates': bench_map_coordinates,
+    'home_cube_build': bench_home_cube_build,
+    'home_kpis': bench_home_kpis
+}
+
+
+def time_benchmark(bench, inputs, repeats):
+    """Seconds per run (at least `repeats` runs) and the peak RSS seen while running"""
+    times = []
+    reset_peak_rss()
+    while len(times) < repeats or (sum(times) < MIN_SAMPLE_SECONDS and len(times) < MAX_REPEATS):
+        run = bench(inputs)
+        gc.collect()
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - started)
+        del run
+    return times, peak_rss()
+
+
+# ====================== RESULTS ======================
+
+def spread(times):
+    """Robust standard deviation of the run times (scaled median absolute deviation)"""
+    median = statistics.median(times)
+    return MAD_TO_SIGMA * statistics.median(abs(t - median) for t in times)
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=APP_DIR, capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def run_suite(sizes, names, repeats=None, seed=0):
+    """Run the selected benchmarks at each size; returns the JSON-ready result record"""
+    record = {
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git('rev-parse', 'HEAD') or None,
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'seed': seed,
+        'results': []
+    }
+    workdir = tempfile.mkdtemp(prefix="uidai_bench_")
+    try:
+        for label in sizes:
+            rows = SIZES[label]
+            inputs = Inputs(rows, seed, workdir)
+            runs = repeats or max(1, min(5, 3_000_000 // rows))
+            print(f"📏 {label} rows ({runs} run{'s' if runs > 1 else ''} each)")
+            for name in names:
+                times, peak = time_benchmark(BENCHMARKS[name], inputs, runs)
+                result = {
+                    'benchmark': name,
+                    'size': label,
+                    'rows': rows,
+                    'repeats': len(times),
+                    'min_s': round(min(times), 6),
+                    'median_s': round(statistics.median(times), 6),
+                    'spread_s': round(spread(times), 6),
+                    'rows_per_sec': round(rows / min(times), 1),
+                    'peak_rss': peak
+                }
+                record['results'].append(result)
+                print(f"   {name:<22}{result['min_s']:>10.4f}s  {result['rows_per_sec']:>14,.0f} rows/s")
+            del inputs
+            gc.collect()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return record
+
+
+def save_results(record, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = record['started'].replace(':', '').replace('-', '')
+        path = os.path.join(RESULTS_DIR, f"bench_{stamp}_{(record['commit'] or 'nogit')[:8]}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=2)
+    return path
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _compare_one(before, after, tolerance):
+    """Status of one median-time change, given each side's {'median_s', 'spread_s'} entry"""
+    change = after['median_s'] / before['median_s'] - 1 if before['median_s'] > 0 else 0.0
+    delta = after['median_s'] - before['median_s']
+    # Older result files have no spread; they are compared on the tolerance alone
+    noise = NOISE_SIGMAS * np.hypot(before.get('spread_s', 0.0), after.get('spread_s', 0.0))
+    if max(before['median_s'], after['median_s']) < MIN_COMPARE_SECONDS or abs(delta) <= noise:
+        return change, noise, 'ok'
+    if change > tolerance:
+        return change, noise, 'REGRESSION'
+    if change < -tolerance:
+        return change, noise, 'faster'
+    return change, noise, 'ok'
+
+
+def compare_results(base, new, tolerance=DEFAULT_TOLERANCE, confirm=()):
+    """Per (benchmark, size) median-time change from base to new; status is ok/faster/REGRESSION.
+
+    A change only counts when it exceeds both the tolerance and the noise of the two runs. Each record in
+    `confirm` (later runs of the same code) must show the regression too, or it is reported as 'unconfirmed'.
+    """
+    base_results = {(r['benchmark'], r['size']): r for r in base['results']}
+    confirm_results = [{(r['benchmark'], r['size']): r for r in record['results']} for record in confirm]
+    rows = []
+    for r in new['results']:
+        key = (r['benchmark'], r['size'])
+        if key not in base_results:
+            continue
+        before = base_results[key]
+        change, noise, status = _compare_one(before, r, tolerance)
+        if status == 'REGRESSION':
+            repeats = [_compare_one(before, later[key], tolerance)[2] for later in confirm_results if key in later]
+            if any(other != 'REGRESSION' for other in repeats):
+                status = 'unconfirmed'
+        rows.append({'benchmark': key[0], 'size': key[1], 'base_s': before['median_s'], 'new_s': r['median_s'],
+                     'noise_s': round(noise, 6), 'change': round(change, 4), 'status': status})
+    return pd.DataFrame(rows, columns=['benchmark', 'size', 'base_s', 'new_s', 'noise_s', 'change', 'status'])
+
+
+# ====================== CLI ======================
+
+def _latest_results(count):
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, "bench_*.json")))
+    return paths[-count:] if len(paths) >= count else None
+
+
+def cmd_run(args):
+    sizes = args.sizes or list(SIZES)
+    names = args.only or list(BENCHMARKS)
+    record = run_suite(sizes, names, args.repeats, args.seed)
+    path = save_results(record, args.output)
+    print(f"💾 Results saved to {path}")
+
+
+def cmd_compare(args):
+    if args.base and args.new:
+        base_path, new_paths = args.base, args.new
+    else:
+        latest = _latest_results(1 + args.runs)
+        if latest is None:
+            print(f"❌ Need {1 + args.runs} result files in {RESULTS_DIR} (or pass BASE and NEW)")
+            return 2
+        base_path, new_paths = latest[0], latest[1:]
+    base = load_results(base_path)
+    new, *confirm = [load_results(path) for path in new_paths]
+    table = compare_results(base, new, args.tolerance, confirm)
+
+    print(f"🔍 {(base.get('commit') or '?')[:8]} → {(new.get('commit') or '?')[:8]} "
+          f"(median times, tolerance {args.tolerance:.0%} and {NOISE_SIGMAS:g}σ noise"
+          f"{f', confirmed by {len(confirm)} more run(s)' if confirm else ''})")
+    for r in table.itertuples():
+        marker = {'REGRESSION': '🔴', 'faster': '🟢', 'unconfirmed': '🟡'}.get(r.status, '  ')
+        print(f"{marker} {r.benchmark:<22}{r.size:>6}{r.base_s:>11.4f}s{r.new_s:>11.4f}s"
+              f"  ±{r.noise_s:<8.4f}{r.change:>+9.1%}  {r.status}")
+    regressions = table[table['status'] == 'REGRESSION']
+    if len(regressions):
+        print(f"⚠️ {len(regressions)} regression(s)")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the UIDAI pipeline and page computations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run benchmarks and save the results as JSON")
+    run.add_argument("--sizes", nargs="*", choices=list(SIZES), help="Row counts (default: all)")
+    run.add_argument("--only", nargs="*", choices=list(BENCHMARKS), help="Benchmarks to run (default: all)")
+    run.add_argument("--repeats", type=int, help="Minimum runs per benchmark (default: 5 for small sizes, fewer for large)")
+    run.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    run.add_argument("--output", help=f"Result file (default: {RESULTS_DIR}/bench_<time>_<commit>.json)")
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser("compare", help="Compare result files (default: the latest ones)")
+    compare.add_argument("base", nargs="?", help="Baseline result file")
+    compare.add_argument("new", nargs="*", help="New result file, then later runs that must repeat a regression")
+    compare.add_argument("--runs", type=int, default=1,
+                         help="Without files: compare the latest RUNS results to the one before; all must regress")
+    compare.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                         help="Slowdown fraction that counts as a regression")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args) or 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Anomaly Severity Scoring
+Shared by the Anomaly Detection page and headless report generation
+"""
+
+import numpy as np
+import pandas as pd
+
+from core.instrumentation import timed
+
+SEVERITY_LEVELS = ['Critical', 'High', 'Medium', 'Low']
+DEFAULT_SEVERITY_FILTER = ['Critical', 'High']
+DEFAULT_SENSITIVITY = 5
+
+
+def calculate_anomaly_severity(df):
+    """Severity score (0-100) based on multiple factors, for every row at once"""
+    score = pd.Series(0.0, index=df.index)
+
+    # Risk level contribution
+    if 'Risk_Level' in df.columns:
+        score += np.where(df['Risk_Level'] == 'High Risk', 40, np.where(df['Risk_Level'] == 'Medium Risk', 20, 0))
+
+    # Anomaly score contribution
+    if 'Anomaly_Score' in df.columns:
+        score += np.minimum(df['Anomaly_Score'] * 30, 30).fillna(0)
+
+    # Volatility contribution
+    if 'Volatility_Score' in df.columns:
+        score += np.minimum(df['Volatility_Score'] * 10, 20).fillna(0)
+
+    # Underperformance contribution
+    if 'Underperformance_Flag' in df.columns:
+        score += np.where(df['Underperformance_Flag'] == 'Yes', 10, 0)
+
+    return score.clip(upper=100)
+
+
+def categorize_severity(scores):
+    """Categorize severity scores into levels"""
+    return pd.Series(
+        np.select([scores >= 70, scores >= 40, scores >= 20], SEVERITY_LEVELS[:3], default='Low'),
+        index=scores.index
+    )
+
+
+def detect_anomalies(df, sensitivity=DEFAULT_SENSITIVITY):
+    """Fallback Is_Anomaly flag when the processed data does not carry one"""
+    if 'Anomaly_Score' in df.columns:
+        threshold = df['Anomaly_Score'].quantile(0.95 - (sensitivity - 5) * 0.05)
+        return df['Anomaly_Score'] > threshold
+
+    # Use enrolment outliers
+    if 'Enrolments' in df.columns:
+        Q1 = df['Enrolments'].quantile(0.25)
+        Q3 = df['Enrolments'].quantile(0.75)
+        IQR = Q3 - Q1
+        threshold_multiplier = 1.5 + (10 - sensitivity) * 0.3
+        lower = Q1 - threshold_multiplier * IQR
+        upper = Q3 + threshold_multiplier * IQR
+        return (df['Enrolments'] < lower) | (df['Enrolments'] > upper)
+
+    return pd.Series(False, index=df.index)
+
+
+@timed('score', rows=lambda result: len(result[0]))
+def score_anomalies(df, sensitivity=DEFAULT_SENSITIVITY, severity_filter=DEFAULT_SEVERITY_FILTER):
+    """Add severity columns to df; return (scored df, anomalies matching severity_filter)"""
+    # Shallow: only new columns are added, so the (possibly memory-mapped) input columns are shared, not copied
+    df = df.copy(deep=False)
+    if 'Is_Anomaly' not in df.columns:
+        df['Is_Anomaly'] = detect_anomalies(df, sensitivity)
+
+    df['Severity_Score'] = calculate_anomaly_severity(df)
+    df['Severity_Level'] = categorize_severity(df['Severity_Score'])
+
+    mask = df['Is_Anomaly'] == True
+    if severity_filter:
+        mask &= df['Severity_Level'].isin(severity_filter)
+    return df, df[mask]
+
+
+@timed('aggregate', rows=len)
+def state_summary(anomalies):
+    """Average severity and anomaly count per state"""
+    summary = anomalies.groupby('State', observed=True).agg({
+        'Severity_Score': 'mean',
+        'District': 'count'
+    }).reset_index()
+    summary.columns = ['State', 'Avg_Severity', 'Anomaly_Count']
+    return summary
@@ -0,0 +1,101 @@
+"""
+Enrolment Centre Coverage Analysis
+KD-tree over centre locations: nearest-centre distance and capacity within radius
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+from core.data_loader import DATA_DIR
+
+CENTRE_FILE = os.path.join(DATA_DIR, "enrolment_centres.csv")
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_RADIUS_KM = 25
+
+LAT_COLUMNS = ['lat', 'latitude', 'Latitude', 'LAT']
+LON_COLUMNS = ['lon', 'lng', 'longitude', 'Longitude', 'LON']
+CAPACITY_COLUMNS = ['capacity', 'Capacity', 'daily_capacity']
+
+
+def _pick(df, candidates, required=True):
+    for name in candidates:
+        if name in df.columns:
+            return name
+    if required:
+        raise ValueError(f"Missing column, expected one of {candidates}")
+    return None
+
+
+def load_centres(path=CENTRE_FILE):
+    """Read the centre catalogue as lat/lon/capacity (capacity defaults to 1)"""
+    if not os.path.exists(path):
+        return None
+    raw = pd.read_csv(path)
+    capacity_col = _pick(raw, CAPACITY_COLUMNS, required=False)
+    centres = pd.DataFrame({
+        'lat': pd.to_numeric(raw[_pick(raw, LAT_COLUMNS)], errors='coerce'),
+        'lon': pd.to_numeric(raw[_pick(raw, LON_COLUMNS)], errors='coerce'),
+        'capacity': pd.to_numeric(raw[capacity_col], errors='coerce').fillna(0) if capacity_col else 1.0
+    })
+    return centres.dropna(subset=['lat', 'lon']).reset_index(drop=True)
+
+
+def to_unit_vectors(lat, lon):
+    """Lat/lon degrees -> points on the unit sphere (Euclidean distance = chord)"""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def km_to_chord(km):
+    return 2 * np.sin(np.asarray(km, dtype=float) / (2 * EARTH_RADIUS_KM))
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+class CentreIndex:
+    """Spatial index over enrolment centres for bulk coverage queries"""
+
+    def __init__(self, centres):
+        # scipy is only imported once a centre file is actually loaded
+        from scipy.spatial import cKDTree
+
+        self.centres = centres.reset_index(drop=True)
+        self.capacity = self.centres['capacity'].to_numpy(dtype=float)
+        self.tree = cKDTree(to_unit_vectors(self.centres['lat'], self.centres['lon']))
+
+    def nearest(self, lat, lon):
+        """Great-circle distance (km) and index of the nearest centre per point"""
+        chord, idx = self.tree.query(to_unit_vectors(lat, lon), k=1, workers=-1)
+        return chord_to_km(chord), idx
+
+    def within_radius(self, lat, lon, radius_km):
+        """Centre count and total capacity within radius_km of each point"""
+        from scipy.spatial import cKDTree
+
+        points = cKDTree(to_unit_vectors(lat, lon))
+        pairs = points.sparse_distance_matrix(self.tree, km_to_chord(radius_km), output_type='ndarray')
+        n = points.n
+        counts = np.bincount(pairs['i'], minlength=n)
+        capacity = np.bincount(pairs['i'], weights=self.capacity[pairs['j']], minlength=n)
+        return counts, capacity
+
+
+def coverage_layer(points, centres, radius_km=DEFAULT_RADIUS_KM):
+    """Add nearest-centre distance and capacity-within-radius to points (lat/lon); NaN for points without coordinates"""
+    index = CentreIndex(centres)
+    result = points.copy()
+    placed = result[['lat', 'lon']].notna().all(axis=1).to_numpy()
+    lat, lon = result['lat'].to_numpy()[placed], result['lon'].to_numpy()[placed]
+    distance, _ = index.nearest(lat, lon)
+    counts, capacity = index.within_radius(lat, lon, radius_km)
+    for col, values in [('Nearest_Centre_Km', distance.round(2)), ('Centres_In_Radius', counts),
+                        ('Capacity_In_Radius', capacity)]:
+        column = np.full(len(result), np.nan)
+        column[placed] = values
+        result[col] = column
+    return result
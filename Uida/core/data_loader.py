@@ -0,0 +1,251 @@
+"""
+Shared Data Access for UIDAI Dashboard
+Locates the processed dataset and identifies its version (a content hash) for cache keys
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+import pandas as pd
+
+from core.star_schema import StarSchema, has_star, star_dir
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(APP_DIR, "data")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+PROCESSED_NAME = "processed_data.csv"
+PROCESSED_FILE = os.path.join(DATA_DIR, PROCESSED_NAME)
+
+# Published pipeline outputs: data/versions/<id>/, with data/CURRENT naming the live one
+VERSIONS_DIR = os.path.join(DATA_DIR, "versions")
+CURRENT_POINTER = os.path.join(DATA_DIR, "CURRENT")
+# Older versions stay on disk (with their cached artifacts) so the dashboard can open them "as of"
+RETAIN_VERSIONS = 6
+
+# Each version folder's manifest names its content hash, the version id every cache keys on
+VERSION_MANIFEST = "manifest.json"
+VERSION_HASH_LENGTH = 16
+
+
+def current_version_dir():
+    """Directory of the published version, or None before the first publish"""
+    try:
+        with open(CURRENT_POINTER, encoding='utf-8') as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(VERSIONS_DIR, name)
+    return path if name and os.path.isdir(path) else None
+
+
+def find_processed_file():
+    """Return the newest processed data file (published version or legacy file), or None"""
+    candidates = []
+    version_dir = current_version_dir()
+    if version_dir is not None:
+        candidates.append(os.path.join(version_dir, PROCESSED_NAME))
+    candidates += [PROCESSED_FILE, os.path.join("data", PROCESSED_NAME)]
+
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        return None
+    # A legacy file written after the last publish (e.g. by ingest_real_data.py) still wins
+    return max(existing, key=lambda path: os.stat(path).st_mtime_ns)
+
+
+def data_version(path=None):
+    """Version id of a data file: the content hash of a published version, else a cheap mtime/size tag"""
+    path = path or find_processed_file()
+    if path is None:
+        return None
+    if os.path.basename(path) == PROCESSED_NAME:
+        manifest = read_manifest(os.path.dirname(path))
+        if manifest is not None:
+            return manifest['version']
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+# ====================== VERSIONS ======================
+
+def content_hash(path, chunk_size=4 * 1024 * 1024):
+    """SHA-256 of a file's bytes, shortened to VERSION_HASH_LENGTH hex digits"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()[:VERSION_HASH_LENGTH]
+
+
+def read_manifest(version_dir):
+    try:
+        with open(os.path.join(version_dir, VERSION_MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_manifest(version_dir, manifest):
+    path = os.path.join(version_dir, VERSION_MANIFEST)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def write_manifest(version_dir, **info):
+    """Hash the version's processed file and record it with `info`; returns the manifest (not yet published)"""
+    manifest = {
+        'version': content_hash(os.path.join(version_dir, PROCESSED_NAME)),
+        'dir': os.path.basename(version_dir),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'published': False,
+        **info
+    }
+    _save_manifest(version_dir, manifest)
+    return manifest
+
+
+def _is_published(name, manifest, current_name):
+    # Manifests written before the flag existed count as published if they are not newer than the live version
+    return manifest.get('published', current_name is not None and name <= current_name)
+
+
+def list_versions():
+    """Manifests of the published versions, newest first (each with 'live' set for the current one)"""
+    if not os.path.isdir(VERSIONS_DIR):
+        return []
+    current = current_version_dir()
+    current_name = os.path.basename(current) if current else None
+    versions = []
+    for name in sorted(os.listdir(VERSIONS_DIR), reverse=True):
+        path = os.path.join(VERSIONS_DIR, name)
+        manifest = read_manifest(path)
+        if manifest is not None and (path == current or _is_published(name, manifest, current_name)):
+            versions.append({**manifest, 'live': path == current})
+    return versions
+
+
+def previous_version(version):
+    """The retained version published just before `version`, or None"""
+    ids = [manifest['version'] for manifest in list_versions()]
+    if version not in ids:
+        return None
+    older = ids[ids.index(version) + 1:]
+    return next((v for v in older if v != version), None)
+
+
+def version_file(version):
+    """Processed file holding `version` (the live file first), or None once it has been pruned"""
+    live = find_processed_file()
+    if live is not None and data_version(live) == version:
+        return live
+    for manifest in list_versions():
+        if manifest['version'] == version:
+            return os.path.join(VERSIONS_DIR, manifest['dir'], PROCESSED_NAME)
+    return None
+
+
+def retained_versions():
+    """Version ids whose cached artifacts are still needed"""
+    versions = {manifest['version'] for manifest in list_versions()}
+    live = data_version()
+    if live is not None:
+        versions.add(live)
+    return versions
+
+
+def prune_cache(prefix, keep=()):
+    """Remove CACHE_DIR/<prefix><version>... artifacts of versions that are no longer retained"""
+    retained = retained_versions()
+    for path in glob.glob(os.path.join(CACHE_DIR, f"{prefix}*")):
+        name = os.path.basename(path)[len(prefix):]
+        if path in keep or '.tmp-' in name or name.split('.')[0] in retained:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def read_processed(path=None):
+    """Read processed data with the column types every page expects"""
+    path = path or find_processed_file()
+    if path is None:
+        return None
+
+    if has_star(path):
+        # Integer-coded tables; labels come back as categoricals for display
+        return normalize_types(StarSchema.load(star_dir(path)).to_frame())
+    return normalize_types(pd.read_csv(path))
+
+
+def iter_processed(path=None, chunksize=100000):
+    """Processed data in typed chunks, for builders that must not hold the whole file"""
+    path = path or find_processed_file()
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield normalize_types(chunk)
+
+
+def normalize_types(df):
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    if 'Is_Anomaly' in df.columns:
+        df['Is_Anomaly'] = df['Is_Anomaly'].astype(str).str.lower().isin(['true', '1', 'yes'])
+    return df
+
+
+def write_atomic(df, path, **kwargs):
+    """Write a CSV next to its destination first, then swap it into place"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    df.to_csv(tmp_path, index=False, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def new_version_dir():
+    """Fresh directory for a pipeline run; invisible to readers until published"""
+    path = os.path.join(VERSIONS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S-%f"))
+    os.makedirs(path)
+    return path
+
+
+def publish_version(version_dir):
+    """Mark version_dir published, point readers at it with one atomic rename, then drop old versions"""
+    manifest = read_manifest(version_dir)
+    if manifest is not None:
+        _save_manifest(version_dir, {**manifest, 'published': True,
+                                     'published_at': datetime.now().isoformat(timespec='seconds')})
+    tmp_path = f"{CURRENT_POINTER}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(os.path.basename(version_dir))
+    os.replace(tmp_path, CURRENT_POINTER)
+    prune_versions()
+
+
+def prune_versions(keep=RETAIN_VERSIONS):
+    """Delete all but the newest `keep` published versions (readers may still be finishing on those),
+    and the folders of runs that started before the live one but never published"""
+    if not os.path.isdir(VERSIONS_DIR):
+        return
+    current = current_version_dir()
+    current_name = os.path.basename(current) if current else None
+    published = {manifest['dir'] for manifest in list_versions()}
+    kept = 0
+    for name in sorted(os.listdir(VERSIONS_DIR), reverse=True):
+        path = os.path.join(VERSIONS_DIR, name)
+        if path == current:
+            kept += 1
+        elif name in published:
+            kept += 1
+            if kept > keep:
+                shutil.rmtree(path, ignore_errors=True)
+        elif current_name is not None and name < current_name:
+            # Newer unpublished folders may belong to a run still in progress
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,31 @@
+"""
+Scatter Rendering Modes for Large Frames
+SVG, WebGL or a server-side density grid, chosen by the number of points
+"""
+
+import numpy as np
+
+# Above these row counts a scatter switches to WebGL, then to a density grid
+WEBGL_THRESHOLD = 1000
+DENSITY_THRESHOLD = 200000
+DENSITY_BINS = 120
+
+SCATTER_MODES = ['svg', 'webgl', 'density']
+
+
+def scatter_mode(n_points):
+    """Rendering mode for a scatter of n_points markers"""
+    if n_points > DENSITY_THRESHOLD:
+        return 'density'
+    if n_points > WEBGL_THRESHOLD:
+        return 'webgl'
+    return 'svg'
+
+
+def density_grid(x, y, bins=DENSITY_BINS):
+    """Point counts on a bins x bins grid as (counts[y, x], x centres, y centres)"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.isfinite(x) & np.isfinite(y)
+    counts, x_edges, y_edges = np.histogram2d(x[valid], y[valid], bins=bins)
+    return counts.T, (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2
@@ -0,0 +1,92 @@
+"""
+Time-Series Downsampling for Charts
+Largest-Triangle-Three-Buckets and min/max per bucket, vectorized in numpy
+"""
+
+import numpy as np
+
+# Most points a single line chart sends to the browser
+POINT_BUDGET = 2000
+
+METHODS = ['lttb', 'minmax']
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        values = values.astype('datetime64[ns]').astype(np.int64)
+    return values.astype(np.float64)
+
+
+def _first_per_bucket(mask, buckets):
+    """Position of the first True in each bucket (buckets sorted ascending)"""
+    candidates = np.flatnonzero(mask)
+    _, first = np.unique(buckets[candidates], return_index=True)
+    return candidates[first]
+
+
+def _pick_largest_triangles(x, y, starts, ends, prev_x, prev_y, next_x, next_y):
+    inner = np.arange(starts[0], ends[-1])
+    buckets = np.repeat(np.arange(len(starts)), ends - starts)
+    ax, ay = prev_x[buckets], prev_y[buckets]
+    area = np.abs((ax - next_x[buckets]) * (y[inner] - ay) - (ax - x[inner]) * (next_y[buckets] - ay))
+    largest = np.maximum.reduceat(area, starts - starts[0])
+    return inner[_first_per_bucket(area == largest[buckets], buckets)]
+
+
+def lttb_indices(x, y, n_out):
+    """Row positions LTTB keeps: first, last and one point per bucket in between
+
+    The anchor of each bucket is the previous bucket's average on a first pass
+    and its chosen point on a second pass, so every step stays vectorized.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x, y = _as_float(x), np.nan_to_num(_as_float(y))
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+
+    mean_x = np.add.reduceat(x[:n - 1], starts) / counts
+    mean_y = np.add.reduceat(y[:n - 1], starts) / counts
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    chosen = _pick_largest_triangles(x, y, starts, ends,
+                                     np.insert(mean_x[:-1], 0, x[0]), np.insert(mean_y[:-1], 0, y[0]),
+                                     next_x, next_y)
+    chosen = _pick_largest_triangles(x, y, starts, ends,
+                                     np.insert(x[chosen[:-1]], 0, x[0]), np.insert(y[chosen[:-1]], 0, y[0]),
+                                     next_x, next_y)
+    return np.concatenate(([0], chosen, [n - 1]))
+
+
+def minmax_indices(y, n_out):
+    """Row positions of the minimum and maximum of each bucket (peaks kept exactly)"""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.nan_to_num(_as_float(y))
+    starts = np.unique(np.linspace(0, n, n_out // 2 + 1).astype(np.int64)[:-1])
+    buckets = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+    lows = _first_per_bucket(y == np.minimum.reduceat(y, starts)[buckets], buckets)
+    highs = _first_per_bucket(y == np.maximum.reduceat(y, starts)[buckets], buckets)
+    return np.unique(np.concatenate(([0], lows, highs, [n - 1])))
+
+
+def downsample(df, x, ys, max_points=POINT_BUDGET, method='lttb'):
+    """Rows of df (sorted by x) that keep the shape of every y column within max_points"""
+    if max_points is None or len(df) <= max_points:
+        return df
+
+    per_series = max(max_points // len(ys), 4)
+    if method == 'minmax':
+        keep = [minmax_indices(df[col].to_numpy(), per_series) for col in ys]
+    elif method == 'lttb':
+        keep = [lttb_indices(df[x].to_numpy(), df[col].to_numpy(), per_series) for col in ys]
+    else:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    return df.iloc[np.unique(np.concatenate(keep))]
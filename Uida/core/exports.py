@@ -0,0 +1,108 @@
+"""
+Report Exports for UIDAI Dashboard
+Builds export files on demand, in chunks, cached by (data version, filters, format)
+"""
+
+import glob
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+
+from core.data_loader import CACHE_DIR
+
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+MAX_CACHED_EXPORTS = 32
+CHUNK_ROWS = 100000
+EXCEL_MAX_ROWS = 1048575
+
+# Format label -> (file extension, MIME type, module it needs)
+EXPORT_FORMATS = {
+    "CSV": (".csv", "text/csv", None),
+    "CSV (gzip)": (".csv.gz", "application/gzip", None),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", "pyarrow"),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl")
+}
+
+
+def available_formats():
+    """Formats whose optional writer library is installed"""
+    return [name for name, (_, _, module) in EXPORT_FORMATS.items()
+            if module is None or importlib.util.find_spec(module) is not None]
+
+
+def _chunks(df):
+    for start in range(0, max(len(df), 1), CHUNK_ROWS):
+        yield start, df.iloc[start:start + CHUNK_ROWS]
+
+
+def write_export(df, fmt, path):
+    """Write df to path in CHUNK_ROWS pieces so no single payload is held in memory"""
+    if fmt in ("CSV", "CSV (gzip)"):
+        opener = gzip.open if fmt == "CSV (gzip)" else open
+        with opener(path, 'wt', encoding='utf-8', newline='') as f:
+            for start, chunk in _chunks(df):
+                chunk.to_csv(f, index=False, header=start == 0)
+
+    elif fmt == "Parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for _, chunk in _chunks(df):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression='zstd')
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    elif fmt == "Excel":
+        if len(df) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel exports are limited to {EXCEL_MAX_ROWS:,} rows; use CSV or Parquet")
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Report")
+        sheet.append([str(c) for c in df.columns])
+        for _, chunk in _chunks(df):
+            for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+                sheet.append(list(row))
+        workbook.save(path)
+
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_key(name, version, filters, fmt):
+    raw = json.dumps([name, version, filters, fmt], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def export_file(name, version, filters, fmt, build_frame):
+    """Path of the cached export, building it with build_frame() on a miss"""
+    ext = EXPORT_FORMATS[fmt][0]
+    path = os.path.join(EXPORT_DIR, f"{name}_{export_key(name, version, filters, fmt)}{ext}")
+
+    if os.path.exists(path):
+        os.utime(path)  # mark as recently used
+        return path
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    write_export(build_frame(), fmt, tmp_path)
+    os.replace(tmp_path, path)
+    prune_exports()
+    return path
+
+
+def prune_exports(keep=MAX_CACHED_EXPORTS):
+    """Drop least recently used export files beyond the cache limit"""
+    files = [f for f in glob.glob(os.path.join(EXPORT_DIR, "*")) if ".tmp-" not in f]
+    files.sort(key=os.path.getmtime, reverse=True)
+    for old_path in files[keep:]:
+        try:
+            os.remove(old_path)
+        except OSError:
+            pass
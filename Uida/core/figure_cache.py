@@ -0,0 +1,73 @@
+"""
+Figure Cache for Plotly Charts
+Serialized figure JSON memoized by (chart id, data version, relevant filters), LRU bounded by size
+"""
+
+from collections import OrderedDict
+import json
+import threading
+
+from core.instrumentation import timed
+
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class FigureCache:
+    """Process-wide LRU of figure JSON strings, evicted by total size"""
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            payload = self.entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key, payload):
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= len(self.entries.pop(key))
+            self.entries[key] = payload
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses}
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def figure_key(chart_id, version, deps):
+    return (chart_id, version, json.dumps(deps, sort_keys=True, default=str))
+
+
+@timed('figure')
+def cached_figure(chart_id, version, deps, build):
+    """Figure dict for st.plotly_chart; build() only runs when (chart, version, deps) is new"""
+    key = figure_key(chart_id, version, deps)
+    payload = FIGURE_CACHE.get(key)
+    if payload is None:
+        payload = build().to_json()
+        FIGURE_CACHE.put(key, payload)
+    return json.loads(payload)
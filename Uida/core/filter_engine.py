@@ -0,0 +1,124 @@
+"""
+Indexed Filter Engine shared by all pages
+Frame sorted by (State, Date): date ranges resolve by searchsorted, categories by integer codes
+"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORICAL_DIMENSIONS = ['State', 'District', 'Risk_Level', 'Priority']
+
+# Days are stored offset into [0, 2^32) so (group << 32) | day stays sorted
+DAY_OFFSET = 1 << 31
+NO_DATE = (1 << 32) - 1
+
+
+def _day_key(value):
+    return int(pd.Timestamp(value).to_datetime64().astype('datetime64[D]').astype(np.int64)) + DAY_OFFSET
+
+
+def engine_order(df):
+    """df sorted the way FilterEngine expects (stable by State, then Date)"""
+    sort_cols = [c for c in ['State', 'Date'] if c in df.columns]
+    return df.sort_values(sort_cols, kind='stable').reset_index(drop=True) if sort_cols else df.reset_index(drop=True)
+
+
+class FilterEngine:
+    """Row selection over a frame sorted by (State, Date)"""
+
+    def __init__(self, df, presorted=False, keys=None):
+        # presorted frames (e.g. the mapped shared store, with its stored keys) are used as-is, without a copy
+        self.frame = df if presorted else engine_order(df)
+        n = len(self.frame)
+
+        # Integer codes per categorical dimension (-1 = missing)
+        self.codes = {}
+        self.labels = {}
+        for dim in CATEGORICAL_DIMENSIONS:
+            if dim in self.frame.columns:
+                cat = pd.Categorical(self.frame[dim])
+                self.codes[dim] = cat.codes
+                self.labels[dim] = {label: code for code, label in enumerate(cat.categories)}
+
+        # One contiguous group of rows per state, in frame order
+        state_codes = self.codes.get('State', np.zeros(n, dtype=np.int32))
+        changes = np.flatnonzero(state_codes[1:] != state_codes[:-1]) + 1 if n else np.array([], dtype=np.int64)
+        self.group_starts = np.concatenate([[0], changes]).astype(np.int64) if n else np.array([], dtype=np.int64)
+        self.group_of_state = {int(state_codes[start]): g for g, start in enumerate(self.group_starts)}
+        self.keys = keys if keys is not None else self._build_keys(changes)
+
+    def _build_keys(self, changes):
+        """Composite (group, day) key; globally sorted, so any date range is one searchsorted per group"""
+        n = len(self.frame)
+        group_of_row = np.zeros(n, dtype=np.int64)
+        group_of_row[changes] = 1
+        group_of_row = np.cumsum(group_of_row)
+
+        if 'Date' in self.frame.columns:
+            dates = self.frame['Date'].to_numpy(dtype='datetime64[ns]')
+            days = dates.astype('datetime64[D]').astype(np.int64) + DAY_OFFSET
+            days[np.isnat(dates)] = NO_DATE
+        else:
+            days = np.zeros(n, dtype=np.int64)
+        return (group_of_row << 32) | days
+
+    def __len__(self):
+        return len(self.frame)
+
+    def _code(self, dim, value):
+        return self.labels.get(dim, {}).get(value)
+
+    def select(self, start=None, end=None, **equals):
+        """Row positions for an inclusive date range and exact dimension values (None = any)"""
+        equals = {dim: value for dim, value in equals.items() if value is not None}
+
+        state = equals.pop('State', None)
+        if state is not None:
+            group = self.group_of_state.get(self._code('State', state))
+            if group is None:
+                return np.array([], dtype=np.int64)
+            groups = np.array([group], dtype=np.int64)
+        else:
+            groups = np.arange(len(self.group_starts), dtype=np.int64)
+
+        lo_day = _day_key(start) if start is not None else 0
+        hi_day = _day_key(end) + 1 if end is not None else NO_DATE + 1
+        lo = np.searchsorted(self.keys, (groups << 32) | lo_day, side='left')
+        hi = np.searchsorted(self.keys, (groups << 32) + hi_day, side='left')
+
+        # Concatenate the per-group [lo, hi) ranges without a Python loop
+        lengths = hi - lo
+        offsets = np.repeat(lo - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        rows = np.arange(int(lengths.sum()), dtype=np.int64) + offsets
+
+        # Remaining categorical filters combine as one boolean mask over the candidate rows
+        if equals:
+            mask = np.ones(len(rows), dtype=bool)
+            for dim, value in equals.items():
+                code = self._code(dim, value)
+                if code is None:
+                    return np.array([], dtype=np.int64)
+                mask &= self.codes[dim][rows] == code
+            rows = rows[mask]
+        return rows
+
+    def view(self, rows=None):
+        """DataFrame for selected rows (whole frame when rows is None)"""
+        if rows is None:
+            return self.frame
+        # Rows come back in frame order; one contiguous range (e.g. a single state) is a slice, not a copy
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+            return self.frame.iloc[rows[0]:rows[-1] + 1]
+        return self.frame.take(rows)
+
+    def filter(self, start=None, end=None, **equals):
+        return self.view(self.select(start, end, **equals))
+
+    def options(self, dim, rows=None):
+        """Sorted labels of dim present in the selected rows"""
+        if dim not in self.codes:
+            return []
+        codes = self.codes[dim] if rows is None else self.codes[dim][rows]
+        present = np.flatnonzero(np.bincount(codes[codes >= 0], minlength=len(self.labels[dim])))
+        names = list(self.labels[dim])
+        return sorted(names[c] for c in present)
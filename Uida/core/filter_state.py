@@ -0,0 +1,113 @@
+"""
+Shared Filter State across Pages
+One filter model and data version ("as of") per session; filtered row indices cached in a small per-session LRU
+"""
+
+from collections import OrderedDict
+import streamlit as st
+
+from core.data_loader import data_version, list_versions, version_file
+from core.instrumentation import stage
+
+FILTERS_KEY = "shared_filters"
+VIEW_CACHE_KEY = "shared_view_cache"
+VIEW_CACHE_SIZE = 8
+AS_OF_KEY = "shared_as_of"
+
+FILTER_FIELDS = ['start', 'end', 'State', 'Risk_Level', 'Priority']
+
+
+def get_filters():
+    """The session's filter model (None = no restriction)"""
+    if FILTERS_KEY not in st.session_state:
+        st.session_state[FILTERS_KEY] = {field: None for field in FILTER_FIELDS}
+    return st.session_state[FILTERS_KEY]
+
+
+def _store(widget_key, field, all_label):
+    value = st.session_state[widget_key]
+    get_filters()[field] = None if value == all_label else value
+
+
+def shared_selectbox(container, label, options, field, all_label, key):
+    """Selectbox bound to a shared filter field, so every page shows the same choice"""
+    wanted = get_filters().get(field) or all_label
+    if wanted not in options:
+        wanted = all_label
+    if st.session_state.get(key) != wanted:
+        st.session_state[key] = wanted
+    value = container.selectbox(label, options, key=key, on_change=_store, args=(key, field, all_label))
+    get_filters()[field] = None if value == all_label else value
+    return value
+
+
+def shared_date_input(container, label, field, default, min_value, max_value, key):
+    """Date input bound to a shared filter field (clamped to the data's range)"""
+    wanted = get_filters().get(field) or default
+    wanted = min(max(wanted, min_value), max_value)
+    if st.session_state.get(key) != wanted:
+        st.session_state[key] = wanted
+    value = container.date_input(label, min_value=min_value, max_value=max_value, key=key,
+                                 on_change=_store, args=(key, field, None))
+    get_filters()[field] = value
+    return value
+
+
+def selected_version():
+    """The data version this session views: the one chosen "as of", while it is retained, else the live one"""
+    chosen = st.session_state.get(AS_OF_KEY)
+    if chosen is not None and version_file(chosen) is not None:
+        return chosen
+    return data_version()
+
+
+def _version_label(manifest):
+    created = manifest['created'].replace('T', ' ')[:16]
+    return f"{created} · {manifest['version'][:8]}" + (" (live)" if manifest['live'] else "")
+
+
+def _store_version(widget_key, labels):
+    version = labels.get(st.session_state[widget_key])
+    st.session_state[AS_OF_KEY] = None if version is None or version == data_version() else version
+
+
+def version_selector(container, key):
+    """Sidebar choice of which retained data version to view; hidden while only one exists"""
+    versions = list_versions()
+    if len(versions) < 2:
+        return selected_version()
+    labels = {_version_label(m): m['version'] for m in versions}
+    current = selected_version()
+    wanted = next((label for label, version in labels.items() if version == current), None)
+    if wanted is None:
+        # The viewed data is not a listed version (e.g. a legacy processed file): showing another would mislead
+        return current
+    if st.session_state.get(key) != wanted:
+        st.session_state[key] = wanted
+    container.selectbox("Data as of", list(labels), key=key, on_change=_store_version, args=(key, labels),
+                        help="Earlier versions open instantly from their cached artifacts")
+    if current != data_version():
+        container.caption("🕰️ Viewing an earlier version; pick the live one to return")
+    return current
+
+
+def filtered_view(engine, version, fields):
+    """Engine rows for the shared filters restricted to `fields`, memoized per session"""
+    filters = get_filters()
+    applied = tuple((field, filters.get(field)) for field in fields)
+    cache = st.session_state.setdefault(VIEW_CACHE_KEY, OrderedDict())
+    cache_key = (version, applied)
+
+    with stage('filter') as timing:
+        if cache_key in cache:
+            cache.move_to_end(cache_key)
+            rows = cache[cache_key]
+        else:
+            criteria = dict(applied)
+            rows = engine.select(criteria.pop('start', None), criteria.pop('end', None), **criteria)
+            cache[cache_key] = rows
+            while len(cache) > VIEW_CACHE_SIZE:
+                cache.popitem(last=False)
+        view = engine.view(rows)
+        timing.rows = len(view)
+    return view
@@ -0,0 +1,83 @@
+"""
+Enrolment Forecast Generation
+Trend + seasonality forecast shared by the Forecasting page and headless reports
+"""
+
+import numpy as np
+import pandas as pd
+
+SCENARIO_FACTORS = {
+    "Conservative": 0.85,
+    "Baseline": 1.0,
+    "Optimistic": 1.15
+}
+
+Z_SCORES = {90: 1.645, 95: 1.96, 99: 2.576}
+
+FORECAST_COLUMNS = ['Date', 'Forecast', 'Lower', 'Upper']
+
+
+def historical_series(df):
+    """Daily enrolment totals with a moving-average trend line"""
+    historical = df.groupby('Date')['Enrolments'].sum().reset_index()
+    historical = historical.sort_values('Date').reset_index(drop=True)
+
+    # Simple moving average for trend
+    window = min(7, max(len(historical), 1))
+    historical['MA'] = historical['Enrolments'].rolling(window=window, min_periods=1).mean()
+    return historical
+
+
+def generate_forecast(historical, months=3, scenario="Baseline", confidence=95):
+    """Daily forecast with confidence bounds; returns (forecast frame, daily growth)"""
+    if len(historical) <= 1:
+        return pd.DataFrame(columns=FORECAST_COLUMNS), 0.0
+
+    # Calculate growth rate
+    recent_growth = (historical['MA'].iloc[-1] - historical['MA'].iloc[0]) / len(historical)
+
+    # Generate forecast dates
+    forecast_dates = pd.date_range(
+        start=historical['Date'].max() + pd.Timedelta(days=1),
+        periods=months * 30,
+        freq='D'
+    )
+    i = np.arange(len(forecast_dates))
+
+    # Trend component with scenario factor, plus seasonality (simple sine wave)
+    forecast = (historical['MA'].iloc[-1] + recent_growth * i) * SCENARIO_FACTORS[scenario]
+    forecast = forecast + np.sin(2 * np.pi * i / 30) * (forecast * 0.1)
+
+    # Confidence intervals widen with the horizon
+    margin = Z_SCORES[confidence] * historical['Enrolments'].std() * np.sqrt(1 + i / len(historical))
+
+    forecast_generated = pd.DataFrame({
+        'Date': forecast_dates,
+        'Forecast': np.maximum(0, forecast),
+        'Lower': np.maximum(0, forecast - margin),
+        'Upper': forecast + margin
+    })
+    return forecast_generated, recent_growth
+
+
+def monthly_breakdown(forecast_generated):
+    """Forecast and bounds summed per calendar month"""
+    monthly_forecast = forecast_generated.groupby(forecast_generated['Date'].dt.to_period('M')).agg({
+        'Forecast': 'sum',
+        'Lower': 'sum',
+        'Upper': 'sum'
+    }).reset_index()
+    monthly_forecast = monthly_forecast.rename(columns={'Date': 'Month'})
+    monthly_forecast['Month'] = monthly_forecast['Month'].astype(str)
+    return monthly_forecast
+
+
+def scenario_comparison(forecast_generated, scenario="Baseline"):
+    """The same forecast rescaled to every scenario, in long format"""
+    scenarios_data = []
+    for name, factor in SCENARIO_FACTORS.items():
+        scenario_df = forecast_generated[['Date']].copy()
+        scenario_df['Scenario'] = name
+        scenario_df['Value'] = forecast_generated['Forecast'] * (factor / SCENARIO_FACTORS[scenario])
+        scenarios_data.append(scenario_df)
+    return pd.concat(scenarios_data)
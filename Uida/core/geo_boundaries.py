@@ -0,0 +1,235 @@
+"""
+District Boundaries for the Inclusion Map Choropleth
+Simplifies local GeoJSON offline, stores quantized geometry per detail level
+"""
+
+import glob
+import gzip
+import json
+import os
+import numpy as np
+
+from core.data_loader import CACHE_DIR, DATA_DIR, data_version
+
+BOUNDARY_DIR = os.path.join(DATA_DIR, "boundaries")
+BOUNDARY_FILES = ["districts.geojson", "districts.json"]
+
+# Douglas-Peucker tolerance in degrees (~1 km, ~5 km, ~20 km at India's latitude)
+DETAIL_LEVELS = {
+    "fine": 0.01,
+    "medium": 0.05,
+    "coarse": 0.2
+}
+
+# Map zoom at which each level becomes the default (checked from finest down)
+ZOOM_THRESHOLDS = [(7.0, "fine"), (5.0, "medium"), (0.0, "coarse")]
+
+QUANTIZATION = 100000
+
+DISTRICT_PROPS = ['district', 'District', 'DISTRICT', 'dtname', 'dist_name', 'NAME_2']
+STATE_PROPS = ['state', 'State', 'STATE', 'ST_NM', 'st_nm', 'stname', 'NAME_1']
+
+
+def district_key(state, district):
+    """Join key shared by boundary features and map rows"""
+    return f"{str(state).strip().lower()}|{str(district).strip().lower()}"
+
+
+def district_keys(states, districts):
+    """Vectorized district_key for two pandas Series"""
+    return (states.astype(str).str.strip().str.lower() + "|" +
+            districts.astype(str).str.strip().str.lower())
+
+
+def level_for_zoom(zoom):
+    for min_zoom, level in ZOOM_THRESHOLDS:
+        if zoom >= min_zoom:
+            return level
+    return "coarse"
+
+
+def find_boundary_file():
+    for name in BOUNDARY_FILES:
+        path = os.path.join(BOUNDARY_DIR, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+# ---------------------- SIMPLIFICATION ----------------------
+
+def simplify_ring(points, tolerance):
+    """Douglas-Peucker on one ring; keeps at least a closed triangle"""
+    n = len(points)
+    if n <= 4 or tolerance <= 0:
+        return points
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        a, b = points[start], points[end]
+        seg = points[start + 1:end]
+        dx, dy = b - a
+        norm = np.hypot(dx, dy)
+        if norm == 0:
+            dist = np.hypot(seg[:, 0] - a[0], seg[:, 1] - a[1])
+        else:
+            dist = np.abs(dx * (seg[:, 1] - a[1]) - dy * (seg[:, 0] - a[0])) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+
+    simplified = points[keep]
+    if len(simplified) < 4:
+        simplified = points[np.linspace(0, n - 1, 4).astype(int)]
+    return simplified
+
+
+def _polygons(geometry):
+    """Normalize Polygon/MultiPolygon into a list of polygons of ring arrays"""
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        parts = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        parts = geometry['coordinates']
+    else:
+        return []
+    return [[np.asarray(ring, dtype=float)[:, :2] for ring in polygon] for polygon in parts]
+
+
+def _first_prop(props, candidates):
+    for name in candidates:
+        if props.get(name) not in (None, ""):
+            return props[name]
+    return None
+
+
+def read_source(path):
+    """Read district features as (key, properties, polygons)"""
+    with open(path, encoding='utf-8') as f:
+        collection = json.load(f)
+
+    features = []
+    for feature in collection.get('features', []):
+        props = feature.get('properties') or {}
+        district = _first_prop(props, DISTRICT_PROPS)
+        state = _first_prop(props, STATE_PROPS)
+        polygons = _polygons(feature.get('geometry'))
+        if district is None or not polygons:
+            continue
+        features.append((district_key(state, district), {'State': state, 'District': district}, polygons))
+    return features
+
+
+# ---------------------- QUANTIZED STORAGE ----------------------
+
+def _encode_ring(ring, translate, scale):
+    """Quantize to the integer grid and delta-encode (first point absolute)"""
+    q = np.round((ring - translate) / scale).astype(np.int64)
+    changed = np.ones(len(q), dtype=bool)
+    changed[1:] = np.any(q[1:] != q[:-1], axis=1)
+    q = q[changed]
+    deltas = np.vstack([q[:1], np.diff(q, axis=0)])
+    return deltas.ravel().tolist()
+
+
+def _decode_ring(flat, translate, scale):
+    q = np.cumsum(np.asarray(flat, dtype=np.int64).reshape(-1, 2), axis=0)
+    return np.round(q * scale + translate, 5).tolist()
+
+
+def boundary_cache_path(level, source_version):
+    return os.path.join(CACHE_DIR, f"boundaries_{level}_{source_version}.json.gz")
+
+
+def build_boundary_cache(source=None):
+    """Offline step: write one simplified, quantized file per detail level"""
+    source = source or find_boundary_file()
+    if source is None:
+        return []
+
+    features = read_source(source)
+    if not features:
+        return []
+
+    source_version = data_version(source)
+    all_points = np.vstack([ring for _, _, polygons in features for polygon in polygons for ring in polygon])
+    translate = all_points.min(axis=0)
+    extent = np.maximum(all_points.max(axis=0) - translate, 1e-9)
+    scale = extent / (QUANTIZATION - 1)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for old_path in glob.glob(os.path.join(CACHE_DIR, "boundaries_*.json.gz")):
+        if source_version not in old_path:
+            os.remove(old_path)
+
+    written = []
+    for level, tolerance in DETAIL_LEVELS.items():
+        encoded = []
+        for key, props, polygons in features:
+            encoded.append({
+                'id': key,
+                'properties': props,
+                'polygons': [[_encode_ring(simplify_ring(ring, tolerance), translate, scale) for ring in polygon]
+                             for polygon in polygons]
+            })
+        payload = {
+            'level': level,
+            'tolerance': tolerance,
+            'transform': {'translate': translate.tolist(), 'scale': scale.tolist()},
+            'features': encoded
+        }
+        path = boundary_cache_path(level, source_version)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+
+def load_boundaries(level="medium", source=None):
+    """Return a GeoJSON FeatureCollection (feature id = district_key) or None"""
+    source = source or find_boundary_file()
+    if source is None:
+        return None
+
+    path = boundary_cache_path(level, data_version(source))
+    if not os.path.exists(path):
+        build_boundary_cache(source)
+    if not os.path.exists(path):
+        return None
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        payload = json.load(f)
+
+    translate = np.asarray(payload['transform']['translate'])
+    scale = np.asarray(payload['transform']['scale'])
+    features = []
+    for feature in payload['features']:
+        coordinates = [[_decode_ring(ring, translate, scale) for ring in polygon] for polygon in feature['polygons']]
+        features.append({
+            'type': 'Feature',
+            'id': feature['id'],
+            'properties': feature['properties'],
+            'geometry': {'type': 'MultiPolygon', 'coordinates': coordinates}
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+if __name__ == "__main__":
+    paths = build_boundary_cache()
+    if paths:
+        for p in paths:
+            print(f"✅ {os.path.basename(p)} ({os.path.getsize(p) / 1024:.0f} KB)")
+    else:
+        print(f"ℹ️ No boundary file found. Place districts.geojson in {BOUNDARY_DIR}")
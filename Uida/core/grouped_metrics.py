@@ -0,0 +1,144 @@
+"""
+Grouped Time-Series Metrics per District
+Month-over-month growth, rolling means, volatility and trend slopes from the Enrolments series, in one sorted pass
+"""
+
+import numpy as np
+import pandas as pd
+
+from core.star_schema import district_codes
+
+VALUE_COLUMN = 'Enrolments'
+MEAN_WINDOWS = [3, 6, 12]
+# Months of MoM growth behind the volatility, and of totals behind the trend slope
+VOLATILITY_WINDOW = 6
+TREND_WINDOW = 6
+# Volatility and trend need at least this many months in their window
+MIN_PERIODS = 3
+
+
+def metric_columns(value=VALUE_COLUMN):
+    """Names of the columns add_growth_metrics() writes"""
+    return ([f"{value}_MoM"] + [f"{value}_{w}M_Avg" for w in MEAN_WINDOWS]
+            + [f"{value}_Volatility", f"{value}_Trend"])
+
+
+def monthly_series(df, value=VALUE_COLUMN):
+    """(per-row index into the monthly frame, -1 without a date; monthly frame sorted by district then month)"""
+    dates = pd.to_datetime(df['Date'])
+    valid = dates.notna().to_numpy()
+    month = np.zeros(len(df), dtype=np.int64)
+    month[valid] = (dates.dt.year * 12 + dates.dt.month).to_numpy()[valid]
+    first = month[valid].min() if valid.any() else 0
+    span = int(month.max() - first + 1) if valid.any() else 1
+
+    # One int64 per (district, month): sorting the keys sorts by district, then month
+    keys = district_codes(df['State'], df['District'])[valid] * span + (month[valid] - first)
+    codes, uniques = pd.factorize(keys, sort=True)
+    row_month = np.full(len(df), -1, dtype=np.int64)
+    row_month[valid] = codes
+    # Missing values are skipped; a month without any observed value stays NaN
+    values = df[value].to_numpy(dtype=float)[valid]
+    observed = ~np.isnan(values)
+    totals = np.bincount(codes, weights=np.where(observed, values, 0.0), minlength=len(uniques))
+    counts = np.bincount(codes, weights=observed, minlength=len(uniques))
+    monthly = pd.DataFrame({
+        'district': uniques // span,
+        'month': uniques % span,
+        'value': np.where(counts > 0, totals, np.nan)
+    })
+    return row_month, monthly
+
+
+def _group_mean(values, valid, group_id, groups):
+    """Each row's district mean of the valid values (0 for a district without any)"""
+    counts = np.bincount(group_id, weights=valid, minlength=groups)
+    sums = np.bincount(group_id, weights=np.where(valid, values, 0.0), minlength=groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts > 0, sums / counts, 0.0)[group_id]
+
+
+def _window_sum(values, start):
+    """Sum of values[start[i]:i + 1] for every row i, from one cumulative sum"""
+    total = np.concatenate(([0.0], np.cumsum(values)))
+    return total[1:] - total[start]
+
+
+def grouped_metrics(monthly):
+    """MoM growth, rolling means, volatility and trend per district-month (rows sorted by district, then month).
+
+    Shifts compare neighbouring rows and every window sum is a difference of one cumulative sum, with windows
+    clipped at the district's first row: no per-group work at all. Values are centred on their district's mean
+    first, so the running sums stay small and their differences exact. Windows count a district's observed months.
+    Missing values enter every sum as zero with a count of zero, so they only affect their own district's windows:
+    a rolling mean needs every month of its window, the trend fits the months that have a value.
+    """
+    district = monthly['district'].to_numpy()
+    month = monthly['month'].to_numpy(dtype=float)
+    value = monthly['value'].to_numpy(dtype=float)
+    n = len(monthly)
+    rows = np.arange(n)
+    first_row = np.ones(n, dtype=bool)
+    first_row[1:] = district[1:] != district[:-1]
+    group_id = np.cumsum(first_row) - 1
+    groups = int(group_id[-1]) + 1 if n else 0
+    group_start = np.maximum.accumulate(np.where(first_row, rows, 0))
+    window_start = lambda window: np.maximum(rows - window + 1, group_start)
+
+    # Growth against the previous month of the same district (a gap of more than a month has none)
+    previous = np.roll(value, 1)
+    consecutive = ~first_row & (month - np.roll(month, 1) == 1) & (previous > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = np.where(consecutive, (value - previous) / previous, np.nan)
+    result = pd.DataFrame({'growth': growth})
+
+    every = np.ones(n, dtype=bool)
+    present = ~np.isnan(value)
+    value_mean = _group_mean(value, present, group_id, groups)
+    centred = np.where(present, value - value_mean, 0.0)
+    for window in MEAN_WINDOWS:
+        start = window_start(window)
+        count = rows - start + 1
+        complete = (count >= window) & (_window_sum(present.astype(float), start) == count)
+        result[f"mean_{window}"] = np.where(complete, _window_sum(centred, start) / count + value_mean, np.nan)
+
+    # Sample standard deviation of the growth rates in the window
+    valid = ~np.isnan(growth)
+    growth_centred = np.where(valid, growth - _group_mean(growth, valid, group_id, groups), 0.0)
+    start = window_start(VOLATILITY_WINDOW)
+    count = _window_sum(valid.astype(float), start)
+    total = _window_sum(growth_centred, start)
+    squares = _window_sum(growth_centred ** 2, start)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = np.maximum(squares - total ** 2 / count, 0.0) / (count - 1)
+    result['volatility'] = np.where(count >= MIN_PERIODS, np.sqrt(variance), np.nan)
+
+    # Least-squares slope of value on month over the window's months with a value
+    x = np.where(present, month - _group_mean(month, every, group_id, groups), 0.0)
+    start = window_start(TREND_WINDOW)
+    count = _window_sum(present.astype(float), start)
+    sx, sy = _window_sum(x, start), _window_sum(centred, start)
+    sxy, sxx = _window_sum(x * centred, start), _window_sum(x * x, start)
+    denominator = count * sxx - sx ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (count * sxy - sx * sy) / denominator
+    result['trend'] = np.where((count >= MIN_PERIODS) & (denominator > 1e-9), slope, np.nan)
+    return result
+
+
+def add_growth_metrics(df, value=VALUE_COLUMN):
+    """Write the district metrics of each row's month as columns (every record of a month gets the same values)"""
+    if len(df) == 0 or value not in df.columns:
+        for col in metric_columns(value):
+            df[col] = np.nan
+        return df
+
+    row_month, monthly = monthly_series(df, value)
+    metrics = grouped_metrics(monthly)
+    names = dict(zip(['growth'] + [f"mean_{w}" for w in MEAN_WINDOWS] + ['volatility', 'trend'],
+                     metric_columns(value)))
+    for source, col in names.items():
+        # Index -1 (no date) picks the appended NaN
+        values = np.append(metrics[source].to_numpy(), np.nan)
+        df[col] = values[row_month].round(6)
+    return df
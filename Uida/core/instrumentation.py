@@ -0,0 +1,190 @@
+"""
+Stage Instrumentation for Dashboard Reruns
+Times load/filter/aggregate/score/figure/render stages into a per-process ring buffer
+"""
+
+import functools
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import pandas as pd
+
+STAGES = ['load', 'filter', 'aggregate', 'score', 'figure', 'render']
+PAGE_STAGE = 'page'
+
+RING_SIZE = 20000
+
+# tracemalloc slows every allocation, so only one page run in this many is traced
+MEMORY_SAMPLE_EVERY = 50
+# A traced run that never reached end_run() (st.stop, an exception) stops tracing after this long
+MAX_TRACE_SECONDS = 30
+
+_RECORDS = deque(maxlen=RING_SIZE)
+_RECORDS_LOCK = threading.Lock()
+_LOCAL = threading.local()
+_RUNS = {'count': 0, 'traced_since': None}
+# Script threads of concurrent sessions start and end runs at the same time
+_RUNS_LOCK = threading.Lock()
+
+# Page name used while measuring overhead; its records are not kept
+_CALIBRATION = '(calibration)'
+
+
+def _record(page, stage_name, seconds, rows, peak_bytes):
+    if page == _CALIBRATION:
+        return
+    with _RECORDS_LOCK:
+        _RECORDS.append((time.time(), page, stage_name, seconds, rows, peak_bytes))
+
+
+def current_page():
+    return getattr(_LOCAL, 'page', None)
+
+
+# ====================== STAGES ======================
+
+class stage:
+    """Context manager timing one stage; set .rows inside the block to record a row count"""
+
+    __slots__ = ('name', 'rows', 'started', 'peak', 'peak_base', 'parent')
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.parent = getattr(_LOCAL, 'stage', None)
+        _LOCAL.stage = self
+        self.peak = None
+        if tracemalloc.is_tracing():
+            # Hand the enclosing stage its peak so far before measuring this one from zero
+            current, peak = tracemalloc.get_traced_memory()
+            if self.parent is not None and self.parent.peak is not None:
+                self.parent.peak = max(self.parent.peak, peak - self.parent.peak_base)
+            self.peak_base = current
+            self.peak = 0
+            tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        _LOCAL.stage = self.parent
+        peak = None
+        if self.peak is not None and tracemalloc.is_tracing():
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1] - self.peak_base)
+            if self.parent is not None and self.parent.peak is not None:
+                self.parent.peak = max(self.parent.peak, peak + self.peak_base - self.parent.peak_base)
+        _record(current_page(), self.name, seconds, self.rows, peak)
+        return False
+
+
+def timed(stage_name, rows=None):
+    """Decorator form of stage(); rows(result) gives the row count to record"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name) as s:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    s.rows = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+# ====================== PAGE RUNS ======================
+
+def begin_run(page):
+    """Mark the start of a page run on this thread; returns the token end_run() needs"""
+    _LOCAL.page = page
+    with _RUNS_LOCK:
+        _RUNS['count'] += 1
+        since = _RUNS['traced_since']
+        if since is not None and time.perf_counter() - since > MAX_TRACE_SECONDS:
+            tracemalloc.stop()
+            _RUNS['traced_since'] = None
+        traced = _RUNS['count'] % MEMORY_SAMPLE_EVERY == 0 and not tracemalloc.is_tracing()
+        started = time.perf_counter()
+        if traced:
+            # tracemalloc is process-wide: the peak includes other sessions' allocations meanwhile
+            tracemalloc.start()
+            _RUNS['traced_since'] = started
+    return traced, started
+
+
+def end_run(page, token):
+    """Record the run's total time and stop memory tracing if this run started it"""
+    traced, started = token
+    seconds = time.perf_counter() - started
+    peak = None
+    if traced:
+        with _RUNS_LOCK:
+            # Another run may have timed this trace out and started its own; only stop our own
+            if _RUNS['traced_since'] == started:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                _RUNS['traced_since'] = None
+    _record(page, PAGE_STAGE, seconds, None, peak)
+    _LOCAL.page = None
+    return seconds
+
+
+# ====================== REPORTING ======================
+
+def records():
+    """Snapshot of the ring buffer as a DataFrame"""
+    with _RECORDS_LOCK:
+        rows = list(_RECORDS)
+    return pd.DataFrame(rows, columns=['Time', 'Page', 'Stage', 'Seconds', 'Rows', 'Peak_Bytes'])
+
+
+def stage_summary(df=None, by=('Page', 'Stage')):
+    """Count, p50/p95 seconds, median rows and max traced (process-wide) peak per group"""
+    df = records() if df is None else df
+    by = list(by)
+    if df.empty:
+        return pd.DataFrame(columns=by + ['Calls', 'p50_ms', 'p95_ms', 'Total_s', 'Rows_p50', 'Process_Peak_MB'])
+    df = df.assign(Page=df['Page'].fillna('(background)'))
+    summary = df.groupby(by).agg(
+        Calls=('Seconds', 'size'),
+        p50_ms=('Seconds', lambda s: s.quantile(0.5) * 1000),
+        p95_ms=('Seconds', lambda s: s.quantile(0.95) * 1000),
+        Total_s=('Seconds', 'sum'),
+        Rows_p50=('Rows', 'median'),
+        Process_Peak_MB=('Peak_Bytes', lambda s: s.max() / 1e6)
+    ).reset_index()
+    order = {name: i for i, name in enumerate([PAGE_STAGE] + STAGES)}
+    if 'Stage' in by:
+        summary = summary.sort_values(by, key=lambda col: col.map(order) if col.name == 'Stage' else col)
+    return summary.reset_index(drop=True)
+
+
+def overhead_per_stage(samples=2000):
+    """Seconds one untraced stage() costs, measured in place"""
+    saved = getattr(_LOCAL, 'page', None)
+    _LOCAL.page = _CALIBRATION
+    started = time.perf_counter()
+    for _ in range(samples):
+        with stage('calibration'):
+            pass
+    cost = (time.perf_counter() - started) / samples
+    _LOCAL.page = saved
+    return cost
+
+
+def overhead_ratio(df=None):
+    """Estimated instrumentation share of page time (stage calls x per-stage cost / page time)"""
+    df = records() if df is None else df
+    pages = df[df['Stage'] == PAGE_STAGE]
+    if pages.empty:
+        return None
+    calls = int((df['Stage'] != PAGE_STAGE).sum()) + len(pages)
+    return float(calls * overhead_per_stage() / pages['Seconds'].sum())
+
+
+def clear():
+    with _RECORDS_LOCK:
+        _RECORDS.clear()
@@ -0,0 +1,118 @@
+"""
+Map-Ready Data for the Inclusion Map
+Aggregates districts, attaches coordinates and caches the result per data version
+"""
+
+import os
+import pandas as pd
+
+from core.data_loader import CACHE_DIR, data_version, find_processed_file, prune_cache, read_processed, write_atomic
+from core.geo_boundaries import district_keys
+
+# ==============================================================================
+# 📍 THE REAL GPS ENGINE (Coordinates for YOUR Districts)
+# ==============================================================================
+
+# 1. Precise District Coordinates
+DISTRICT_COORDS = {
+    "Prayagraj": {"lat": 25.4358, "lon": 81.8463},
+    "Varanasi": {"lat": 25.3176, "lon": 82.9739},
+    "Lucknow": {"lat": 26.8467, "lon": 80.9462},
+    "Gurgaon": {"lat": 28.4595, "lon": 77.0266},
+    "Rupnagar": {"lat": 30.9664, "lon": 76.5331},
+    "Tehri Garhwal": {"lat": 30.3800, "lon": 78.4800},
+    "Kargil": {"lat": 34.5539, "lon": 76.1349},
+    "Mumbai": {"lat": 19.0760, "lon": 72.8777},
+    "Pune": {"lat": 18.5204, "lon": 73.8567},
+    "Ahilyanagar": {"lat": 19.0952, "lon": 74.7496},
+    "Ahmedabad": {"lat": 23.0225, "lon": 72.5714},
+    "Jaipur": {"lat": 26.9124, "lon": 75.7873},
+    "Kolkata": {"lat": 22.5726, "lon": 88.3639},
+    "Darjeeling": {"lat": 27.0410, "lon": 88.2663},
+    "Patna": {"lat": 25.5941, "lon": 85.1376},
+    "Anjaw": {"lat": 27.9300, "lon": 96.8000},
+    "Dima Hasao": {"lat": 25.5000, "lon": 93.0000},
+    "Bangalore": {"lat": 12.9716, "lon": 77.5946},
+    "Chennai": {"lat": 13.0827, "lon": 80.2707},
+    "Hyderabad": {"lat": 17.3850, "lon": 78.4867}
+}
+
+# 2. Fallback State Coordinates
+STATE_COORDS = {
+    "Uttar Pradesh": {"lat": 26.8467, "lon": 80.9462},
+    "Maharashtra": {"lat": 19.7515, "lon": 75.7139},
+    "Bihar": {"lat": 25.0961, "lon": 85.3131},
+    "West Bengal": {"lat": 22.9868, "lon": 87.8550},
+    "Madhya Pradesh": {"lat": 22.9734, "lon": 78.6569},
+    "Tamil Nadu": {"lat": 11.1271, "lon": 78.6569},
+    "Rajasthan": {"lat": 27.0238, "lon": 74.2179},
+    "Karnataka": {"lat": 15.3173, "lon": 75.7139},
+    "Gujarat": {"lat": 22.2587, "lon": 71.1924},
+    "Andhra Pradesh": {"lat": 15.9129, "lon": 79.7400},
+    "Delhi": {"lat": 28.7041, "lon": 77.1025},
+    "Punjab": {"lat": 31.1471, "lon": 75.3412},
+    "Haryana": {"lat": 29.0588, "lon": 76.0856},
+    "Uttarakhand": {"lat": 30.0668, "lon": 79.0193},
+    "Ladakh": {"lat": 34.1526, "lon": 77.5770},
+    "Arunachal Pradesh": {"lat": 28.2180, "lon": 94.7278},
+    "Assam": {"lat": 26.2006, "lon": 92.9376},
+    "Chandigarh": {"lat": 30.7333, "lon": 76.7794}
+}
+
+MAP_FILE_PREFIX = "map_"
+
+
+def risk_column(df):
+    """Processed data uses 'Risk_Level', older ingests used 'Risk Level'"""
+    return 'Risk_Level' if 'Risk_Level' in df.columns else 'Risk Level'
+
+
+def attach_coordinates(map_df):
+    """Hybrid mapping: district coordinates first, state centroid as fallback (NaN when neither is known)"""
+    for axis in ['lat', 'lon']:
+        district_axis = {name: c[axis] for name, c in DISTRICT_COORDS.items()}
+        state_axis = {name: c[axis] for name, c in STATE_COORDS.items()}
+        map_df[axis] = map_df['District'].map(district_axis).fillna(map_df['State'].map(state_axis))
+    return map_df
+
+
+def located(map_df):
+    """Rows with coordinates: what point layers can place (the choropleth joins on District_Id instead)"""
+    return map_df.dropna(subset=['lat', 'lon'])
+
+
+def build_map_frame(df):
+    """Aggregate to one row per district with coordinates and risk tier; every district is kept"""
+    risk_col = risk_column(df)
+    map_df = df.groupby(['State', 'District'], observed=True).agg({
+        'Enrolments': 'sum',
+        risk_col: 'first'
+    }).reset_index()
+    map_df['District_Id'] = district_keys(map_df['State'], map_df['District'])
+    return attach_coordinates(map_df).reset_index(drop=True)
+
+
+def map_cache_path(version):
+    return os.path.join(CACHE_DIR, f"{MAP_FILE_PREFIX}{version}.csv")
+
+
+def write_map_artifact(df, version):
+    """Materialize the map frame for a data version and drop versions no longer retained"""
+    map_df = build_map_frame(df)
+    path = map_cache_path(version)
+    write_atomic(map_df, path)
+    prune_cache(MAP_FILE_PREFIX, keep=[path])
+    return map_df
+
+
+def load_map_frame(path=None):
+    """Return the map frame for the current data, building it on first use"""
+    path = path or find_processed_file()
+    if path is None:
+        return None
+
+    version = data_version(path)
+    cached = map_cache_path(version)
+    if os.path.exists(cached):
+        return pd.read_csv(cached)
+    return write_map_artifact(read_processed(path), version)
@@ -0,0 +1,89 @@
+"""
+Streamlit Cache Accessors shared by every page
+One loaded copy of each artifact per data version (live or "as of" a retained one), reused across pages and sessions
+"""
+
+from datetime import datetime
+import streamlit as st
+
+from core.data_loader import version_file
+from core.exports import EXPORT_FORMATS, available_formats, export_file
+from core.forecasting import generate_forecast, historical_series
+from core.instrumentation import stage, timed
+from core.map_data import load_map_frame
+from core.query_engine import open_backend
+from core.rollup_cube import load_cube
+from core.shared_store import load_shared_engine
+from core.snapshot_diff import diff_versions
+
+# The live version, the one sessions are moving off after a refresh and one opened "as of"
+VERSIONS_IN_MEMORY = 3
+
+
+@timed('load')
+@st.cache_resource(show_spinner=False, max_entries=VERSIONS_IN_MEMORY)
+def get_filter_engine(version):
+    """Sorted, code-indexed frame mapped from the shared store; pages must treat engine.frame as read-only"""
+    return load_shared_engine(version_file(version))
+
+
+@timed('load')
+@st.cache_resource(show_spinner=False, max_entries=VERSIONS_IN_MEMORY)
+def get_cube(version):
+    return load_cube(version_file(version))
+
+
+@timed('load')
+@st.cache_resource(show_spinner=False, max_entries=VERSIONS_IN_MEMORY)
+def get_query_backend(version):
+    """DuckDB, SQLite or pandas backend answering aggregate queries for this version"""
+    return open_backend(version_file(version))
+
+
+@timed('load')
+@st.cache_data(show_spinner=False, max_entries=VERSIONS_IN_MEMORY)
+def get_map_frame(version):
+    return load_map_frame(version_file(version))
+
+
+@timed('score', rows=lambda result: len(result[0]))
+@st.cache_data(show_spinner=False, max_entries=64)
+def get_forecast(version, state, months, scenario, confidence):
+    """(historical series, forecast frame, daily growth) for a state (None = All India)"""
+    historical = historical_series(get_filter_engine(version).filter(State=state))
+    forecast_generated, recent_growth = generate_forecast(historical, months, scenario, confidence)
+    return historical, forecast_generated, recent_growth
+
+
+@timed('aggregate', rows=lambda result: len(result.districts) if result is not None else 0)
+@st.cache_data(show_spinner=False, max_entries=VERSIONS_IN_MEMORY)
+def get_version_diff(old_version, new_version):
+    """District-level SnapshotDiff between two retained versions (None once either is pruned)"""
+    return diff_versions(old_version, new_version)
+
+
+def render_chart(figure, **kwargs):
+    """st.plotly_chart, timed as the render stage"""
+    with stage('render'):
+        st.plotly_chart(figure, **kwargs)
+
+
+def export_format_selector(key):
+    return st.selectbox("Export Format", available_formats(), key=key)
+
+
+def export_bytes(name, version, filters, fmt, build_frame):
+    """Contents of the cached export; Streamlit serves a download from memory, so the whole file is read"""
+    with open(export_file(name, version, filters, fmt, build_frame), 'rb') as f:
+        return f.read()
+
+
+def export_button(label, name, build_frame, version, filters, fmt):
+    """Download button whose file is built (or read from the export cache) only on click"""
+    ext, mime, _ = EXPORT_FORMATS[fmt]
+    st.download_button(
+        label=label,
+        data=lambda: export_bytes(name, version, filters, fmt, build_frame),
+        file_name=f"{name}_{datetime.now().strftime('%Y%m%d')}{ext}",
+        mime=mime,
+    )
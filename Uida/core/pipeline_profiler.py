@@ -0,0 +1,216 @@
+"""
+Pipeline Stage Profiler for the Data Processor
+Per-stage wall time, rows, bytes and peak RSS, saved as one JSON run log per pipeline run
+"""
+
+import glob
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from core.data_loader import DATA_DIR
+
+RUN_LOG_DIR = os.path.join(DATA_DIR, "run_logs")
+RETAIN_RUN_LOGS = 200
+
+# A stage is flagged when its rows/second falls this far below the median of recent runs
+REGRESSION_TOLERANCE = 0.25
+COMPARE_WINDOW = 5
+# Stages faster than this are mostly noise and are not compared
+MIN_COMPARE_SECONDS = 0.05
+
+
+# ====================== MEMORY ======================
+
+def reset_peak_rss():
+    """Restart the kernel's peak-RSS counter (Linux); False where that is not possible"""
+    try:
+        with open("/proc/self/clear_refs", 'w') as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    """Peak resident set size in bytes since the last reset (process lifetime elsewhere), or None"""
+    try:
+        with open("/proc/self/status", encoding='ascii') as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(deep=True).sum()) if isinstance(df, pd.DataFrame) else None
+
+
+# ====================== STAGES ======================
+
+class Stage:
+    """One timed stage; call .input(df) / .output(df) to record its rows and bytes"""
+
+    def __init__(self, profiler, name, parent):
+        self.profiler = profiler
+        self.name = name
+        self.parent = parent
+        self.rows_in = self.rows_out = self.bytes_in = self.bytes_out = None
+        self.dropped = None
+        self.children_seconds = 0.0
+        self.max_peak = 0
+
+    def input(self, df):
+        self.rows_in, self.bytes_in = len(df), frame_bytes(df)
+        return df
+
+    def output(self, df):
+        self.rows_out, self.bytes_out = len(df), frame_bytes(df)
+        return df
+
+    def __enter__(self):
+        if self.parent is not None:
+            # Keep the enclosing stage's peak so far before the counter restarts
+            self.parent.max_peak = max(self.parent.max_peak, peak_rss() or 0)
+        self.profiler.stack.append(self)
+        # Reserve the slot so stages are listed in start order even when they nest
+        self.index = len(self.profiler.stages)
+        self.profiler.stages.append(None)
+        self.peak_exact = reset_peak_rss()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        self.profiler.stack.pop()
+        peak = max(peak_rss() or 0, self.max_peak) or None
+        if self.parent is not None:
+            self.parent.children_seconds += seconds
+            self.parent.max_peak = max(self.parent.max_peak, peak or 0)
+
+        dropped = self.dropped
+        if dropped is None and self.rows_in is not None and self.rows_out is not None:
+            dropped = max(self.rows_in - self.rows_out, 0)
+        rows = max(self.rows_in or 0, self.rows_out or 0)
+        self.profiler.stages[self.index] = {
+            'stage': self.name,
+            'parent': self.parent.name if self.parent else None,
+            'seconds': round(seconds, 4),
+            'self_seconds': round(seconds - self.children_seconds, 4),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'dropped_rows': dropped,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'rows_per_sec': round(rows / seconds, 1) if rows and seconds > 0 else None,
+            'peak_rss': peak,
+            'peak_rss_scope': 'stage' if self.peak_exact else 'process',
+            'failed': exc[0] is not None
+        }
+        return False
+
+
+class StageProfiler:
+    """Collects Stage records for one pipeline run (stages may nest)"""
+
+    def __init__(self):
+        self.stages = []
+        self.stack = []
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+
+    def stage(self, name):
+        return Stage(self, name, self.stack[-1] if self.stack else None)
+
+    def run_log(self, **extra):
+        """JSON-ready run record: environment, totals and stages in start order"""
+        return {
+            # Microseconds keep the run log file name unique for runs in the same second
+            'started': self.started_at.isoformat(timespec='microseconds'),
+            'total_seconds': round(time.perf_counter() - self.started, 4),
+            'host': platform.node(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            **extra,
+            'stages': self.stages
+        }
+
+    def report_lines(self):
+        """Human-readable stage table for the validation report"""
+        lines = [f"{'Stage':<22}{'Seconds':>9}{'Rows in':>11}{'Rows out':>11}{'Dropped':>9}{'Peak RSS MB':>13}"]
+        for s in self.stages:
+            name = ("  " if s['parent'] else "") + s['stage']
+            peak = f"{s['peak_rss'] / 1e6:.0f}" if s['peak_rss'] else "-"
+            lines.append(f"{name:<22}{s['seconds']:>9.2f}{_count(s['rows_in']):>11}{_count(s['rows_out']):>11}"
+                         f"{_count(s['dropped_rows']):>9}{peak:>13}")
+        return lines
+
+
+def _count(value):
+    return "-" if value is None else f"{value:,}"
+
+
+# ====================== RUN LOGS ======================
+
+def write_run_log(run, log_dir=RUN_LOG_DIR, keep=RETAIN_RUN_LOGS):
+    """Save run as run_<timestamp>.json in log_dir and prune all but the newest `keep` logs"""
+    os.makedirs(log_dir, exist_ok=True)
+    stamp = run['started'].replace(':', '').replace('-', '').replace('.', '')
+    path = os.path.join(log_dir, f"run_{stamp}.json")
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(run, f, indent=2)
+    os.replace(tmp_path, path)
+
+    for old_path in sorted(glob.glob(os.path.join(log_dir, "run_*.json")))[:-keep]:
+        os.remove(old_path)
+    return path
+
+
+def load_run_logs(log_dir=RUN_LOG_DIR):
+    """Previous run logs, oldest first"""
+    runs = []
+    for path in sorted(glob.glob(os.path.join(log_dir, "run_*.json"))):
+        try:
+            with open(path, encoding='utf-8') as f:
+                runs.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return runs
+
+
+def run_history(runs):
+    """One row per (run, stage), for comparing runs over time"""
+    rows = [{'started': run['started'], **stage} for run in runs for stage in run.get('stages', [])]
+    return pd.DataFrame(rows)
+
+
+def find_regressions(run, previous, window=COMPARE_WINDOW, tolerance=REGRESSION_TOLERANCE):
+    """Stages whose rows/second fell more than `tolerance` below the median of the last `window` runs"""
+    history = run_history(previous[-window:])
+    if history.empty:
+        return []
+    baseline = history.dropna(subset=['rows_per_sec']).groupby('stage')['rows_per_sec'].median()
+
+    regressions = []
+    for stage in run['stages']:
+        name, rate = stage['stage'], stage['rows_per_sec']
+        if rate is None or name not in baseline or stage['seconds'] < MIN_COMPARE_SECONDS:
+            continue
+        change = rate / baseline[name] - 1
+        if change < -tolerance:
+            regressions.append({'stage': name, 'rows_per_sec': rate, 'baseline': float(baseline[name]),
+                                'change': round(float(change), 3)})
+    return regressions
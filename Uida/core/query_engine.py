@@ -0,0 +1,272 @@
+"""
+Embedded Query Engine for Dashboard Aggregations
+Aggregate queries against DuckDB or an indexed SQLite store, with a pandas fallback
+"""
+
+import importlib.util
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from core.data_loader import (
+    CACHE_DIR, data_version, find_processed_file, iter_processed, prune_cache, read_processed
+)
+from core.instrumentation import timed
+
+STORE_FILE_PREFIX = "query_store_"
+STORE_TABLE = "processed"
+STORE_INDEXES = [['State', 'Date'], ['Date'], ['District'], ['Risk_Level']]
+
+# Tried in order by open_backend(); pandas always works
+BACKENDS = ['duckdb', 'sqlite', 'pandas']
+
+AGGREGATES = {
+    'sum': "SUM({col})",
+    'mean': "AVG({col})",
+    'count': "COUNT({col})",
+    'min': "MIN({col})",
+    'max': "MAX({col})",
+    'nunique': "COUNT(DISTINCT {col})"
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _day(value):
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def store_paths(version):
+    base = os.path.join(CACHE_DIR, f"{STORE_FILE_PREFIX}{version}")
+    return base + ".sqlite", base + ".parquet"
+
+
+# ====================== STORE BUILD ======================
+
+def write_query_store(version, path=None, chunksize=100000):
+    """Copy processed data into an indexed SQLite file (and Parquet when pyarrow exists), chunk by chunk"""
+    path = path or find_processed_file()
+    sqlite_path, parquet_path = store_paths(version)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    tmp_sqlite = f"{sqlite_path}.tmp-{os.getpid()}"
+    tmp_parquet = f"{parquet_path}.tmp-{os.getpid()}"
+    parquet_writer = None
+    with_parquet = importlib.util.find_spec("pyarrow") is not None
+    if with_parquet:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+    conn = sqlite3.connect(tmp_sqlite)
+    try:
+        columns = []
+        for chunk in iter_processed(path, chunksize):
+            columns = list(chunk.columns)
+            if with_parquet:
+                table = pa.Table.from_pandas(chunk, preserve_index=False,
+                                             schema=parquet_writer.schema if parquet_writer else None)
+                parquet_writer = parquet_writer or pq.ParquetWriter(tmp_parquet, table.schema)
+                parquet_writer.write_table(table)
+
+            if 'Date' in chunk.columns:
+                chunk['Date'] = chunk['Date'].dt.strftime('%Y-%m-%d')
+            chunk.to_sql(STORE_TABLE, conn, if_exists='append', index=False)
+
+        for cols in STORE_INDEXES:
+            if all(c in columns for c in cols):
+                name = _quote("idx_" + "_".join(cols))
+                conn.execute(f"CREATE INDEX {name} ON {STORE_TABLE} ({', '.join(_quote(c) for c in cols)})")
+        conn.commit()
+    finally:
+        conn.close()
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+    os.replace(tmp_sqlite, sqlite_path)
+    if parquet_writer is not None:
+        os.replace(tmp_parquet, parquet_path)
+
+    prune_cache(STORE_FILE_PREFIX, keep=[sqlite_path, parquet_path])
+    return sqlite_path
+
+
+# ====================== BACKENDS ======================
+
+class SQLBackend:
+    """Builds one parameterized GROUP BY query per aggregate() call"""
+
+    name = None
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+
+    def _check(self, names):
+        unknown = [n for n in names if n != '*' and n not in self.columns]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+
+    @timed('aggregate', rows=len)
+    def aggregate(self, measures, by=None, start=None, end=None, order_by=None, descending=True, limit=None, **equals):
+        """measures: {output name: (function, column)}; equals: column=value or list (None = all)"""
+        by = list(by or [])
+        self._check(by + [col for _, col in measures.values()] + list(equals))
+
+        select = [_quote(c) for c in by]
+        for name, (func, col) in measures.items():
+            select.append(f"{AGGREGATES[func].format(col='*' if col == '*' else _quote(col))} AS {_quote(name)}")
+
+        where, params = [], []
+        if start is not None:
+            where.append('"Date" >= ?')
+            params.append(self._date_param(start))
+        if end is not None:
+            where.append('"Date" <= ?')
+            params.append(self._date_param(end))
+        for col, value in equals.items():
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                where.append(f"{_quote(col)} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                where.append(f"{_quote(col)} = ?")
+                params.append(value)
+
+        sql = f"SELECT {', '.join(select)} FROM {STORE_TABLE}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if by:
+            sql += " GROUP BY " + ", ".join(_quote(c) for c in by)
+            sql += f" ORDER BY {_quote(order_by) if order_by else ', '.join(_quote(c) for c in by)}"
+            if order_by and descending:
+                sql += " DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        result = self._execute(sql, params)
+        if 'Date' in result.columns:
+            result['Date'] = pd.to_datetime(result['Date'])
+        return result
+
+    def _date_param(self, value):
+        return _day(value)
+
+
+class SQLiteBackend(SQLBackend):
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({STORE_TABLE})")]
+        super().__init__(columns)
+
+    def _connect(self):
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+    def _execute(self, sql, params):
+        # One short-lived read-only connection per query keeps Streamlit threads independent
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+
+
+class DuckDBBackend(SQLBackend):
+    name = 'duckdb'
+
+    def __init__(self, source):
+        import duckdb
+
+        self.source = source
+        self.conn = duckdb.connect()
+        reader = "read_parquet" if source.endswith(".parquet") else "read_csv_auto"
+        literal = "'" + source.replace("'", "''") + "'"
+        self.conn.execute(f"CREATE VIEW {STORE_TABLE} AS SELECT * FROM {reader}({literal})")
+        super().__init__(self.conn.execute(f"SELECT * FROM {STORE_TABLE} LIMIT 0").df().columns)
+
+    def _execute(self, sql, params):
+        return self.conn.cursor().execute(sql, params).df()
+
+    def _date_param(self, value):
+        return pd.Timestamp(value).date()
+
+
+class PandasBackend:
+    """Same aggregate() interface over an in-memory frame"""
+
+    name = 'pandas'
+
+    def __init__(self, df):
+        self.df = df
+        self.columns = list(df.columns)
+
+    @timed('aggregate', rows=len)
+    def aggregate(self, measures, by=None, start=None, end=None, order_by=None, descending=True, limit=None, **equals):
+        by = list(by or [])
+        df = self.df
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df['Date'] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= df['Date'] <= pd.Timestamp(end)
+        for col, value in equals.items():
+            if value is None:
+                continue
+            mask &= df[col].isin(value) if isinstance(value, (list, tuple, set)) else df[col] == value
+        df = df[mask]
+
+        named = {}
+        for name, (func, col) in measures.items():
+            if col == '*':
+                named[name] = (by[0] if by else df.columns[0], 'size')
+            else:
+                named[name] = (col, func)
+        if by:
+            result = df.groupby(by, observed=True).agg(**named).reset_index()
+            result = result.sort_values(order_by or by, ascending=not (order_by and descending))
+        else:
+            result = pd.DataFrame({
+                name: [len(df) if func == 'size' else df[col].agg(func)] for name, (col, func) in named.items()
+            })
+        if limit:
+            result = result.head(limit)
+        return result.reset_index(drop=True)
+
+
+def available_backends():
+    found = [name for name in ('duckdb',) if importlib.util.find_spec(name) is not None]
+    return found + ['sqlite', 'pandas']
+
+
+_STORE_LOCK = threading.Lock()
+
+
+def open_backend(path=None, prefer=None):
+    """Query backend for the current processed data, building the store on first use"""
+    path = path or find_processed_file()
+    if path is None:
+        return None
+
+    version = data_version(path)
+    sqlite_path, parquet_path = store_paths(version)
+    try:
+        with _STORE_LOCK:
+            if not os.path.exists(sqlite_path):
+                write_query_store(version, path)
+    except (OSError, sqlite3.Error):
+        pass
+
+    for name in ([prefer] if prefer else []) + BACKENDS:
+        if name not in available_backends():
+            continue
+        if name == 'duckdb':
+            return DuckDBBackend(parquet_path if os.path.exists(parquet_path) else path)
+        if name == 'sqlite' and os.path.exists(sqlite_path):
+            return SQLiteBackend(sqlite_path)
+    return PandasBackend(read_processed(path))
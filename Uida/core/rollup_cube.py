@@ -0,0 +1,175 @@
+"""
+Rollup Cube for Home Page KPIs
+Pre-aggregates measures over (Date, State, Risk_Level, Priority) at ingest time
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+from core.data_loader import CACHE_DIR, data_version, find_processed_file, prune_cache, read_processed
+from core.instrumentation import timed
+from core.star_schema import district_codes
+
+DIMENSIONS = ['Date', 'State', 'Risk_Level', 'Priority']
+MEASURES = ['Records', 'Enrolments', 'Updates', 'Anomalies', 'Confidence_Sum', 'Confidence_Count']
+
+CUBE_FILE_PREFIX = "cube_"
+
+
+# ---------------------- CUBE ----------------------
+
+class RollupCube:
+    """Cells of summed measures plus the distinct (cell, district) pairs, sorted by cell.
+
+    Pairs are two int32 arrays with districts coded 0..n-1, so they grow with the districts present in each
+    cell rather than a fixed sketch per cell, and distinct counts are exact.
+    """
+
+    def __init__(self, cells, pair_cell, pair_district, districts):
+        self.cells = cells
+        self.pair_cell = pair_cell
+        self.pair_district = pair_district
+        self.districts = districts
+
+    @classmethod
+    def build(cls, df):
+        keys = df[DIMENSIONS].copy()
+        measures = pd.DataFrame({
+            'Records': 1,
+            'Enrolments': df['Enrolments'] if 'Enrolments' in df.columns else 0,
+            'Updates': df['Updates'] if 'Updates' in df.columns else 0,
+            'Anomalies': df['Is_Anomaly'].astype(int) if 'Is_Anomaly' in df.columns else 0,
+            'Confidence_Sum': df['Confidence_Score'].fillna(0) if 'Confidence_Score' in df.columns else 0.0,
+            'Confidence_Count': df['Confidence_Score'].notna().astype(int) if 'Confidence_Score' in df.columns else 0
+        }, index=df.index)
+
+        grouped = pd.concat([keys, measures], axis=1).groupby(DIMENSIONS, observed=True, sort=True)
+        cells = grouped[MEASURES].sum().reset_index()
+
+        # Map every row to its cell number, then keep each (cell, district) pair once, in cell order
+        pair_cell = pair_district = np.zeros(0, dtype=np.int32)
+        districts = 0
+        if 'District' in df.columns and len(df):
+            codes, uniques = pd.factorize(district_codes(df['State'], df['District']))
+            districts = len(uniques)
+            # Rows with a missing dimension belong to no cell (ngroup -1)
+            cell_of_row = grouped.ngroup().to_numpy(dtype=np.int64)
+            in_cell = cell_of_row >= 0
+            pairs = np.unique(cell_of_row[in_cell] * districts + codes[in_cell])
+            pair_cell = (pairs // districts).astype(np.int32)
+            pair_district = (pairs % districts).astype(np.int32)
+        return cls(cells, pair_cell, pair_district, districts)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}.npz"
+        np.savez_compressed(
+            tmp_path,
+            pair_cell=self.pair_cell,
+            pair_district=self.pair_district,
+            districts=self.districts,
+            Date=self.cells['Date'].to_numpy(dtype='datetime64[ns]'),
+            **{dim: self.cells[dim].astype(str).to_numpy(dtype=str) for dim in DIMENSIONS[1:]},
+            **{m: self.cells[m].to_numpy() for m in MEASURES}
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """The stored cube, or None for a file written in an older layout"""
+        with np.load(path) as data:
+            if 'pair_district' not in data.files:
+                return None
+            cells = pd.DataFrame({name: data[name] for name in DIMENSIONS + MEASURES})
+            return cls(cells, data['pair_cell'], data['pair_district'], int(data['districts']))
+
+    # --- slicing ---
+    @timed('aggregate', rows=lambda cube: len(cube.cells))
+    def slice(self, start=None, end=None, state=None, risk=None, priority=None):
+        """Sub-cube for an inclusive date range and optional dimension values"""
+        mask = np.ones(len(self.cells), dtype=bool)
+        if start is not None:
+            mask &= (self.cells['Date'] >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            mask &= (self.cells['Date'] <= pd.Timestamp(end)).to_numpy()
+        for dim, value in [('State', state), ('Risk_Level', risk), ('Priority', priority)]:
+            if value is not None:
+                mask &= (self.cells[dim] == value).to_numpy()
+
+        # Cells are in date order, so the selected cells (and their pairs) fall in one window: take views of it
+        selected = np.flatnonzero(mask)
+        if len(selected) == 0:
+            return RollupCube(self.cells.iloc[:0], self.pair_cell[:0], self.pair_district[:0], self.districts)
+        first, last = selected[0], selected[-1]
+        lo, hi = np.searchsorted(self.pair_cell, [first, last + 1])
+        pair_cell, pair_district = self.pair_cell[lo:hi], self.pair_district[lo:hi]
+        if len(selected) == last - first + 1:
+            cells = self.cells.iloc[first:last + 1].reset_index(drop=True)
+            return RollupCube(cells, pair_cell - np.int32(first), pair_district, self.districts)
+
+        # Scattered cells: keep their pairs and renumber the cells 0..k-1
+        keep = mask[pair_cell]
+        renumber = (np.cumsum(mask[first:last + 1]) - 1).astype(np.int32)
+        return RollupCube(self.cells[mask].reset_index(drop=True), renumber[pair_cell[keep] - first],
+                          pair_district[keep], self.districts)
+
+    def values(self, dim):
+        return sorted(self.cells[dim].unique().tolist())
+
+    # --- answers ---
+    @timed('aggregate', rows=len)
+    def by(self, dim):
+        """Measures summed along one dimension"""
+        return self.cells.groupby(dim, observed=True)[MEASURES].sum().reset_index()
+
+    def distinct_districts(self):
+        """Exact count from one flag per district (no sort of the pairs)"""
+        if len(self.pair_district) == 0:
+            return 0
+        seen = np.zeros(self.districts, dtype=bool)
+        seen[self.pair_district] = True
+        return int(np.count_nonzero(seen))
+
+    @timed('aggregate')
+    def totals(self):
+        sums = self.cells[MEASURES].sum()
+        records = int(sums['Records'])
+        return {
+            'records': records,
+            'enrolments': int(sums['Enrolments']),
+            'updates': int(sums['Updates']),
+            'anomalies': int(sums['Anomalies']),
+            'avg_enrolments': float(sums['Enrolments'] / records) if records else 0.0,
+            'avg_confidence': float(sums['Confidence_Sum'] / sums['Confidence_Count']) if sums['Confidence_Count'] else None,
+            'states': int(self.cells['State'].nunique()),
+            'districts': self.distinct_districts()
+        }
+
+
+def cube_cache_path(version):
+    return os.path.join(CACHE_DIR, f"{CUBE_FILE_PREFIX}{version}.npz")
+
+
+def write_cube_artifact(df, version):
+    """Build and store the cube for a data version, dropping versions no longer retained"""
+    cube = RollupCube.build(df)
+    path = cube_cache_path(version)
+    cube.save(path)
+    prune_cache(CUBE_FILE_PREFIX, keep=[path])
+    return cube
+
+
+def load_cube(path=None):
+    """Return the cube for the current data, building it on first use"""
+    path = path or find_processed_file()
+    if path is None:
+        return None
+
+    version = data_version(path)
+    cached = cube_cache_path(version)
+    if os.path.exists(cached):
+        cube = RollupCube.load(cached)
+        if cube is not None:
+            return cube
+    return write_cube_artifact(read_processed(path), version)
@@ -0,0 +1,110 @@
+"""
+Memory-Mapped Column Store shared by Dashboard Processes
+Processed columns written once as .npy files; every worker maps the same pages read-only
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from core.data_loader import CACHE_DIR, data_version, find_processed_file, prune_cache, read_processed
+from core.filter_engine import FilterEngine, engine_order
+
+STORE_DIR_PREFIX = "columns_"
+MANIFEST_FILE = "manifest.json"
+KEYS_FILE = "engine_keys.npy"
+
+
+def store_dir(version):
+    return os.path.join(CACHE_DIR, f"{STORE_DIR_PREFIX}{version}")
+
+
+def _column_kind(series):
+    if pd.api.types.is_bool_dtype(series):
+        return 'bool'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    if pd.api.types.is_numeric_dtype(series):
+        return 'numeric'
+    return 'category'
+
+
+def write_column_store(df, version):
+    """Write df (in FilterEngine row order) as one .npy per column, then swap the folder into place"""
+    df = engine_order(df)
+    path = store_dir(version)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        kind = _column_kind(series)
+        entry = {'name': name, 'kind': kind, 'file': f"{i}.npy"}
+        if kind == 'category':
+            # Strings become integer codes (-1 = missing) plus a small label list
+            cat = pd.Categorical(series)
+            values = cat.codes
+            entry['labels'] = [str(label) for label in cat.categories]
+        elif kind == 'datetime':
+            values = series.to_numpy(dtype='datetime64[ns]')
+        else:
+            values = series.to_numpy()
+        np.save(os.path.join(tmp_path, entry['file']), np.ascontiguousarray(values))
+        columns.append(entry)
+
+    # The filter engine's row keys are shared too, so workers build nothing per row
+    np.save(os.path.join(tmp_path, KEYS_FILE), FilterEngine(df, presorted=True).keys)
+
+    with open(os.path.join(tmp_path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'rows': len(df), 'columns': columns}, f)
+
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Another process published this version first; its copy is identical
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    prune_cache(STORE_DIR_PREFIX, keep=[path])
+    return path
+
+
+def map_column_store(path):
+    """DataFrame whose columns are read-only views of the mapped files (no per-process copy)"""
+    with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    data = {}
+    for entry in manifest['columns']:
+        values = np.load(os.path.join(path, entry['file']), mmap_mode='r')
+        if entry['kind'] == 'category':
+            values = pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(entry['labels']))
+        data[entry['name']] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def load_shared_frame(path=None):
+    """Mapped frame for the current data, writing the store on first use"""
+    path = path or find_processed_file()
+    if path is None:
+        return None
+
+    version = data_version(path)
+    mapped = store_dir(version)
+    if not os.path.exists(os.path.join(mapped, MANIFEST_FILE)):
+        write_column_store(read_processed(path), version)
+    return map_column_store(mapped)
+
+
+def load_shared_engine(path=None):
+    """FilterEngine over the mapped frame and mapped row keys"""
+    path = path or find_processed_file()
+    if path is None:
+        return None
+    df = load_shared_frame(path)
+    keys = np.load(os.path.join(store_dir(data_version(path)), KEYS_FILE), mmap_mode='r')
+    return FilterEngine(df, presorted=True, keys=keys)
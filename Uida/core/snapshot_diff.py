@@ -0,0 +1,152 @@
+"""
+Snapshot Diff between Data Versions
+District-by-district comparison of two processed versions: new, removed and changed districts, risk moves, score deltas
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from core.data_loader import normalize_types, version_file
+from core.star_schema import DATE_CODE, DISTRICT_CODE, MANIFEST_FILE, StarSchema, district_codes, has_star, star_dir
+
+KEY = ['State', 'District']
+TIER_COLUMN = 'Risk_Level'
+# Compared as labels / as numbers (new minus old)
+LABEL_COLUMNS = [TIER_COLUMN, 'Priority']
+SCORE_COLUMNS = ['Anomaly_Score', 'MEGR', 'Volatility_Score', 'UPI_score_latest', 'Confidence_Score',
+                 'Enrolments', 'Updates']
+# Score deltas at or below this are float noise from re-processing, not a change
+DELTA_TOLERANCE = 1e-9
+
+STATUSES = ['new', 'removed', 'changed', 'unchanged']
+
+
+# ====================== SNAPSHOTS ======================
+
+def _latest_rows(district_code, date_code):
+    """Position of each district's latest row: one grouped argmax over integer codes, no sort of the full table"""
+    return pd.Series(date_code).groupby(district_code, sort=False).idxmax().to_numpy()
+
+
+def _available_columns(path):
+    if has_star(path):
+        with open(os.path.join(star_dir(path), MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)['columns']
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def district_snapshot(path):
+    """One row per (State, District): its latest date with the compared label and score columns"""
+    available = _available_columns(path)
+    columns = [c for c in KEY + ['Date'] + LABEL_COLUMNS + SCORE_COLUMNS if c in available]
+
+    if has_star(path):
+        # Only the needed fact columns are read; codes are already integers
+        star = StarSchema.load(star_dir(path), columns=columns)
+        rows = _latest_rows(star.facts[DISTRICT_CODE].to_numpy(), star.facts[DATE_CODE].to_numpy())
+        star.facts = star.facts.iloc[rows].reset_index(drop=True)
+        snapshot = star.to_frame()
+    else:
+        df = normalize_types(pd.read_csv(path, usecols=columns))
+        dates = df['Date'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        rows = _latest_rows(district_codes(df['State'], df['District']), dates)
+        snapshot = df.iloc[rows].reset_index(drop=True)
+
+    # Plain string keys, so two versions with different category sets join directly
+    for col in KEY + [c for c in LABEL_COLUMNS if c in snapshot.columns]:
+        snapshot[col] = snapshot[col].astype(str).where(snapshot[col].notna())
+    return snapshot
+
+
+# ====================== DIFF ======================
+
+def _differs(old, new):
+    """Elementwise old != new, where two missing values count as equal"""
+    return (old != new) & ~(old.isna() & new.isna())
+
+
+class SnapshotDiff:
+    """Per-district comparison; `districts` has Status, <col>_old / <col>_new for labels and <col>_delta for scores"""
+
+    def __init__(self, districts, old_version=None, new_version=None):
+        self.districts = districts
+        self.old_version = old_version
+        self.new_version = new_version
+
+    @classmethod
+    def build(cls, old, new, old_version=None, new_version=None):
+        """Join two district snapshots on (State, District) and classify every district"""
+        merged = old.merge(new, on=KEY, how='outer', suffixes=('_old', '_new'), indicator=True, sort=True)
+        both = merged['_merge'] == 'both'
+
+        changed = np.zeros(len(merged), dtype=bool)
+        for col in LABEL_COLUMNS:
+            if f"{col}_old" in merged.columns and f"{col}_new" in merged.columns:
+                changed |= _differs(merged[f"{col}_old"], merged[f"{col}_new"]).to_numpy()
+        for col in SCORE_COLUMNS:
+            if f"{col}_old" in merged.columns and f"{col}_new" in merged.columns:
+                delta = merged[f"{col}_new"].astype(float) - merged[f"{col}_old"].astype(float)
+                merged[f"{col}_delta"] = delta
+                # A value that appears or disappears has no delta but is still a change
+                appeared = _differs(merged[f"{col}_old"], merged[f"{col}_new"]) & delta.isna()
+                changed |= ((delta.abs() > DELTA_TOLERANCE) | appeared).to_numpy()
+
+        status = np.select([merged['_merge'] == 'right_only', merged['_merge'] == 'left_only', both & changed],
+                           ['new', 'removed', 'changed'], default='unchanged')
+        merged.insert(len(KEY), 'Status', pd.Categorical(status, categories=STATUSES))
+        score_columns = [c for c in SCORE_COLUMNS if c in old.columns or c in new.columns]
+        keep = KEY + ['Status'] + [c for c in merged.columns if c.startswith('Date_')] \
+            + [f"{col}_{side}" for col in LABEL_COLUMNS for side in ('old', 'new') if f"{col}_{side}" in merged.columns] \
+            + [f"{col}_{side}" for col in score_columns for side in ('old', 'new', 'delta')
+               if f"{col}_{side}" in merged.columns]
+        return cls(merged[keep], old_version, new_version)
+
+    def slice(self, state=None):
+        """The same comparison restricted to one state (None = all)"""
+        if state is None:
+            return self
+        return SnapshotDiff(self.districts[self.districts['State'] == state].reset_index(drop=True),
+                            self.old_version, self.new_version)
+
+    def counts(self):
+        """Districts per status"""
+        counts = self.districts['Status'].value_counts()
+        return {status: int(counts.get(status, 0)) for status in STATUSES}
+
+    def transitions(self):
+        """Districts per (From, To) risk tier, for districts in both versions whose tier moved"""
+        old_col, new_col = f"{TIER_COLUMN}_old", f"{TIER_COLUMN}_new"
+        if old_col not in self.districts.columns or new_col not in self.districts.columns:
+            return pd.DataFrame(columns=['From', 'To', 'Districts'])
+        moved = self.districts[(self.districts['Status'] == 'changed')
+                               & _differs(self.districts[old_col], self.districts[new_col])]
+        table = moved.groupby([old_col, new_col], dropna=False).size().reset_index()
+        table.columns = ['From', 'To', 'Districts']
+        return table.sort_values('Districts', ascending=False, ignore_index=True)
+
+    def changes(self):
+        """Districts that are new, removed or changed"""
+        return self.districts[self.districts['Status'] != 'unchanged'].reset_index(drop=True)
+
+    def top_movers(self, column='Anomaly_Score', n=10):
+        """Changed districts with the largest absolute delta in `column`"""
+        delta = f"{column}_delta"
+        if delta not in self.districts.columns:
+            return self.districts.head(0)
+        changed = self.districts[self.districts['Status'] == 'changed']
+        return changed.loc[changed[delta].abs().nlargest(n).index].reset_index(drop=True)
+
+
+def diff_files(old_path, new_path, old_version=None, new_version=None):
+    return SnapshotDiff.build(district_snapshot(old_path), district_snapshot(new_path), old_version, new_version)
+
+
+def diff_versions(old_version, new_version):
+    """SnapshotDiff between two retained versions, or None if either is no longer on disk"""
+    old_path, new_path = version_file(old_version), version_file(new_version)
+    if old_path is None or new_path is None:
+        return None
+    return diff_files(old_path, new_path, old_version, new_version)
@@ -0,0 +1,171 @@
+"""
+Star Schema for Processed Data
+District and date dimensions with integer codes, and a narrow fact table of codes and measures
+"""
+
+import importlib.util
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+STAR_DIR = "star"
+MANIFEST_FILE = "manifest.json"
+TABLES = ['districts', 'dates', 'facts']
+
+DISTRICT_CODE = 'District_Code'
+DATE_CODE = 'Date_Code'
+# Columns that live in a dimension instead of on every fact row
+DISTRICT_COLUMNS = ['State', 'District']
+DATE_COLUMNS = ['Date', 'Month_Year', 'Year', 'Month']
+
+
+# ====================== CODES ======================
+
+def category_codes(values):
+    """(int codes, labels) of a column; categoricals reuse their codes, anything else is factorized once"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    codes, labels = pd.factorize(values, sort=True)
+    return codes, labels
+
+
+def district_codes(states, districts):
+    """One int64 per (state, district) pair, equal exactly when both labels are (missing = -1 per part)"""
+    state_codes, _ = category_codes(states)
+    codes, labels = category_codes(districts)
+    return (state_codes.astype(np.int64) + 1) * (len(labels) + 1) + codes.astype(np.int64) + 1
+
+
+def row_keys(states, districts, dates):
+    """One int64 per (state, district, date), for deduplicating without hashing strings"""
+    date_codes, labels = pd.factorize(dates, use_na_sentinel=False)
+    return district_codes(states, districts) * max(len(labels), 1) + date_codes
+
+
+def _dense(keys):
+    """Dense codes 0..n-1 in key order, and the first row of each"""
+    codes, uniques = pd.factorize(keys, sort=True)
+    first = np.full(len(uniques), len(keys), dtype=np.int64)
+    np.minimum.at(first, codes, np.arange(len(keys)))
+    return codes.astype(np.int32), first
+
+
+def _as_labels(values, codes):
+    """Per-row labels rebuilt as a categorical over a small dimension column (no per-row strings)"""
+    value_codes, labels = pd.factorize(values, sort=True)
+    return pd.Categorical.from_codes(value_codes[codes], categories=labels)
+
+
+# ====================== SCHEMA ======================
+
+class StarSchema:
+    """districts (State, District), dates (Date parts) and facts keyed by their integer codes"""
+
+    def __init__(self, districts, dates, facts, columns):
+        self.districts = districts
+        self.dates = dates
+        self.facts = facts
+        # Column order of the flat frame this schema was built from
+        self.columns = columns
+
+    @classmethod
+    def build(cls, df):
+        """Split a processed (flat) frame into dimensions and facts"""
+        district_keys = district_codes(df['State'], df['District'])
+        district_code, district_rows = _dense(district_keys)
+        districts = df[DISTRICT_COLUMNS].iloc[district_rows].reset_index(drop=True)
+        districts.insert(0, DISTRICT_CODE, np.arange(len(districts), dtype=np.int32))
+
+        date_cols = [c for c in DATE_COLUMNS if c in df.columns]
+        date_code, date_rows = _dense(df['Date'].to_numpy(dtype='datetime64[ns]').view(np.int64))
+        dates = df[date_cols].iloc[date_rows].reset_index(drop=True)
+        dates.insert(0, DATE_CODE, np.arange(len(dates), dtype=np.int32))
+
+        measures = [c for c in df.columns if c not in DISTRICT_COLUMNS + date_cols]
+        facts = df[measures].reset_index(drop=True)
+        for col in measures:
+            # Repeated labels (risk tier, priority, flags) are stored as codes too
+            if not (pd.api.types.is_numeric_dtype(facts[col]) or pd.api.types.is_bool_dtype(facts[col])):
+                facts[col] = facts[col].astype('category')
+        facts.insert(0, DATE_CODE, date_code)
+        facts.insert(0, DISTRICT_CODE, district_code)
+        return cls(districts, dates, facts, list(df.columns))
+
+    def to_frame(self, columns=None):
+        """Flat frame for display: dimension labels come back as categoricals, facts are not copied"""
+        columns = columns or self.columns
+        district_code = self.facts[DISTRICT_CODE].to_numpy()
+        date_code = self.facts[DATE_CODE].to_numpy()
+        data = {}
+        for col in columns:
+            if col in DISTRICT_COLUMNS:
+                data[col] = _as_labels(self.districts[col], district_code)
+            elif col in self.dates.columns:
+                values = self.dates[col]
+                numeric = pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values)
+                data[col] = values.to_numpy()[date_code] if numeric else _as_labels(values, date_code)
+            else:
+                data[col] = self.facts[col]
+        return pd.DataFrame(data, copy=False)
+
+    def memory_usage(self):
+        """Bytes held by each table"""
+        return {name: int(getattr(self, name).memory_usage(deep=True).sum()) for name in TABLES}
+
+    # --- files ---
+    def save(self, directory):
+        """Write the three tables (Parquet when pyarrow is installed, else CSV) and swap the folder into place"""
+        tmp_dir = f"{directory}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        fmt = 'parquet' if importlib.util.find_spec("pyarrow") is not None else 'csv'
+        for name in TABLES:
+            table = getattr(self, name)
+            path = os.path.join(tmp_dir, f"{name}.{fmt}")
+            if fmt == 'parquet':
+                table.to_parquet(path, index=False)
+            else:
+                table.to_csv(path, index=False)
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'format': fmt, 'columns': self.columns, 'rows': len(self.facts),
+                       'districts': len(self.districts), 'dates': len(self.dates)}, f)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_dir, directory)
+        return directory
+
+    @classmethod
+    def load(cls, directory, columns=None):
+        """Read the tables back; with `columns`, only those fact columns (plus the codes) are read"""
+        with open(os.path.join(directory, MANIFEST_FILE), encoding='utf-8') as f:
+            manifest = json.load(f)
+        fmt = manifest['format']
+        columns = [c for c in manifest['columns'] if columns is None or c in columns]
+        tables = {}
+        for name in TABLES:
+            path = os.path.join(directory, f"{name}.{fmt}")
+            fact_columns = None
+            if name == 'facts':
+                fact_columns = [DISTRICT_CODE, DATE_CODE] + [c for c in columns if c not in DISTRICT_COLUMNS + DATE_COLUMNS]
+            if fmt == 'parquet':
+                tables[name] = pd.read_parquet(path, columns=fact_columns)
+            else:
+                tables[name] = pd.read_csv(path, usecols=fact_columns)
+        if fmt == 'csv':
+            tables['dates']['Date'] = pd.to_datetime(tables['dates']['Date'], errors='coerce')
+        return cls(tables['districts'], tables['dates'], tables['facts'], columns)
+
+
+def star_dir(processed_path):
+    """Star tables written next to a processed file (inside its version folder)"""
+    return os.path.join(os.path.dirname(processed_path), STAR_DIR)
+
+
+def has_star(processed_path):
+    return os.path.exists(os.path.join(star_dir(processed_path), MANIFEST_FILE))
+
+
+def write_star(df, processed_path):
+    return StarSchema.build(df).save(star_dir(processed_path))
@@ -0,0 +1,118 @@
+"""
+Startup Subsystem for the Dashboard
+Deferred heavy imports, background cache warm-up and per-page cold-start timing
+"""
+
+import importlib
+import sys
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+
+from core.data_loader import data_version
+from core.filter_state import version_selector
+from core.instrumentation import begin_run, end_run
+from core.page_data import (
+    VERSIONS_IN_MEMORY, get_cube, get_filter_engine, get_forecast, get_map_frame, get_query_backend
+)
+
+# Forecast settings the Forecasting page opens with
+DEFAULT_FORECAST = (3, "Baseline", 95)
+
+# Pages reachable by URL but kept out of the sidebar
+HIDDEN_PAGES = ['Performance']
+
+# First-run seconds of each page in this process
+COLD_STARTS = {}
+_COLD_START_LOCK = threading.Lock()
+
+
+class LazyModule:
+    """Module proxy that imports on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name):
+    """The module if already imported, else a proxy that imports it when first used"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def _warm_charts():
+    # The first figure pays for loading plotly's trace validators
+    go = importlib.import_module("plotly.graph_objects")
+    importlib.import_module("plotly.express")
+    go.Figure(go.Scatter(x=[0], y=[0])).to_json()
+
+
+def warm_up(version):
+    """Fill the shared caches for the default All India views; returns seconds per step"""
+    steps = [
+        ('data', lambda: get_filter_engine(version)),
+        ('query backend', lambda: get_query_backend(version)),
+        ('cube', lambda: get_cube(version)),
+        ('map', lambda: get_map_frame(version)),
+        ('forecast', lambda: get_forecast(version, None, *DEFAULT_FORECAST)),
+        ('charts', _warm_charts),
+    ]
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    print(f"🔥 Warm-up {version}: " + ", ".join(f"{name} {secs:.2f}s" for name, secs in timings.items()))
+    return timings
+
+
+@st.cache_resource(show_spinner=False, max_entries=VERSIONS_IN_MEMORY)
+def _start_warm_up(version):
+    # Once per process and data version, off the requesting session's critical path
+    thread = threading.Thread(target=warm_up, args=(version,), name="cache-warm-up", daemon=True)
+    add_script_run_ctx(thread)
+    thread.start()
+    return thread
+
+
+def start_boot_warm_up():
+    """Server-boot hook: start the warm-up for the current data version before any session connects"""
+    version = data_version()
+    if version is not None:
+        _start_warm_up(version)
+    return version
+
+
+def _hide_pages():
+    selectors = ", ".join(f'[data-testid="stSidebarNav"] li:has(a[href$="/{name}"])' for name in HIDDEN_PAGES)
+    st.markdown(f"<style>{selectors} {{display: none;}}</style>", unsafe_allow_html=True)
+
+
+def begin_page(page):
+    """Call at the top of a page: starts the run's instrumentation (and the warm-up if boot did not)"""
+    run = begin_run(page)
+    version = data_version()
+    if version is not None:
+        # Already started at boot (app.py) unless the data version changed since, or the server runs Home.py directly
+        _start_warm_up(version)
+    _hide_pages()
+    version_selector(st.sidebar, key=f"{page.lower()}_as_of")
+    return run
+
+
+def end_page(page, run):
+    """Call at the end of a page: records the run and reports the first (cold) run of each page"""
+    elapsed = end_run(page, run)
+    with _COLD_START_LOCK:
+        first = page not in COLD_STARTS
+        if first:
+            COLD_STARTS[page] = elapsed
+    if first:
+        print(f"⏱️ Cold start {page}: {elapsed:.2f}s")
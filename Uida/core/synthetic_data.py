@@ -0,0 +1,231 @@
+"""
+Seeded Synthetic UIDAI Data
+Master/forecast files with correlated risk scores and labelled anomalies, generated in independent chunks
+"""
+
+import math
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+STATES = [
+    'Andaman and Nicobar Islands', 'Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 'Chandigarh',
+    'Chhattisgarh', 'Dadra and Nagar Haveli', 'Daman and Diu', 'Delhi', 'Goa', 'Gujarat', 'Haryana',
+    'Himachal Pradesh', 'Jammu and Kashmir', 'Jharkhand', 'Karnataka', 'Kerala', 'Ladakh', 'Lakshadweep',
+    'Madhya Pradesh', 'Maharashtra', 'Manipur', 'Meghalaya', 'Mizoram', 'Nagaland', 'Odisha', 'Puducherry',
+    'Punjab', 'Rajasthan', 'Sikkim', 'Tamil Nadu', 'Telangana', 'Tripura', 'Uttar Pradesh', 'Uttarakhand',
+    'West Bengal'
+]
+
+MASTER_COLUMNS = ['state', 'district', 'latest_month', 'ARS_latest', 'MEGR_latest', 'EVI_latest',
+                  'UPI_score_latest', 'UPI_flag_latest', 'Risk_Tier', 'Enrolments']
+FORECAST_COLUMNS = ['state', 'month', 'forecast', 'lower', 'upper', 'pressure', 'confidence_flag']
+TRUTH_COLUMNS = ['state', 'district', 'latest_month', 'anomaly_type', 'magnitude']
+
+# Spearman correlations of ARS, MEGR, EVI, UPI in UIDAI_dashboard_master.csv
+SCORE_SPEARMAN = np.array([
+    [1.00, -0.69, 0.27, 0.81],
+    [-0.69, 1.00, 0.07, -0.35],
+    [0.27, 0.07, 1.00, 0.14],
+    [0.81, -0.35, 0.14, 1.00]
+])
+# UPI takes sixths; cumulative share of each step in the sample file
+UPI_LEVELS = np.arange(6) / 6
+UPI_CUMULATIVE = np.array([0.010, 0.062, 0.358, 0.876, 0.999, 1.0])
+
+# Share of a district's score variation that is persistent (district character) vs per record
+DISTRICT_WEIGHT = 0.7
+
+ANOMALY_TYPES = ['enrolment_spike', 'enrolment_drop', 'risk_score']
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    """Shape of a synthetic dataset; rows = states x districts x months x records per month"""
+    states: int = len(STATES)
+    districts_per_state: int = 25
+    months: int = 12
+    records_per_month: int = 1
+    start: str = '2025-01-01'
+    anomaly_rate: float = 0.002
+    seed: int = 0
+    chunk_rows: int = 500_000
+
+    @property
+    def districts(self):
+        return self.states * self.districts_per_state
+
+    @property
+    def rows_per_district(self):
+        return self.months * self.records_per_month
+
+    @property
+    def rows(self):
+        return self.districts * self.rows_per_district
+
+    @property
+    def districts_per_chunk(self):
+        return max(1, self.chunk_rows // self.rows_per_district)
+
+    @property
+    def chunks(self):
+        return math.ceil(self.districts / self.districts_per_chunk)
+
+    def to_dict(self):
+        return {**asdict(self), 'rows': self.rows, 'chunks': self.chunks}
+
+
+def config_for_rows(rows, months=12, max_districts=20000, **kwargs):
+    """Config of at least (and close to) `rows` rows: districts first, then months and daily records"""
+    states = min(len(STATES), max(1, rows // months))
+    districts_per_state = max(1, min(max_districts // states, rows // (states * months)))
+    per_district = math.ceil(rows / (states * districts_per_state))
+    records = 1
+    if per_district > 2 * months:
+        records = min(28, math.ceil(per_district / months))
+    months = math.ceil(per_district / records)
+    return SyntheticConfig(states=states, districts_per_state=districts_per_state, months=months,
+                           records_per_month=records, **kwargs)
+
+
+def chunk_seeds(config):
+    """One independent RNG stream per chunk, so output does not depend on the worker count"""
+    return np.random.SeedSequence(config.seed).spawn(config.chunks)
+
+
+def _score_cholesky():
+    # Gaussian copula: Spearman rho -> Pearson correlation of the latent normals
+    pearson = 2 * np.sin(np.pi * SCORE_SPEARMAN / 6)
+    return np.linalg.cholesky(pearson)
+
+
+def _scores(latent):
+    """Map correlated standard normals (n x 4) onto the sample file's score distributions"""
+    z_ars, z_megr, z_evi, z_upi = latent.T
+    ars = np.clip(0.17 + 0.07 * z_ars + 0.02 * np.maximum(z_ars, 0) ** 2, 0, 1)
+    megr = np.maximum(0.02 + 0.16 * z_megr + 0.05 * np.sign(z_megr) * z_megr ** 2, -1)
+    evi = np.exp(np.log(0.45) + 0.45 * z_evi)
+    upi = UPI_LEVELS[np.searchsorted(UPI_CUMULATIVE, ndtr(z_upi))]
+    return ars, megr, evi, upi
+
+
+def _risk_tier(ars, megr):
+    tier = np.full(len(ars), 'Low Risk', dtype=object)
+    tier[(ars > 0.35) | (megr < -0.5)] = 'Medium Risk'
+    tier[ars > 0.6] = 'High Risk'
+    return tier
+
+
+# ====================== CHUNKS ======================
+
+def generate_chunk(config, index, seed_sequence=None):
+    """(master rows, ground-truth anomalies) for chunk `index`; the same on every call"""
+    rng = np.random.default_rng(seed_sequence or chunk_seeds(config)[index])
+    first = index * config.districts_per_chunk
+    district_ids = np.arange(first, min(first + config.districts_per_chunk, config.districts))
+    n_districts, per_district = len(district_ids), config.rows_per_district
+    n = n_districts * per_district
+    cholesky = _score_cholesky()
+
+    # District character (persistent) plus per-record variation, both with the same correlation
+    district_latent = rng.standard_normal((n_districts, 4)) @ cholesky.T
+    record_latent = rng.standard_normal((n, 4)) @ cholesky.T
+    latent = np.sqrt(DISTRICT_WEIGHT) * np.repeat(district_latent, per_district, axis=0) \
+        + np.sqrt(1 - DISTRICT_WEIGHT) * record_latent
+    ars, megr, evi, upi = _scores(latent)
+
+    # Dates: every month, `records_per_month` consecutive days from the 1st
+    month_starts = pd.date_range(config.start, periods=config.months, freq='MS')
+    month_idx = np.tile(np.repeat(np.arange(config.months), config.records_per_month), n_districts)
+    day_idx = np.tile(np.arange(config.records_per_month), n_districts * config.months)
+    dates = month_starts.values[month_idx] + day_idx.astype('timedelta64[D]')
+
+    # Enrolments: district size x growth trend x yearly seasonality x noise
+    base = np.repeat(rng.lognormal(np.log(2000), 0.6, n_districts), per_district)
+    growth = np.repeat(0.01 * district_latent[:, 1], per_district)
+    season = 1 + 0.08 * np.sin(2 * np.pi * (month_starts.month.values[month_idx] - 1) / 12)
+    enrolments = base * (1 + growth) ** month_idx * season * rng.lognormal(0, 0.1, n) / config.records_per_month
+
+    # Injected anomalies, recorded as ground truth
+    flagged = np.flatnonzero(rng.random(n) < config.anomaly_rate)
+    kinds = rng.integers(0, len(ANOMALY_TYPES), len(flagged))
+    magnitude = np.empty(len(flagged))
+    for k, kind in enumerate(ANOMALY_TYPES):
+        rows = flagged[kinds == k]
+        if kind == 'enrolment_spike':
+            factor = rng.uniform(3, 6, len(rows))
+            enrolments[rows] *= factor
+        elif kind == 'enrolment_drop':
+            factor = rng.uniform(0.05, 0.3, len(rows))
+            enrolments[rows] *= factor
+            megr[rows] = rng.uniform(-1, -0.6, len(rows))
+        else:
+            factor = rng.uniform(3, 10, len(rows))
+            ars[rows] = rng.uniform(0.62, 0.95, len(rows))
+            evi[rows] *= factor
+        magnitude[kinds == k] = factor
+
+    state_ids = district_ids // config.districts_per_state
+    state_names = np.array(STATES[:config.states])[np.repeat(state_ids, per_district)]
+    district_names = np.repeat(
+        [f"{STATES[s]} District {d % config.districts_per_state + 1}" for s, d in zip(state_ids, district_ids)],
+        per_district)
+
+    master = pd.DataFrame({
+        'state': state_names,
+        'district': district_names,
+        'latest_month': dates,
+        'ARS_latest': ars.round(6),
+        'MEGR_latest': megr.round(6),
+        'EVI_latest': evi.round(6),
+        'UPI_score_latest': upi.round(6),
+        'UPI_flag_latest': np.where(upi >= 0.5, 'Yes', 'No'),
+        'Risk_Tier': _risk_tier(ars, megr),
+        'Enrolments': np.maximum(enrolments.round(), 0).astype(np.int64)
+    })
+    truth = master.loc[flagged, ['state', 'district', 'latest_month']].assign(
+        anomaly_type=np.array(ANOMALY_TYPES)[kinds], magnitude=magnitude.round(3))
+    return master, truth.reset_index(drop=True)
+
+
+def monthly_state_totals(master):
+    """Enrolments per (state, month): the small summary each chunk returns for the forecast file"""
+    months = master['latest_month'].dt.to_period('M').dt.to_timestamp()
+    return master.groupby(['state', months])['Enrolments'].sum().rename_axis(['state', 'month']).reset_index()
+
+
+def generate_frame(config):
+    """The whole dataset in memory (for tests and benchmarks; use the CLI for large sizes)"""
+    parts = [generate_chunk(config, i, seed) for i, seed in enumerate(chunk_seeds(config))]
+    return (pd.concat([p[0] for p in parts], ignore_index=True),
+            pd.concat([p[1] for p in parts], ignore_index=True))
+
+
+# ====================== FORECAST FILE ======================
+
+def build_forecast(totals, horizon=3, window=6):
+    """Forecast-file rows per state: linear trend over the last `window` months, 95% bounds"""
+    rows = []
+    totals = totals.groupby(['state', 'month'], as_index=False)['Enrolments'].sum()
+    for state, part in totals.groupby('state'):
+        recent = part.sort_values('month').tail(window)
+        y = recent['Enrolments'].to_numpy(dtype=float)
+        x = np.arange(len(y))
+        slope, intercept = np.polyfit(x, y, 1) if len(y) > 1 else (0.0, y[-1])
+        spread = np.std(y - (slope * x + intercept)) if len(y) > 2 else 0.1 * y[-1]
+        last_month = recent['month'].max()
+        for h in range(1, horizon + 1):
+            forecast = intercept + slope * (len(y) - 1 + h)
+            margin = 1.96 * spread * np.sqrt(h)
+            rows.append({
+                'state': state,
+                'month': (last_month + pd.DateOffset(months=h)).strftime('%Y-%m-%d'),
+                'forecast': round(forecast, 2),
+                'lower': round(forecast - margin, 2),
+                'upper': round(forecast + margin, 2),
+                'pressure': 'High Demand' if forecast > y[-1] else 'Declining',
+                'confidence_flag': 'OK' if forecast and 2 * margin / abs(forecast) < 0.5 else 'LOW'
+            })
+    return pd.DataFrame(rows, columns=FORECAST_COLUMNS)
@@ -6,7 +6,21 @@ Validates, cleans, and enriches data with advanced features
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import json
 import os
+import shutil
+
+from core.data_loader import (
+    PROCESSED_NAME, current_version_dir, data_version, new_version_dir, publish_version, write_manifest
+)
+from core.geo_boundaries import build_boundary_cache
+from core.grouped_metrics import add_growth_metrics
+from core.map_data import write_map_artifact
+from core.pipeline_profiler import StageProfiler, find_regressions, load_run_logs, write_run_log
+from core.query_engine import write_query_store
+from core.rollup_cube import write_cube_artifact
+from core.shared_store import write_column_store
+from core.star_schema import category_codes, row_keys, write_star
 
 class DataValidator:
     """Validates and cleans UIDAI data"""
@@ -15,6 +29,7 @@ class DataValidator:
         self.master_file = master_file
         self.forecast_file = forecast_file
         self.validation_report = []
+        self.profiler = StageProfiler()
         
     def generate_history(self, df):
         """Generates synthetic history if only one month exists"""
@@ -58,24 +73,37 @@ class DataValidator:
         print("🔍 Starting Data Validation...")
         
         df = pd.read_csv(self.master_file)
-        initial_rows = len(df)
+        initial_rows = self.raw_rows = len(df)
+        self.validation_report.append(f"Master file: {os.path.basename(self.master_file)} ({initial_rows} rows)")
         
         # 1. GENERATE HISTORY (Crucial Step)
-        df = self.generate_history(df)
+        with self.profiler.stage('history') as stage:
+            df = stage.output(self.generate_history(stage.input(df)))
+        generated_rows = len(df)
         
         # 2. Validate numeric ranges
         numeric_cols = ['ARS_latest', 'MEGR_latest', 'EVI_latest', 'UPI_score_latest']
         for col in numeric_cols:
             if col in df.columns:
-                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+                 values = pd.to_numeric(df[col], errors='coerce')
+                 self.validation_report.append(f"{col}: {int(values.isna().sum())} missing/non-numeric values set to 0")
+                 df[col] = values.fillna(0)
 
         # 3. Validate Risk Tiers
         valid_risk_tiers = ['High Risk', 'Medium Risk', 'Low Risk']
         if 'Risk_Tier' in df.columns:
-            df.loc[~df['Risk_Tier'].isin(valid_risk_tiers), 'Risk_Tier'] = 'Medium Risk'
+            invalid = ~df['Risk_Tier'].isin(valid_risk_tiers)
+            self.validation_report.append(f"Risk_Tier: {int(invalid.sum())} invalid values set to 'Medium Risk'")
+            df.loc[invalid, 'Risk_Tier'] = 'Medium Risk'
         
-        # 4. Deduplicate
-        df = df.drop_duplicates(subset=['state', 'district', 'latest_month'], keep='first')
+        # 4. Deduplicate on one integer key per row; state and district stay categorical from here on,
+        #    so the forecast join and every later groupby work on their codes instead of the strings
+        df['state'] = df['state'].astype('category')
+        df['district'] = df['district'].astype('category')
+        keys = row_keys(df['state'], df['district'], df['latest_month'])
+        df = df[~pd.Series(keys).duplicated(keep='first').to_numpy()].reset_index(drop=True)
+        self.duplicates_removed = generated_rows - len(df)
+        self.validation_report.append(f"Duplicates (state, district, month) removed: {self.duplicates_removed}")
         
         print(f"✅ Validation complete. Rows: {initial_rows} → {len(df)}")
         return df
@@ -133,6 +161,10 @@ class DataValidator:
         df['Month_Year'] = df['Date'].dt.strftime('%b %Y')
         df['Year'] = df['Date'].dt.year
         df['Month'] = df['Date'].dt.month
+
+        # 9. Time-varying signals from each district's own Enrolments series
+        #    (the *_latest scores only describe the latest month)
+        df = add_growth_metrics(df)
         
         print(f"✅ Enrichment complete. Added calculated fields.")
         return df
@@ -157,11 +189,16 @@ class DataValidator:
             available_cols = [c for c in cols_to_merge if c in latest_forecast.columns]
             
             if 'State' in available_cols:
-                df = df.merge(
-                    latest_forecast[available_cols],
-                    on='State',
-                    how='left'
-                )
+                # Join through the state codes: one lookup row per state, taken by code (no string hashing per row)
+                df = df.copy(deep=False)
+                codes, states = category_codes(df['State'])
+                lookup = latest_forecast[available_cols].set_index('State').reindex(states)
+                missing = codes < 0
+                for col in lookup.columns:
+                    values = lookup[col].to_numpy()
+                    if missing.any():
+                        values = np.append(values.astype(float), np.nan)
+                    df[col] = values[codes]
                 if 'forecast' in df.columns:
                     df = df.rename(columns={'forecast': 'State_Forecast'})
             
@@ -172,40 +209,134 @@ class DataValidator:
             return df
 
     def generate_validation_report(self):
-        return "Validation Complete. History Generated."
+        """Validation findings followed by the per-stage profile of this run"""
+        lines = ["UIDAI Data Validation Report", f"Generated: {datetime.now():%Y-%m-%d %H:%M:%S}", ""]
+        lines += self.validation_report
+        lines += ["", "Pipeline stages:"] + self.profiler.report_lines()
+        return "\n".join(lines) + "\n"
 
     def process(self):
-        df = self.validate_master_data()
-        df = self.enrich_data(df)
-        df = self.merge_forecast_data(df)
+        with self.profiler.stage('validate') as stage:
+            df = stage.output(self.validate_master_data())
+            stage.rows_in, stage.dropped = self.raw_rows, self.duplicates_removed
+        with self.profiler.stage('enrich') as stage:
+            df = stage.output(self.enrich_data(stage.input(df)))
+        with self.profiler.stage('forecast_merge') as stage:
+            df = stage.output(self.merge_forecast_data(stage.input(df)))
         return df, self.generate_validation_report()
 
-def main():
+def find_raw_inputs(input_dir):
+    """Auto-detect the master and forecast CSVs in input_dir: (master path or None, forecast path or None)"""
+    master_file = None
+    forecast_file = None
+    for f in sorted(os.listdir(input_dir)):
+        if "master" in f.lower() and f.endswith(".csv"): master_file = os.path.join(input_dir, f)
+        if "forecast" in f.lower() and f.endswith(".csv"): forecast_file = os.path.join(input_dir, f)
+    return master_file, forecast_file
+
+
+def input_signature(input_dir):
+    """(name, mtime, size) of the raw inputs, to tell whether they changed since a run"""
+    return [[os.path.basename(path), os.stat(path).st_mtime_ns, os.stat(path).st_size]
+            for path in find_raw_inputs(input_dir) if path is not None]
+
+
+def record_run(profiler, save_dir, **info):
+    """Structured run log, compared against recent runs so a throughput drop is visible right away"""
+    run = profiler.run_log(**info)
+    regressions = find_regressions(run, load_run_logs())
+    run['regressions'] = regressions
+    if save_dir is not None:
+        with open(os.path.join(save_dir, "run_log.json"), 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+    log_path = write_run_log(run)
+    print(f"📊 Run log: {log_path} ({run['total_seconds']:.1f}s)")
+    for r in regressions:
+        print(f"⚠️ {r['stage']} throughput {r['rows_per_sec']:,.0f} rows/s is {-r['change']:.0%} "
+              f"below the recent median ({r['baseline']:,.0f} rows/s)")
+    return run
+
+
+def build_version(validator, processed_df, signature, version_dir, current_dir):
+    """Write the processed data, manifest and artifacts into version_dir, then publish it unless unchanged"""
+    profiler = validator.profiler
+    processed_path = os.path.join(version_dir, PROCESSED_NAME)
+    with profiler.stage('save') as stage:
+        stage.input(processed_df)
+        processed_df.to_csv(processed_path, index=False)
+    with open(os.path.join(version_dir, "inputs.json"), 'w', encoding='utf-8') as f:
+        json.dump(signature, f)
+
+    # Content-addressed version: every cache keys on this hash, so identical output changes nothing
+    manifest = write_manifest(version_dir, rows=len(processed_df), columns=list(processed_df.columns),
+                              inputs=signature)
+    version = manifest['version']
+    live_dir = current_version_dir()
+    if live_dir is not None and data_version(os.path.join(live_dir, PROCESSED_NAME)) == version:
+        # Record the new inputs on the live version so the refresh service does not run again
+        with open(os.path.join(live_dir, "inputs.json"), 'w', encoding='utf-8') as f:
+            json.dump(signature, f)
+        shutil.rmtree(version_dir, ignore_errors=True)
+        print(f"ℹ️ Output unchanged (version {version}); the live version stays published.")
+        # Still logged: unchanged refreshes are the steadiest baseline for spotting a throughput drop
+        record_run(profiler, None, version=version, version_dir=os.path.basename(live_dir),
+                   inputs=signature, rows=len(processed_df), published=False, unchanged=True)
+        return os.path.join(live_dir, PROCESSED_NAME)
+
+    # Pre-build the map layer, KPI cube, query store and shared columns so pages only render
+    with profiler.stage('artifacts') as stage:
+        stage.input(processed_df)
+        write_map_artifact(processed_df, version)
+        write_cube_artifact(processed_df, version)
+        write_query_store(version, processed_path)
+        write_column_store(processed_df, version)
+        write_star(processed_df, processed_path)
+        build_boundary_cache()
+    
+    # Fix for Unicode Error (writing report with utf-8)
+    report = validator.generate_validation_report()
+    for report_dir in [version_dir, os.path.join(current_dir, "data")]:
+        with open(os.path.join(report_dir, "validation_report.txt"), 'w', encoding='utf-8') as f:
+            f.write(report)
+
+    record_run(profiler, version_dir, version=version, version_dir=os.path.basename(version_dir),
+               inputs=signature, rows=len(processed_df), published=True)
+
+    # Atomic swap: the next rerun of every session sees the new version
+    publish_version(version_dir)
+    print(f"✅ Success! Processed data contains {len(processed_df)} rows "
+          f"({os.path.basename(version_dir)}, version {version}).")
+    return processed_path
+
+
+def run_pipeline(input_dir=None):
+    """Process the raw inputs into a new data version and publish it; returns the processed file path"""
     current_dir = os.path.dirname(os.path.abspath(__file__))
+    input_dir = input_dir or current_dir
     
     # Auto-detect files
-    master_file = None
-    forecast_file = None
-    for f in os.listdir(current_dir):
-        if "master" in f.lower() and f.endswith(".csv"): master_file = f
-        if "forecast" in f.lower() and f.endswith(".csv"): forecast_file = f
-            
+    master_file, forecast_file = find_raw_inputs(input_dir)
     if not master_file:
         print("❌ Master file not found. Please rename your data file to include 'master'.")
-        return
+        return None
+    signature = input_signature(input_dir)
 
     validator = DataValidator(master_file, forecast_file)
-    processed_df, report = validator.process()
-    
-    # Save
-    os.makedirs(os.path.join(current_dir, "data"), exist_ok=True)
-    processed_df.to_csv(os.path.join(current_dir, "data", "processed_data.csv"), index=False)
+    processed_df, _ = validator.process()
     
-    # Fix for Unicode Error (writing report with utf-8)
-    with open(os.path.join(current_dir, "data", "validation_report.txt"), 'w', encoding='utf-8') as f:
-        f.write(report)
-        
-    print(f"✅ Success! Processed data contains {len(processed_df)} rows.")
+    # Save into a fresh version directory; readers keep using the old one until publish
+    version_dir = new_version_dir()
+    try:
+        return build_version(validator, processed_df, signature, version_dir, current_dir)
+    except BaseException:
+        # A failed run leaves no folder behind to be listed or to take a retention slot
+        if current_version_dir() != version_dir:
+            shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+
+
+def main():
+    run_pipeline()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
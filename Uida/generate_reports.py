@@ -0,0 +1,135 @@
+"""
+Bulk Report Generator for UIDAI Dashboard
+Builds risk, anomaly and forecast reports for every state without Streamlit
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from core.anomaly import DEFAULT_SENSITIVITY, DEFAULT_SEVERITY_FILTER, score_anomalies, state_summary
+from core.data_loader import APP_DIR, data_version, find_processed_file
+from core.exports import EXPORT_FORMATS, available_formats, write_export
+from core.forecasting import SCENARIO_FACTORS, Z_SCORES, generate_forecast, historical_series, monthly_breakdown, scenario_comparison
+from core.shared_store import load_shared_engine
+
+NATIONAL = "All India"
+
+# Every worker maps the same shared column store
+_ENGINE = None
+
+
+def _init_worker(path):
+    global _ENGINE
+    _ENGINE = load_shared_engine(path)
+
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def build_reports(df, options):
+    """The same report frames the Home, Anomaly and Forecasting pages export"""
+    reports = {}
+    if 'Risk_Level' in df.columns:
+        reports['high_risk_report'] = df[df['Risk_Level'] == 'High Risk']
+
+    _, anomalies = score_anomalies(df, options['sensitivity'], options['severity'])
+    reports['anomaly_report_all'] = anomalies
+    reports['critical_anomalies'] = anomalies[anomalies['Severity_Level'].isin(['Critical', 'High'])]
+    reports['state_summary'] = state_summary(anomalies)
+
+    if 'Date' in df.columns and 'Enrolments' in df.columns:
+        historical = historical_series(df)
+        forecast_generated, _ = generate_forecast(historical, options['months'], options['scenario'], options['confidence'])
+        reports['daily_forecast'] = forecast_generated
+        if len(forecast_generated):
+            reports['monthly_forecast'] = monthly_breakdown(forecast_generated)
+            reports['forecast_scenarios'] = scenario_comparison(forecast_generated, options['scenario'])
+    return reports
+
+
+def run_task(state, formats, bundle_dir, options):
+    """Worker: build one state's reports once and write them in every format"""
+    df = _ENGINE.filter(State=None if state == NATIONAL else state)
+    out_dir = os.path.join(bundle_dir, slugify(state))
+    os.makedirs(out_dir, exist_ok=True)
+
+    written = []
+    for name, frame in build_reports(df, options).items():
+        for fmt in formats:
+            path = os.path.join(out_dir, f"{name}{EXPORT_FORMATS[fmt][0]}")
+            write_export(frame, fmt, path)
+            written.append({'state': state, 'report': name, 'format': fmt,
+                            'rows': len(frame), 'file': os.path.relpath(path, bundle_dir)})
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate per-state UIDAI report bundles")
+    parser.add_argument("--output", default=os.path.join(APP_DIR, "reports"), help="Folder for report bundles")
+    parser.add_argument("--states", nargs="*", help="States to include (default: all states plus All India)")
+    parser.add_argument("--formats", nargs="*", default=["CSV"], choices=list(EXPORT_FORMATS), help="Export formats")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--months", type=int, default=3, help="Forecast horizon in months")
+    parser.add_argument("--scenario", default="Baseline", choices=list(SCENARIO_FACTORS))
+    parser.add_argument("--confidence", type=int, default=95, choices=list(Z_SCORES))
+    parser.add_argument("--sensitivity", type=int, default=DEFAULT_SENSITIVITY)
+    parser.add_argument("--zip", action="store_true", help="Also write the bundle as a .zip archive")
+    args = parser.parse_args()
+
+    data_path = find_processed_file()
+    if data_path is None:
+        print("❌ Processed data not found. Run enchanced_data_processor.py first.")
+        return
+
+    missing = [f for f in args.formats if f not in available_formats()]
+    if missing:
+        print(f"❌ Missing writer library for: {', '.join(missing)}")
+        return
+
+    started = time.time()
+    states = args.states or [NATIONAL] + load_shared_engine(data_path).options('State')
+    options = {
+        'sensitivity': args.sensitivity,
+        'severity': DEFAULT_SEVERITY_FILTER,
+        'months': args.months,
+        'scenario': args.scenario,
+        'confidence': args.confidence
+    }
+
+    bundle_dir = os.path.join(args.output, f"report_bundle_{datetime.now().strftime('%Y%m%d')}")
+    os.makedirs(bundle_dir, exist_ok=True)
+    print(f"📦 Building {len(states)} state(s) in {len(args.formats)} format(s) with {args.workers} workers...")
+
+    files = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(data_path,)) as pool:
+        # One task per state: the scoring and forecast are the expensive part, the writers are not
+        futures = [pool.submit(run_task, state, args.formats, bundle_dir, options) for state in states]
+        for future in as_completed(futures):
+            files.extend(future.result())
+
+    manifest = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'data_version': data_version(data_path),
+        'options': options,
+        'seconds': round(time.time() - started, 2),
+        'files': sorted(files, key=lambda f: f['file'])
+    }
+    with open(os.path.join(bundle_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    if args.zip:
+        archive = shutil.make_archive(bundle_dir, 'zip', bundle_dir)
+        print(f"🗜️ Archive: {archive}")
+
+    print(f"✅ Wrote {len(files)} reports to {bundle_dir} in {manifest['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Synthetic Dataset Generator for UIDAI Dashboard
+Writes seeded master, forecast and anomaly ground-truth files in parallel chunks with bounded memory
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from core.data_loader import DATA_DIR
+from core.synthetic_data import (
+    MASTER_COLUMNS, TRUTH_COLUMNS, SyntheticConfig, build_forecast, chunk_seeds, config_for_rows,
+    generate_chunk, monthly_state_totals
+)
+
+MASTER_FILE = "synthetic_master.csv"
+FORECAST_FILE = "synthetic_forecast.csv"
+TRUTH_FILE = "synthetic_anomalies.csv"
+MANIFEST_FILE = "synthetic_manifest.json"
+
+
+def _part_paths(parts_dir, index):
+    return (os.path.join(parts_dir, f"master-{index:05d}.csv"),
+            os.path.join(parts_dir, f"truth-{index:05d}.csv"))
+
+
+def _write_csv(df, path):
+    """Headerless CSV; pyarrow's writer is ~10x faster than pandas when it is installed"""
+    if importlib.util.find_spec("pyarrow") is None:
+        df.to_csv(path, index=False, header=False, date_format='%Y-%m-%d')
+        return
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.set_column(2, 'latest_month', table.column('latest_month').cast(pa.date32()))
+    # Generated names never contain commas or quotes, so no quoting is needed
+    pa_csv.write_csv(table, path, pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+
+
+def write_part(config, index, seed_sequence, parts_dir):
+    """Generate one chunk and write it (headerless) to its own part files; returns its small summary"""
+    master, truth = generate_chunk(config, index, seed_sequence)
+    master_path, truth_path = _part_paths(parts_dir, index)
+    _write_csv(master, master_path)
+    _write_csv(truth, truth_path)
+    return index, len(master), len(truth), monthly_state_totals(master)
+
+
+def _concatenate(columns, part_paths, output_path):
+    """Stream the part files, in order, behind one header; each part is removed once copied"""
+    tmp_path = f"{output_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as out:
+        out.write((",".join(columns) + "\n").encode())
+        for path in part_paths:
+            with open(path, 'rb') as part:
+                shutil.copyfileobj(part, out, 4 * 1024 * 1024)
+            os.remove(path)
+    os.replace(tmp_path, output_path)
+
+
+def generate(config, output_dir, workers=None):
+    """Write the dataset for config into output_dir; returns the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    parts_dir = os.path.join(output_dir, f".parts-{os.getpid()}")
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    os.makedirs(parts_dir)
+    started = time.time()
+    seeds = chunk_seeds(config)
+    print(f"🧪 {config.rows:,} rows in {config.chunks} chunk(s) "
+          f"({config.states} states x {config.districts_per_state} districts x {config.months} months "
+          f"x {config.records_per_month} records)")
+
+    totals, rows, anomalies = [], 0, 0
+    try:
+        if workers == 1 or config.chunks == 1:
+            results = (write_part(config, i, seed, parts_dir) for i, seed in enumerate(seeds))
+            for index, n, n_truth, summary in results:
+                rows, anomalies = rows + n, anomalies + n_truth
+                totals.append(summary)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(write_part, config, i, seed, parts_dir) for i, seed in enumerate(seeds)]
+                for done, future in enumerate(futures, start=1):
+                    index, n, n_truth, summary = future.result()
+                    rows, anomalies = rows + n, anomalies + n_truth
+                    totals.append(summary)
+                    if done % 10 == 0 or done == len(futures):
+                        print(f"   {done}/{len(futures)} chunks ({rows:,} rows)")
+
+        parts = [_part_paths(parts_dir, i) for i in range(config.chunks)]
+        _concatenate(MASTER_COLUMNS, [p[0] for p in parts], os.path.join(output_dir, MASTER_FILE))
+        _concatenate(TRUTH_COLUMNS, [p[1] for p in parts], os.path.join(output_dir, TRUTH_FILE))
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+    build_forecast(pd.concat(totals, ignore_index=True)).to_csv(os.path.join(output_dir, FORECAST_FILE), index=False)
+
+    manifest = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'config': config.to_dict(),
+        'rows': rows,
+        'anomalies': anomalies,
+        'seconds': round(time.time() - started, 2),
+        'files': {name: os.path.getsize(os.path.join(output_dir, name))
+                  for name in [MASTER_FILE, FORECAST_FILE, TRUTH_FILE]}
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✅ {rows:,} rows and {anomalies:,} labelled anomalies written to {output_dir} ({manifest['seconds']}s)")
+    return manifest
+
+
+def main():
+    defaults = SyntheticConfig()
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic UIDAI dataset")
+    parser.add_argument("--output", default=os.path.join(DATA_DIR, "synthetic"), help="Output folder")
+    parser.add_argument("--rows", type=int, help="Approximate total rows (overrides the shape options)")
+    parser.add_argument("--states", type=int, default=defaults.states, help="Number of states (max 37)")
+    parser.add_argument("--districts-per-state", type=int, default=defaults.districts_per_state)
+    parser.add_argument("--months", type=int, default=defaults.months)
+    parser.add_argument("--records-per-month", type=int, default=defaults.records_per_month,
+                        help="Daily records per district and month (max 28)")
+    parser.add_argument("--start", default=defaults.start, help="First month (YYYY-MM-DD)")
+    parser.add_argument("--anomaly-rate", type=float, default=defaults.anomaly_rate, help="Share of rows with an injected anomaly")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--chunk-rows", type=int, default=defaults.chunk_rows, help="Rows per chunk (bounds memory per worker)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    args = parser.parse_args()
+
+    options = dict(start=args.start, anomaly_rate=args.anomaly_rate, seed=args.seed, chunk_rows=args.chunk_rows)
+    if args.rows:
+        config = config_for_rows(args.rows, **options)
+    else:
+        if not 1 <= args.states <= defaults.states:
+            parser.error(f"--states must be between 1 and {defaults.states}")
+        if not 1 <= args.records_per_month <= 28:
+            parser.error("--records-per-month must be between 1 and 28")
+        config = SyntheticConfig(states=args.states, districts_per_state=args.districts_per_state, months=args.months,
+                                 records_per_month=args.records_per_month, **options)
+    generate(config, args.output, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,466 @@
+"""
+Load Test for UIDAI Dashboard
+Drives the five pages with N concurrent sessions, on one streamlit server or in isolated AppTest processes, and reports latency
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import importlib.util
+import io
+import json
+import logging
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from core.data_loader import APP_DIR, DATA_DIR
+from core.pipeline_profiler import peak_rss, reset_peak_rss
+
+PAGES = {
+    'Home': "Home.py",
+    'Overview': "pages/Overview.py",
+    'Forecasting': "pages/Forecasting.py",
+    'Anomaly_Detection': "pages/Anomaly_Detection.py",
+    'Inclusion_Map': "pages/Inclusion_Map.py"
+}
+RESULTS_DIR = os.path.join(DATA_DIR, "load_tests")
+
+# Widget types a simulated user changes; buttons and downloads are left alone
+WIDGET_KINDS = ['selectbox', 'multiselect', 'radio', 'slider', 'date_input', 'checkbox', 'toggle', 'number_input']
+# Share of actions that open another page instead of changing a widget
+SWITCH_PAGE_SHARE = 0.3
+PERCENTILES = [50, 90, 95, 99]
+RUN_TIMEOUT = 120
+SERVER_START_TIMEOUT = 60
+# Production entry point: Home.py plus the boot-time cache warm-up
+SERVER_APP = "app.py"
+MODES = ['process', 'server']
+
+
+def current_rss(pid='self'):
+    """Resident set size in bytes of a process (Linux), or None"""
+    try:
+        with open(f"/proc/{pid}/status", encoding='ascii') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+# ====================== INTERACTIONS ======================
+
+def _random_date(rng, low, high):
+    return low + timedelta(days=rng.randint(0, max((high - low).days, 0)))
+
+
+def _random_number(rng, low, high, step, like):
+    steps = int(round((high - low) / step)) if step else 0
+    value = low + step * rng.randint(0, max(steps, 0))
+    return int(value) if isinstance(like, int) else round(value, 6)
+
+
+def randomize_widget(widget, kind, rng):
+    """Give one widget a random valid value; returns the value set"""
+    if kind == 'selectbox':
+        index = rng.randrange(len(widget.options))
+        widget.select_index(index)
+        return widget.options[index]
+    if kind == 'radio':
+        value = rng.choice(widget.options)
+    elif kind == 'multiselect':
+        value = rng.sample(list(widget.options), rng.randint(1, len(widget.options)))
+    elif kind in ('checkbox', 'toggle'):
+        value = not widget.value
+    elif kind == 'date_input':
+        low, high = widget.min, widget.max
+        if isinstance(widget.value, (tuple, list)):
+            value = tuple(sorted([_random_date(rng, low, high), _random_date(rng, low, high)]))
+        else:
+            value = _random_date(rng, low, high)
+    else:
+        # slider / number_input (a tuple value is a range slider)
+        pick = lambda like: _random_number(rng, widget.min, widget.max, widget.step, like)
+        value = tuple(sorted([pick(v) for v in widget.value])) if isinstance(widget.value, (tuple, list)) \
+            else pick(widget.value)
+    widget.set_value(value)
+    return value
+
+
+def _settable(kind, widget):
+    if getattr(widget, 'disabled', False):
+        return False
+    if kind in ('selectbox', 'radio') and widget.value is not None:
+        # AppTest re-applies format_func when setting a value, so only plain labels can be chosen
+        return widget.options[widget.index] == str(widget.value)
+    return True
+
+
+def _widgets(at):
+    return [(kind, w) for kind in WIDGET_KINDS for w in getattr(at, kind) if _settable(kind, w)]
+
+
+# ====================== SESSIONS ======================
+
+def simulate_session(session_id, actions, seed, pages=None, timeout=RUN_TIMEOUT):
+    """One simulated user: opens a page, then switches pages or changes widgets `actions` times"""
+    rng = random.Random(seed * 100_003 + session_id)
+    pages = pages or list(PAGES)
+    page = rng.choice(pages)
+    # Sessions start from the main script, as in a browser; page paths are relative to it
+    at = AppTest.from_file(os.path.join(APP_DIR, PAGES['Home']), default_timeout=timeout)
+    if page != 'Home':
+        at.switch_page(PAGES[page])
+    samples = []
+
+    def run(action, detail):
+        started = time.perf_counter()
+        error = None
+        try:
+            at.run()
+            if at.exception:
+                error = at.exception[0].value
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        samples.append({'session': session_id, 'page': page, 'action': action, 'detail': detail,
+                        'seconds': time.perf_counter() - started, 'error': error})
+        return error is None
+
+    ok = run('open', None)
+    for _ in range(actions):
+        widgets = _widgets(at) if ok else []
+        if not widgets or rng.random() < SWITCH_PAGE_SHARE:
+            page = rng.choice(pages)
+            at.switch_page(PAGES[page])
+            ok = run('switch', page)
+        else:
+            kind, widget = rng.choice(widgets)
+            value = randomize_widget(widget, kind, rng)
+            ok = run(kind, f"{widget.label}={value}")
+    return samples, at
+
+
+def warm_session(pages=None):
+    """Open every page once so this process's caches are loaded before it is timed"""
+    pages = pages or list(PAGES)
+    at = AppTest.from_file(os.path.join(APP_DIR, PAGES['Home']), default_timeout=RUN_TIMEOUT).run()
+    for page in pages:
+        at.switch_page(PAGES[page]).run()
+
+
+_BARRIER = None
+
+
+def _init_worker(barrier):
+    global _BARRIER
+    _BARRIER = barrier
+    logging.disable(logging.WARNING)
+
+
+def session_process(session_id, actions, seed, pages):
+    """Worker: warm up, wait for every session to be ready, then run one timed session"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        warm_session(pages)
+        gc.collect()
+        baseline = current_rss()
+        reset_peak_rss()
+        _BARRIER.wait()
+        started = time.time()
+        samples, at = simulate_session(session_id, actions, seed, pages)
+        finished = time.time()
+    # `at` still holds the session here, so the growth over the baseline is what one session keeps
+    return {'samples': samples, 'started': started, 'finished': finished, 'baseline_rss': baseline,
+            'retained_rss': current_rss(), 'peak_rss': peak_rss()}
+
+
+def run_load(sessions, actions, seed=0, pages=None):
+    """N concurrent sessions, each in its own warmed-up process, released together.
+
+    No process serves more than one session, so this is per-session latency under CPU contention, not the
+    capacity of one server; run_server_load() measures that.
+    """
+    barrier = multiprocessing.Barrier(sessions)
+    with ProcessPoolExecutor(max_workers=sessions, initializer=_init_worker, initargs=(barrier,)) as executor:
+        futures = [executor.submit(session_process, i, actions, seed, pages) for i in range(sessions)]
+        results = [future.result() for future in futures]
+    return summarize(results)
+
+
+# ====================== SINGLE SERVER ======================
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port=None):
+    """`streamlit run app.py` in the background; returns (process, base URL) once it answers its health check"""
+    port = port or _free_port()
+    url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(APP_DIR, SERVER_APP),
+         "--server.headless", "true", "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit run exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{url}/_stcore/health", timeout=2):
+                return process, url
+        except OSError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"Server did not answer on {url} within {SERVER_START_TIMEOUT}s")
+
+
+class ServerSession:
+    """One browser tab: a websocket on the server's stream endpoint that asks for script runs"""
+
+    def __init__(self, url):
+        self.stream_url = url.replace("http", "ws", 1).rstrip('/') + "/_stcore/stream"
+        self.ws = None
+
+    async def connect(self):
+        import websockets
+
+        self.ws = await websockets.connect(self.stream_url, subprotocols=["streamlit"], max_size=None)
+        return self
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def run(self, page):
+        """Ask for a run of `page` (as a page switch would) and wait for it to finish; returns the error or None"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        request = BackMsg()
+        request.rerun_script.query_string = ""
+        # The main script is addressed by an empty page name, the others by their file name
+        request.rerun_script.page_name = "" if page == 'Home' else page
+        await self.ws.send(request.SerializeToString())
+        error = None
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            kind = msg.WhichOneof('type')
+            if kind == 'delta' and msg.delta.new_element.WhichOneof('type') == 'exception':
+                error = error or msg.delta.new_element.exception.message
+            elif kind == 'page_not_found':
+                error = f"Page not found: {page}"
+            elif kind == 'script_finished':
+                if msg.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    error = error or ForwardMsg.ScriptFinishedStatus.Name(msg.script_finished)
+                return error
+
+
+async def simulate_server_session(session, session_id, actions, seed, pages, start):
+    """One tab on the shared server: opens a page, then switches pages or reruns the current one.
+
+    Widget values are not changed: that needs the widget ids the browser reads from the page, so an
+    interaction is modelled as a rerun of the current page against the server's warm caches.
+    """
+    rng = random.Random(seed * 100_003 + session_id)
+    pages = pages or list(PAGES)
+    page = rng.choice(pages)
+    samples = []
+
+    async def run(action, detail):
+        started = time.perf_counter()
+        try:
+            error = await asyncio.wait_for(session.run(page), RUN_TIMEOUT)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        samples.append({'session': session_id, 'page': page, 'action': action, 'detail': detail,
+                        'seconds': time.perf_counter() - started, 'error': error})
+
+    await start.wait()
+    started = time.time()
+    await run('open', None)
+    for _ in range(actions):
+        if rng.random() < SWITCH_PAGE_SHARE:
+            page = rng.choice(pages)
+            await run('switch', page)
+        else:
+            await run('rerun', None)
+    return {'samples': samples, 'started': started, 'finished': time.time()}
+
+
+async def _server_level(url, sessions, actions, seed, pages, server_pid):
+    # Every tab connects before any is released, so connection setup is not timed
+    clients = [await ServerSession(url).connect() for _ in range(sessions)]
+    try:
+        baseline = current_rss(server_pid) if server_pid else None
+        start = asyncio.Event()
+        tasks = [asyncio.create_task(simulate_server_session(client, i, actions, seed, pages, start))
+                 for i, client in enumerate(clients)]
+        start.set()
+        results = await asyncio.gather(*tasks)
+        # Sessions are still open here, so the growth is what the server keeps for them
+        retained = current_rss(server_pid) if server_pid else None
+    finally:
+        for client in clients:
+            await client.close()
+    return results, baseline, retained
+
+
+async def _warm_server(url, pages):
+    """Open every page once so the server's caches are loaded before it is timed"""
+    client = await ServerSession(url).connect()
+    try:
+        for page in pages or list(PAGES):
+            await client.run(page)
+    finally:
+        await client.close()
+
+
+def run_server_load(url, sessions, actions, seed=0, pages=None, server_pid=None):
+    """N concurrent websocket sessions against one running server, released together"""
+    results, baseline, retained = asyncio.run(_server_level(url, sessions, actions, seed, pages, server_pid))
+    summary = summarize([{**r, 'baseline_rss': None, 'retained_rss': None, 'peak_rss': None} for r in results])
+    summary['server_rss'] = baseline
+    summary['retained_rss_per_session'] = round((retained - baseline) / sessions) if baseline and retained else None
+    return summary
+
+
+# ====================== REPORTING ======================
+
+def _percentiles(seconds):
+    if not seconds:
+        return {f"p{p}_ms": None for p in PERCENTILES}
+    values = np.percentile(seconds, PERCENTILES)
+    return {f"p{p}_ms": round(float(v) * 1000, 1) for p, v in zip(PERCENTILES, values)}
+
+
+def _per_session(results, key):
+    growth = [r[key] - r['baseline_rss'] for r in results if r[key] and r['baseline_rss']]
+    return round(statistics.mean(growth)) if growth else None
+
+
+def summarize(results):
+    """Latency percentiles overall and per page, throughput and memory per session"""
+    samples = [s for r in results for s in r['samples']]
+    ok = [s['seconds'] for s in samples if s['error'] is None]
+    wall = max(r['finished'] for r in results) - min(r['started'] for r in results)
+    by_page = {}
+    for page in PAGES:
+        page_seconds = [s['seconds'] for s in samples if s['page'] == page and s['error'] is None]
+        if page_seconds:
+            by_page[page] = {'runs': len(page_seconds), **_percentiles(page_seconds)}
+    return {
+        'sessions': len(results),
+        'runs': len(samples),
+        'errors': len(samples) - len(ok),
+        'error_samples': sorted({str(s['error']) for s in samples if s['error']})[:5],
+        'wall_seconds': round(wall, 3),
+        'runs_per_sec': round(len(samples) / wall, 2) if wall else None,
+        'mean_ms': round(statistics.mean(ok) * 1000, 1) if ok else None,
+        **_percentiles(ok),
+        'max_ms': round(max(ok) * 1000, 1) if ok else None,
+        'warm_process_rss': results[0]['baseline_rss'],
+        'retained_rss_per_session': _per_session(results, 'retained_rss'),
+        'peak_rss_per_session': _per_session(results, 'peak_rss'),
+        'pages': by_page
+    }
+
+
+def print_summary(result, mode='process'):
+    mb = lambda value: f"{value / 1e6:.1f} MB" if value is not None else "-"
+    label = "on one server" if mode == 'server' else "in separate processes"
+    print(f"👥 {result['sessions']} session(s) {label}: {result['runs']} runs in {result['wall_seconds']:.1f}s "
+          f"→ {result['runs_per_sec']} runs/s, p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+          f"p99 {result['p99_ms']} ms")
+    if mode == 'server':
+        print(f"   server memory per session: {mb(result['retained_rss_per_session'])} retained "
+              f"(warm server {mb(result['server_rss'])})")
+    else:
+        print(f"   memory per session: {mb(result['retained_rss_per_session'])} retained, "
+              f"{mb(result['peak_rss_per_session'])} peak (warm process {mb(result['warm_process_rss'])})")
+    for page, stats in result['pages'].items():
+        print(f"   {page:<20}{stats['runs']:>6} runs  p50 {stats['p50_ms']:>8} ms  p95 {stats['p95_ms']:>8} ms")
+    if result['errors']:
+        print(f"   ⚠️ {result['errors']} failed run(s): {result['error_samples']}")
+
+
+def save_results(record, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = record['started'].replace(':', '').replace('-', '')
+        path = os.path.join(RESULTS_DIR, f"load_{stamp}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=2, default=str)
+    return path
+
+
+# ====================== CLI ======================
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the dashboard with concurrent simulated sessions")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Concurrent sessions; several values run one level after another")
+    parser.add_argument("--actions", type=int, default=10, help="Page switches / widget changes per session")
+    parser.add_argument("--pages", nargs="*", choices=list(PAGES), help="Pages to visit (default: all five)")
+    parser.add_argument("--mode", choices=MODES, default='process',
+                        help="process: per-session latency, one AppTest process per session; "
+                             "server: single-server capacity, all sessions on one streamlit run server")
+    parser.add_argument("--url", help="Server mode: an already running server (default: start one on a free port)")
+    parser.add_argument("--seed", type=int, default=0, help="Interaction seed")
+    parser.add_argument("--output", help=f"Result file (default: {RESULTS_DIR}/load_<time>.json)")
+    args = parser.parse_args()
+    if min(args.sessions) < 1:
+        parser.error("--sessions must be at least 1")
+    if args.mode == 'server' and importlib.util.find_spec("websockets") is None:
+        print("❌ Server mode needs the websockets package: pip install websockets")
+        return
+
+    os.environ.setdefault("STREAMLIT_BROWSER_GATHER_USAGE_STATS", "false")
+    logging.disable(logging.WARNING)
+
+    record = {'started': datetime.now().isoformat(timespec='seconds'), 'mode': args.mode, 'actions': args.actions,
+              'seed': args.seed, 'levels': []}
+    if args.mode == 'server':
+        server, url = (None, args.url) if args.url else start_server()
+        record['url'] = url
+        try:
+            asyncio.run(_warm_server(url, args.pages))
+            for sessions in args.sessions:
+                result = run_server_load(url, sessions, args.actions, args.seed, args.pages,
+                                         server.pid if server else None)
+                record['levels'].append(result)
+                print_summary(result, args.mode)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+    else:
+        # AppTest runs scripts in-process (no server, browser or network) and swaps a process-wide runtime
+        # (and __main__) on every run, so scripts never run in this process
+        for sessions in args.sessions:
+            result = run_load(sessions, args.actions, args.seed, args.pages)
+            record['levels'].append(result)
+            print_summary(result, args.mode)
+
+    path = save_results(record, args.output)
+    print(f"💾 Results saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
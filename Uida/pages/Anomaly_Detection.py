@@ -4,19 +4,27 @@ Features: Multiple detection algorithms, severity scoring, investigation tools
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
 import numpy as np
 import os
 
+from core.anomaly import score_anomalies, state_summary
+from core.density import density_grid, scatter_mode
+from core.figure_cache import cached_figure
+from core.filter_state import filtered_view, selected_version, shared_selectbox
+from core.page_data import export_button, export_format_selector, get_filter_engine, render_chart
+from core.startup import begin_page, end_page, lazy_import
+
+# Plotly loads on the first chart that is not already cached
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+
 # Page configuration
 st.set_page_config(
     page_title="Anomaly Detection - UIDAI",
     page_icon="🚨",
     layout="wide"
 )
+page_run = begin_page("Anomaly_Detection")
 
 # Custom CSS
 st.markdown("""
@@ -48,61 +56,6 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Data loader
-@st.cache_data
-def load_data():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    paths = [
-        os.path.join(current_dir, "data", "processed_data.csv"),
-        os.path.join(current_dir, "..", "data", "processed_data.csv"),
-        "data/processed_data.csv"
-    ]
-    
-    for path in paths:
-        if os.path.exists(path):
-            df = pd.read_csv(path)
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'])
-            if 'Is_Anomaly' in df.columns:
-                df['Is_Anomaly'] = df['Is_Anomaly'].astype(str).str.lower().isin(['true', '1', 'yes'])
-            return df
-    return None
-
-def calculate_anomaly_severity(row):
-    """Calculate severity score based on multiple factors"""
-    score = 0
-    
-    # Risk level contribution
-    if 'Risk_Level' in row and row['Risk_Level'] == 'High Risk':
-        score += 40
-    elif 'Risk_Level' in row and row['Risk_Level'] == 'Medium Risk':
-        score += 20
-    
-    # Anomaly score contribution
-    if 'Anomaly_Score' in row and pd.notna(row['Anomaly_Score']):
-        score += min(row['Anomaly_Score'] * 30, 30)
-    
-    # Volatility contribution
-    if 'Volatility_Score' in row and pd.notna(row['Volatility_Score']):
-        score += min(row['Volatility_Score'] * 10, 20)
-    
-    # Underperformance contribution
-    if 'Underperformance_Flag' in row and row['Underperformance_Flag'] == 'Yes':
-        score += 10
-    
-    return min(score, 100)
-
-def categorize_severity(score):
-    """Categorize severity into levels"""
-    if score >= 70:
-        return 'Critical'
-    elif score >= 40:
-        return 'High'
-    elif score >= 20:
-        return 'Medium'
-    else:
-        return 'Low'
-
 # Logo
 current_dir = os.path.dirname(os.path.abspath(__file__))
 logo_path = os.path.join(current_dir, "..", "assets", "uidai_logo.png")
@@ -114,9 +67,10 @@ st.title("🚨 Advanced Anomaly Detection System")
 st.markdown("**AI-powered fraud detection and pattern recognition**")
 
 # Load data
-df = load_data()
+version = selected_version()
+engine = get_filter_engine(version) if version else None
 
-if df is None:
+if engine is None:
     st.error("🚨 Data file not found!")
     st.stop()
 
@@ -140,12 +94,11 @@ severity_filter = st.sidebar.multiselect(
 )
 
 # State filter
-if 'State' in df.columns:
-    state_options = ["All States"] + sorted(df['State'].unique().tolist())
-    selected_state = st.sidebar.selectbox("🗺️ Filter by State", state_options)
-    
-    if selected_state != "All States":
-        df = df[df['State'] == selected_state]
+state_options = ["All States"] + engine.options('State')
+selected_state = shared_selectbox(st.sidebar, "🗺️ Filter by State", state_options, 'State', "All States", key="anomaly_state")
+
+# Filtered rows are shared with the other pages for the same state
+df = filtered_view(engine, version, ['State'])
 
 st.sidebar.divider()
 
@@ -158,32 +111,11 @@ detection_method = st.sidebar.radio(
 
 # ====================== CALCULATE ANOMALIES ======================
 
-# Calculate severity scores
-if 'Is_Anomaly' not in df.columns:
-    # Fallback: detect based on statistical methods
-    if 'Anomaly_Score' in df.columns:
-        threshold = df['Anomaly_Score'].quantile(0.95 - (sensitivity - 5) * 0.05)
-        df['Is_Anomaly'] = df['Anomaly_Score'] > threshold
-    else:
-        # Use enrolment outliers
-        if 'Enrolments' in df.columns:
-            Q1 = df['Enrolments'].quantile(0.25)
-            Q3 = df['Enrolments'].quantile(0.75)
-            IQR = Q3 - Q1
-            threshold_multiplier = 1.5 + (10 - sensitivity) * 0.3
-            lower = Q1 - threshold_multiplier * IQR
-            upper = Q3 + threshold_multiplier * IQR
-            df['Is_Anomaly'] = (df['Enrolments'] < lower) | (df['Enrolments'] > upper)
-
-# Calculate severity
-df['Severity_Score'] = df.apply(calculate_anomaly_severity, axis=1)
-df['Severity_Level'] = df['Severity_Score'].apply(categorize_severity)
-
-# Filter by severity
-if severity_filter:
-    anomalies = df[(df['Is_Anomaly'] == True) & (df['Severity_Level'].isin(severity_filter))]
-else:
-    anomalies = df[df['Is_Anomaly'] == True]
+# Severity scoring (vectorized) and severity filter
+df, anomalies = score_anomalies(df, sensitivity, severity_filter)
+
+# Charts are cached per data version and the settings they depend on
+anomaly_settings = [selected_state, sensitivity, severity_filter]
 
 # ====================== DASHBOARD METRICS ======================
 st.subheader("📊 Detection Summary")
@@ -241,28 +173,31 @@ with col_sev1:
     st.markdown("#### ⚠️ Severity Breakdown")
     
     if len(anomalies) > 0:
-        severity_counts = anomalies['Severity_Level'].value_counts().reset_index()
-        severity_counts.columns = ['Severity', 'Count']
+        def severity_figure():
+            severity_counts = anomalies['Severity_Level'].value_counts().reset_index()
+            severity_counts.columns = ['Severity', 'Count']
         
-        # Define colors
-        color_map = {
-            'Critical': '#ff6b6b',
-            'High': '#ffd43b',
-            'Medium': '#4facfe',
-            'Low': '#51cf66'
-        }
+            # Define colors
+            color_map = {
+                'Critical': '#ff6b6b',
+                'High': '#ffd43b',
+                'Medium': '#4facfe',
+                'Low': '#51cf66'
+            }
         
-        fig_sev = px.pie(
-            severity_counts,
-            values='Count',
-            names='Severity',
-            color='Severity',
-            color_discrete_map=color_map,
-            hole=0.5
-        )
-        fig_sev.update_traces(textposition='inside', textinfo='percent+label')
-        fig_sev.update_layout(height=300, margin=dict(l=0, r=0, t=30, b=0))
-        st.plotly_chart(fig_sev, use_container_width=True)
+            fig_sev = px.pie(
+                severity_counts,
+                values='Count',
+                names='Severity',
+                color='Severity',
+                color_discrete_map=color_map,
+                hole=0.5
+            )
+            fig_sev.update_traces(textposition='inside', textinfo='percent+label')
+            fig_sev.update_layout(height=300, margin=dict(l=0, r=0, t=30, b=0))
+            return fig_sev
+        
+        render_chart(cached_figure("anomaly_severity_pie", version, anomaly_settings, severity_figure), use_container_width=True)
     else:
         st.success("✅ No anomalies detected in current filters")
 
@@ -270,30 +205,32 @@ with col_sev2:
     st.markdown("#### 📈 Anomaly Timeline")
     
     if len(anomalies) > 0 and 'Date' in anomalies.columns:
-        # Aggregate by date
-        daily_anomalies = anomalies.groupby('Date').size().reset_index(name='Count')
+        def timeline_figure():
+            # Aggregate by date
+            daily_anomalies = anomalies.groupby('Date').size().reset_index(name='Count')
         
-        fig_timeline = go.Figure()
+            fig_timeline = go.Figure()
         
-        fig_timeline.add_trace(go.Scatter(
-            x=daily_anomalies['Date'],
-            y=daily_anomalies['Count'],
-            mode='lines+markers',
-            fill='tozeroy',
-            line=dict(color='#ff6b6b', width=3),
-            marker=dict(size=8),
-            hovertemplate='<b>Date</b>: %{x}<br><b>Anomalies</b>: %{y}<extra></extra>'
-        ))
+            fig_timeline.add_trace(go.Scatter(
+                x=daily_anomalies['Date'],
+                y=daily_anomalies['Count'],
+                mode='lines+markers',
+                fill='tozeroy',
+                line=dict(color='#ff6b6b', width=3),
+                marker=dict(size=8),
+                hovertemplate='<b>Date</b>: %{x}<br><b>Anomalies</b>: %{y}<extra></extra>'
+            ))
         
-        fig_timeline.update_layout(
-            height=300,
-            xaxis_title="Date",
-            yaxis_title="Number of Anomalies",
-            hovermode='x',
-            margin=dict(l=0, r=0, t=30, b=0)
-        )
+            fig_timeline.update_layout(
+                height=300,
+                xaxis_title="Date",
+                yaxis_title="Number of Anomalies",
+                hovermode='x',
+                margin=dict(l=0, r=0, t=30, b=0)
+            )
+            return fig_timeline
         
-        st.plotly_chart(fig_timeline, use_container_width=True)
+        render_chart(cached_figure("anomaly_timeline", version, anomaly_settings, timeline_figure), use_container_width=True)
     else:
         st.info("No timeline data available")
 
@@ -303,47 +240,89 @@ st.divider()
 st.subheader("🔍 Pattern Analysis")
 
 if 'Enrolments' in df.columns and 'Updates' in df.columns:
-    # Create scatter plot
-    fig_scatter = px.scatter(
-        df,
-        x='Enrolments',
-        y='Updates',
-        color='Is_Anomaly',
-        color_discrete_map={True: '#ff6b6b', False: '#4facfe'},
-        size='Severity_Score' if 'Severity_Score' in df.columns else None,
-        hover_data=['State', 'District', 'Date'] if all(col in df.columns for col in ['State', 'District', 'Date']) else None,
-        labels={'Is_Anomaly': 'Anomaly Status'},
-        title="Enrolments vs Updates - Anomaly Detection"
-    )
+    # SVG for small frames, WebGL above WEBGL_THRESHOLD, density grid for very large ones
+    mode = scatter_mode(len(df))
+    hover_cols = ['State', 'District', 'Date'] if all(col in df.columns for col in ['State', 'District', 'Date']) else None
     
-    # Add reference lines
-    if len(df) > 0:
-        avg_enrolments = df['Enrolments'].mean()
-        avg_updates = df['Updates'].mean()
+    # Severity filter and detection method do not change the scatter
+    def pattern_figure():
+        if mode == 'density':
+            # Normal records as a server-side 2-D histogram, anomalies as individual points
+            flagged_rows = (df['Is_Anomaly'] == True).to_numpy()
+            normal = df[~flagged_rows]
+            counts, x_centres, y_centres = density_grid(normal['Enrolments'], normal['Updates'])
+            fig_scatter = go.Figure(go.Heatmap(
+                x=x_centres,
+                y=y_centres,
+                z=np.where(counts > 0, np.log10(counts + 1), np.nan),
+                customdata=counts,
+                colorscale='Blues',
+                showscale=False,
+                name='Normal records',
+                hovertemplate='<b>Enrolments</b>: %{x:,.0f}<br><b>Updates</b>: %{y:,.0f}<br><b>Normal records</b>: %{customdata:,.0f}<extra></extra>'
+            ))
+            flagged = df[flagged_rows]
+            fig_scatter.add_trace(go.Scattergl(
+                x=flagged['Enrolments'],
+                y=flagged['Updates'],
+                mode='markers',
+                name='Anomaly',
+                marker=dict(color='#ff6b6b', size=5),
+                customdata=flagged[hover_cols].astype(str) if hover_cols else None,
+                hovertemplate=('<b>%{customdata[1]}</b>, %{customdata[0]}<br>%{customdata[2]}<extra></extra>'
+                               if hover_cols else None)
+            ))
+            fig_scatter.update_layout(
+                title="Enrolments vs Updates - Anomaly Detection",
+                xaxis_title='Enrolments',
+                yaxis_title='Updates'
+            )
+        else:
+            # Create scatter plot
+            fig_scatter = px.scatter(
+                df,
+                x='Enrolments',
+                y='Updates',
+                color='Is_Anomaly',
+                color_discrete_map={True: '#ff6b6b', False: '#4facfe'},
+                size='Severity_Score' if 'Severity_Score' in df.columns else None,
+                hover_data=hover_cols,
+                labels={'Is_Anomaly': 'Anomaly Status'},
+                title="Enrolments vs Updates - Anomaly Detection",
+                render_mode='webgl' if mode == 'webgl' else 'svg'
+            )
+    
+        # Add reference lines
+        if len(df) > 0:
+            avg_enrolments = df['Enrolments'].mean()
+            avg_updates = df['Updates'].mean()
         
-        fig_scatter.add_hline(
-            y=avg_updates,
-            line_dash="dash",
-            line_color="gray",
-            annotation_text="Avg Updates",
-            annotation_position="right"
-        )
+            fig_scatter.add_hline(
+                y=avg_updates,
+                line_dash="dash",
+                line_color="gray",
+                annotation_text="Avg Updates",
+                annotation_position="right"
+            )
         
-        fig_scatter.add_vline(
-            x=avg_enrolments,
-            line_dash="dash",
-            line_color="gray",
-            annotation_text="Avg Enrolments",
-            annotation_position="top"
-        )
+            fig_scatter.add_vline(
+                x=avg_enrolments,
+                line_dash="dash",
+                line_color="gray",
+                annotation_text="Avg Enrolments",
+                annotation_position="top"
+            )
     
-    fig_scatter.update_layout(
-        height=500,
-        legend=dict(title="Status"),
-        margin=dict(l=0, r=0, t=40, b=0)
-    )
+        fig_scatter.update_layout(
+            height=500,
+            legend=dict(title="Status"),
+            margin=dict(l=0, r=0, t=40, b=0)
+        )
+        return fig_scatter
     
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    render_chart(cached_figure("anomaly_pattern_scatter", version, anomaly_settings[:2], pattern_figure), use_container_width=True)
+    if mode == 'density':
+        st.caption(f"Showing the density of {len(df):,} records; anomalies are drawn as individual points.")
 else:
     st.warning("⚠️ Enrolments or Updates data not available for visualization")
 
@@ -457,46 +436,38 @@ st.divider()
 # ====================== DOWNLOAD OPTIONS ======================
 st.subheader("📥 Export Anomaly Reports")
 
+export_format = export_format_selector("anomaly_export_format")
+export_filters = [selected_state, sensitivity, severity_filter, detection_method]
+
 col_dl1, col_dl2, col_dl3 = st.columns(3)
 
 with col_dl1:
     if len(anomalies) > 0:
-        csv_all = anomalies.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📄 All Anomalies",
-            data=csv_all,
-            file_name=f"anomaly_report_all_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv",
+        export_button(
+            "📄 All Anomalies", "anomaly_report_all",
+            lambda: anomalies,
+            version, export_filters, export_format
         )
 
 with col_dl2:
-    critical_anomalies = anomalies[anomalies['Severity_Level'].isin(['Critical', 'High'])]
-    if len(critical_anomalies) > 0:
-        csv_critical = critical_anomalies.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="🚨 Critical Cases Only",
-            data=csv_critical,
-            file_name=f"critical_anomalies_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv",
+    if critical_count + high_count > 0:
+        export_button(
+            "🚨 Critical Cases Only", "critical_anomalies",
+            lambda: anomalies[anomalies['Severity_Level'].isin(['Critical', 'High'])],
+            version, export_filters, export_format
         )
 
 with col_dl3:
     if 'State' in anomalies.columns:
         # Summary by state
-        state_summary = anomalies.groupby('State').agg({
-            'Severity_Score': 'mean',
-            'District': 'count'
-        }).reset_index()
-        state_summary.columns = ['State', 'Avg_Severity', 'Anomaly_Count']
-        
-        csv_summary = state_summary.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📊 Summary by State",
-            data=csv_summary,
-            file_name=f"state_summary_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv",
+        export_button(
+            "📊 Summary by State", "state_summary",
+            lambda: state_summary(anomalies),
+            version, export_filters, export_format
         )
 
 # Footer
 st.markdown("---")
-st.caption(f"🚨 Detection Method: {detection_method} | Sensitivity: {sensitivity}/10 | Active Filters: {', '.join(severity_filter) if severity_filter else 'None'}")
\ No newline at end of file
+st.caption(f"🚨 Detection Method: {detection_method} | Sensitivity: {sensitivity}/10 | Active Filters: {', '.join(severity_filter) if severity_filter else 'None'}")
+
+end_page("Anomaly_Detection", page_run)
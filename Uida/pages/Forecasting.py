@@ -5,18 +5,28 @@ Features: Multiple forecast models, confidence intervals, scenario analysis
 
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime, timedelta
-import numpy as np
 import os
 
+from core.downsampling import downsample
+from core.figure_cache import cached_figure
+from core.forecasting import (
+    SCENARIO_FACTORS, monthly_breakdown, scenario_comparison
+)
+from core.filter_state import filtered_view, selected_version, shared_selectbox
+from core.page_data import export_button, export_format_selector, get_filter_engine, get_forecast, render_chart
+from core.startup import begin_page, end_page, lazy_import
+
+# Plotly loads on the first chart that is not already cached
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+
 # Page configuration
 st.set_page_config(
     page_title="AI Forecasting - UIDAI",
     page_icon="🔮",
     layout="wide"
 )
+page_run = begin_page("Forecasting")
 
 # Custom CSS
 st.markdown("""
@@ -37,24 +47,6 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Data loader
-@st.cache_data
-def load_data():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    paths = [
-        os.path.join(current_dir, "data", "processed_data.csv"),
-        os.path.join(current_dir, "..", "data", "processed_data.csv"),
-        "data/processed_data.csv"
-    ]
-    
-    for path in paths:
-        if os.path.exists(path):
-            df = pd.read_csv(path)
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'])
-            return df
-    return None
-
 # Load forecast data
 @st.cache_data
 def load_forecast_data():
@@ -82,10 +74,11 @@ st.title("🔮 AI-Powered Enrolment Forecasting")
 st.markdown("**Predictive analytics for resource planning and demand estimation**")
 
 # Load data
-df = load_data()
+version = selected_version()
+engine = get_filter_engine(version) if version else None
 forecast_df = load_forecast_data()
 
-if df is None:
+if engine is None:
     st.error("🚨 Historical data not found!")
     st.stop()
 
@@ -102,29 +95,22 @@ forecast_months = st.sidebar.slider(
 )
 
 # State selection
-if 'State' in df.columns:
-    state_options = ["All India"] + sorted(df['State'].unique().tolist())
-    selected_state = st.sidebar.selectbox("🗺️ Select State", state_options, key='forecast_state')
-    
-    if selected_state != "All India":
-        df = df[df['State'] == selected_state]
-        if forecast_df is not None:
-            forecast_df = forecast_df[forecast_df['state'] == selected_state]
+state_options = ["All India"] + engine.options('State')
+selected_state = shared_selectbox(st.sidebar, "🗺️ Select State", state_options, 'State', "All India", key="forecast_state")
+
+# Filtered rows are shared with the other pages for the same state
+df = filtered_view(engine, version, ['State'])
+if selected_state != "All India" and forecast_df is not None:
+    forecast_df = forecast_df[forecast_df['state'] == selected_state]
 
 # Scenario analysis
 st.sidebar.subheader("📊 Scenario Analysis")
 growth_scenario = st.sidebar.radio(
     "Growth Scenario",
-    ["Conservative", "Baseline", "Optimistic"],
+    list(SCENARIO_FACTORS),
     index=1
 )
 
-scenario_factors = {
-    "Conservative": 0.85,
-    "Baseline": 1.0,
-    "Optimistic": 1.15
-}
-
 st.sidebar.divider()
 
 # Confidence level
@@ -137,63 +123,12 @@ confidence_level = st.sidebar.selectbox(
 
 # ====================== FORECAST GENERATION ======================
 
-# Generate forecasts
+# Generate forecasts (cached per data version, state and settings)
 if 'Date' in df.columns and 'Enrolments' in df.columns:
-    # Aggregate historical data
-    historical = df.groupby('Date')['Enrolments'].sum().reset_index()
-    historical = historical.sort_values('Date')
-    
-    # Calculate trend
-    if len(historical) > 1:
-        # Simple moving average for trend
-        window = min(7, len(historical))
-        historical['MA'] = historical['Enrolments'].rolling(window=window, min_periods=1).mean()
-        
-        # Calculate growth rate
-        recent_growth = (historical['MA'].iloc[-1] - historical['MA'].iloc[0]) / len(historical)
-        
-        # Generate forecast dates
-        last_date = historical['Date'].max()
-        forecast_dates = pd.date_range(
-            start=last_date + timedelta(days=1),
-            periods=forecast_months * 30,
-            freq='D'
-        )
-        
-        # Generate forecast
-        base_value = historical['MA'].iloc[-1]
-        forecast_values = []
-        lower_bound = []
-        upper_bound = []
-        
-        for i, date in enumerate(forecast_dates):
-            # Trend component
-            trend = base_value + (recent_growth * i)
-            
-            # Apply scenario factor
-            forecast = trend * scenario_factors[growth_scenario]
-            
-            # Add seasonality (simple sine wave)
-            seasonality = np.sin(2 * np.pi * i / 30) * (forecast * 0.1)
-            forecast += seasonality
-            
-            # Calculate confidence intervals
-            std_dev = historical['Enrolments'].std()
-            z_scores = {90: 1.645, 95: 1.96, 99: 2.576}
-            z = z_scores[confidence_level]
-            margin = z * std_dev * np.sqrt(1 + i/len(historical))
-            
-            forecast_values.append(max(0, forecast))
-            lower_bound.append(max(0, forecast - margin))
-            upper_bound.append(forecast + margin)
-        
-        # Create forecast dataframe
-        forecast_generated = pd.DataFrame({
-            'Date': forecast_dates,
-            'Forecast': forecast_values,
-            'Lower': lower_bound,
-            'Upper': upper_bound
-        })
+    historical, forecast_generated, recent_growth = get_forecast(
+        version, None if selected_state == "All India" else selected_state,
+        forecast_months, growth_scenario, confidence_level
+    )
 
 # ====================== METRICS ======================
 st.subheader("📊 Forecast Summary")
@@ -248,86 +183,92 @@ st.divider()
 # ====================== VISUALIZATION ======================
 st.subheader("📈 Forecast Visualization")
 
-# Create the forecast chart
-fig = go.Figure()
-
-# Historical data
-fig.add_trace(go.Scatter(
-    x=historical['Date'],
-    y=historical['Enrolments'],
-    name='Historical',
-    mode='lines',
-    line=dict(color='#4facfe', width=2),
-    hovertemplate='<b>Date</b>: %{x}<br><b>Enrolments</b>: %{y:,.0f}<extra></extra>'
-))
-
-# Moving average
-fig.add_trace(go.Scatter(
-    x=historical['Date'],
-    y=historical['MA'],
-    name='Trend',
-    mode='lines',
-    line=dict(color='#f093fb', width=2, dash='dash'),
-    hovertemplate='<b>Date</b>: %{x}<br><b>Trend</b>: %{y:,.0f}<extra></extra>'
-))
-
-# Forecast
-fig.add_trace(go.Scatter(
-    x=forecast_generated['Date'],
-    y=forecast_generated['Forecast'],
-    name=f'Forecast ({growth_scenario})',
-    mode='lines',
-    line=dict(color='#ffd43b', width=3),
-    hovertemplate='<b>Date</b>: %{x}<br><b>Forecast</b>: %{y:,.0f}<extra></extra>'
-))
-
-# Confidence interval
-fig.add_trace(go.Scatter(
-    x=forecast_generated['Date'],
-    y=forecast_generated['Upper'],
-    name=f'Upper Bound ({confidence_level}%)',
-    mode='lines',
-    line=dict(width=0),
-    showlegend=False,
-    hoverinfo='skip'
-))
-
-fig.add_trace(go.Scatter(
-    x=forecast_generated['Date'],
-    y=forecast_generated['Lower'],
-    name=f'Confidence Interval ({confidence_level}%)',
-    mode='lines',
-    line=dict(width=0),
-    fillcolor='rgba(255, 212, 59, 0.2)',
-    fill='tonexty',
-    hovertemplate='<b>Date</b>: %{x}<br><b>Range</b>: %{y:,.0f}<extra></extra>'
-))
-
-# --- FIX: Replaced add_vline with add_shape to prevent Timestamp errors ---
-fig.add_shape(
-    type="line",
-    x0=historical['Date'].max(), y0=0,
-    x1=historical['Date'].max(), y1=1,
-    xref="x", yref="paper",
-    line=dict(color="Gray", width=2, dash="dash"),
-)
+# Create the forecast chart (cached per data version and forecast settings)
+chart_settings = [selected_state, forecast_months, growth_scenario, confidence_level]
+
+def forecast_figure():
+    # Only the drawn history is downsampled; the forecast uses every day
+    shown = downsample(historical, 'Date', ['Enrolments', 'MA'])
+    fig = go.Figure()
+
+    # Historical data
+    fig.add_trace(go.Scatter(
+        x=shown['Date'],
+        y=shown['Enrolments'],
+        name='Historical',
+        mode='lines',
+        line=dict(color='#4facfe', width=2),
+        hovertemplate='<b>Date</b>: %{x}<br><b>Enrolments</b>: %{y:,.0f}<extra></extra>'
+    ))
 
-fig.update_layout(
-    height=500,
-    hovermode='x unified',
-    xaxis_title="Date",
-    yaxis_title="Enrolments",
-    legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=1.02,
-        xanchor="right",
-        x=1
-    ),
-    margin=dict(l=0, r=0, t=30, b=0)
-)
+    # Moving average
+    fig.add_trace(go.Scatter(
+        x=shown['Date'],
+        y=shown['MA'],
+        name='Trend',
+        mode='lines',
+        line=dict(color='#f093fb', width=2, dash='dash'),
+        hovertemplate='<b>Date</b>: %{x}<br><b>Trend</b>: %{y:,.0f}<extra></extra>'
+    ))
+
+    # Forecast
+    fig.add_trace(go.Scatter(
+        x=forecast_generated['Date'],
+        y=forecast_generated['Forecast'],
+        name=f'Forecast ({growth_scenario})',
+        mode='lines',
+        line=dict(color='#ffd43b', width=3),
+        hovertemplate='<b>Date</b>: %{x}<br><b>Forecast</b>: %{y:,.0f}<extra></extra>'
+    ))
+
+    # Confidence interval
+    fig.add_trace(go.Scatter(
+        x=forecast_generated['Date'],
+        y=forecast_generated['Upper'],
+        name=f'Upper Bound ({confidence_level}%)',
+        mode='lines',
+        line=dict(width=0),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
 
-st.plotly_chart(fig, use_container_width=True)
+    fig.add_trace(go.Scatter(
+        x=forecast_generated['Date'],
+        y=forecast_generated['Lower'],
+        name=f'Confidence Interval ({confidence_level}%)',
+        mode='lines',
+        line=dict(width=0),
+        fillcolor='rgba(255, 212, 59, 0.2)',
+        fill='tonexty',
+        hovertemplate='<b>Date</b>: %{x}<br><b>Range</b>: %{y:,.0f}<extra></extra>'
+    ))
+
+    # --- FIX: Replaced add_vline with add_shape to prevent Timestamp errors ---
+    fig.add_shape(
+        type="line",
+        x0=historical['Date'].max(), y0=0,
+        x1=historical['Date'].max(), y1=1,
+        xref="x", yref="paper",
+        line=dict(color="Gray", width=2, dash="dash"),
+    )
+
+    fig.update_layout(
+        height=500,
+        hovermode='x unified',
+        xaxis_title="Date",
+        yaxis_title="Enrolments",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(l=0, r=0, t=30, b=0)
+    )
+    return fig
+
+render_chart(cached_figure("forecast_main", version, chart_settings, forecast_figure), use_container_width=True)
 
 st.divider()
 
@@ -338,75 +279,68 @@ with col_analysis1:
     st.markdown("#### 📊 Monthly Forecast Breakdown")
     
     # Aggregate by month
-    forecast_generated['Month'] = forecast_generated['Date'].dt.to_period('M')
-    monthly_forecast = forecast_generated.groupby('Month').agg({
-        'Forecast': 'sum',
-        'Lower': 'sum',
-        'Upper': 'sum'
-    }).reset_index()
-    monthly_forecast['Month'] = monthly_forecast['Month'].astype(str)
+    monthly_forecast = monthly_breakdown(forecast_generated)
     
     # Create bar chart
-    fig_monthly = go.Figure()
+    def monthly_figure():
+        fig_monthly = go.Figure()
     
-    fig_monthly.add_trace(go.Bar(
-        x=monthly_forecast['Month'],
-        y=monthly_forecast['Forecast'],
-        name='Forecast',
-        marker_color='#4facfe',
-        error_y=dict(
-            type='data',
-            symmetric=False,
-            array=monthly_forecast['Upper'] - monthly_forecast['Forecast'],
-            arrayminus=monthly_forecast['Forecast'] - monthly_forecast['Lower'],
-            color='rgba(0,0,0,0.3)'
-        )
-    ))
+        fig_monthly.add_trace(go.Bar(
+            x=monthly_forecast['Month'],
+            y=monthly_forecast['Forecast'],
+            name='Forecast',
+            marker_color='#4facfe',
+            error_y=dict(
+                type='data',
+                symmetric=False,
+                array=monthly_forecast['Upper'] - monthly_forecast['Forecast'],
+                arrayminus=monthly_forecast['Forecast'] - monthly_forecast['Lower'],
+                color='rgba(0,0,0,0.3)'
+            )
+        ))
     
-    fig_monthly.update_layout(
-        height=350,
-        xaxis_title="Month",
-        yaxis_title="Predicted Enrolments",
-        showlegend=False,
-        margin=dict(l=0, r=0, t=30, b=0)
-    )
+        fig_monthly.update_layout(
+            height=350,
+            xaxis_title="Month",
+            yaxis_title="Predicted Enrolments",
+            showlegend=False,
+            margin=dict(l=0, r=0, t=30, b=0)
+        )
+        return fig_monthly
     
-    st.plotly_chart(fig_monthly, use_container_width=True)
+    render_chart(cached_figure("forecast_monthly", version, chart_settings, monthly_figure), use_container_width=True)
 
 with col_analysis2:
     st.markdown("#### 🎯 Scenario Comparison")
     
     # Calculate all scenarios
-    scenarios_data = []
-    for scenario, factor in scenario_factors.items():
-        forecast_generated_scenario = forecast_generated.copy()
-        forecast_generated_scenario['Scenario'] = scenario
-        forecast_generated_scenario['Value'] = forecast_generated_scenario['Forecast'] * (factor / scenario_factors[growth_scenario])
-        scenarios_data.append(forecast_generated_scenario[['Date', 'Scenario', 'Value']])
-    
-    scenarios_df = pd.concat(scenarios_data)
+    scenarios_df = scenario_comparison(forecast_generated, growth_scenario)
     
-    fig_scenarios = px.line(
-        scenarios_df,
-        x='Date',
-        y='Value',
-        color='Scenario',
-        color_discrete_map={
-            'Conservative': '#ff6b6b',
-            'Baseline': '#4facfe',
-            'Optimistic': '#51cf66'
-        }
-    )
+    # Scenario lines do not depend on the confidence level
+    def scenarios_figure():
+        fig_scenarios = px.line(
+            scenarios_df,
+            x='Date',
+            y='Value',
+            color='Scenario',
+            color_discrete_map={
+                'Conservative': '#ff6b6b',
+                'Baseline': '#4facfe',
+                'Optimistic': '#51cf66'
+            }
+        )
     
-    fig_scenarios.update_layout(
-        height=350,
-        xaxis_title="Date",
-        yaxis_title="Enrolments",
-        legend=dict(title="Scenario"),
-        margin=dict(l=0, r=0, t=30, b=0)
-    )
+        fig_scenarios.update_layout(
+            height=350,
+            xaxis_title="Date",
+            yaxis_title="Enrolments",
+            legend=dict(title="Scenario"),
+            margin=dict(l=0, r=0, t=30, b=0)
+        )
+        return fig_scenarios
     
-    st.plotly_chart(fig_scenarios, use_container_width=True)
+    render_chart(cached_figure("forecast_scenarios", version, chart_settings[:3], scenarios_figure),
+                    use_container_width=True)
 
 st.divider()
 
@@ -441,38 +375,37 @@ st.divider()
 # ====================== DOWNLOAD OPTIONS ======================
 st.subheader("📥 Export Forecast Data")
 
+export_format = export_format_selector("forecast_export_format")
+export_filters = [selected_state, forecast_months, growth_scenario, confidence_level]
+
 col_dl1, col_dl2, col_dl3 = st.columns(3)
 
 with col_dl1:
     # Daily forecast
-    csv_daily = forecast_generated.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="📄 Daily Forecast",
-        data=csv_daily,
-        file_name=f"daily_forecast_{datetime.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv",
+    export_button(
+        "📄 Daily Forecast", "daily_forecast",
+        lambda: forecast_generated,
+        version, export_filters, export_format
     )
 
 with col_dl2:
     # Monthly forecast
-    csv_monthly = monthly_forecast.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="📅 Monthly Summary",
-        data=csv_monthly,
-        file_name=f"monthly_forecast_{datetime.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv",
+    export_button(
+        "📅 Monthly Summary", "monthly_forecast",
+        lambda: monthly_forecast,
+        version, export_filters, export_format
     )
 
 with col_dl3:
     # Scenario comparison
-    csv_scenarios = scenarios_df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="🎯 All Scenarios",
-        data=csv_scenarios,
-        file_name=f"forecast_scenarios_{datetime.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv",
+    export_button(
+        "🎯 All Scenarios", "forecast_scenarios",
+        lambda: scenarios_df,
+        version, export_filters, export_format
     )
 
 # Footer
 st.markdown("---")
-st.caption(f"🔮 Forecast generated using AI models | Confidence Level: {confidence_level}% | Scenario: {growth_scenario}")
\ No newline at end of file
+st.caption(f"🔮 Forecast generated using AI models | Confidence Level: {confidence_level}% | Scenario: {growth_scenario}")
+
+end_page("Forecasting", page_run)
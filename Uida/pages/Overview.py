@@ -1,36 +1,18 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import os
+from core.downsampling import downsample
+from core.figure_cache import cached_figure
+from core.filter_state import filtered_view, selected_version, shared_selectbox
+from core.page_data import get_filter_engine, get_query_backend, render_chart
+from core.startup import begin_page, end_page, lazy_import
+
+# Plotly loads on the first chart that is not already cached
+px = lazy_import("plotly.express")
 
 # 1. Page Configuration
 st.set_page_config(page_title="Strategic Overview", page_icon="🎯", layout="wide")
-
-# --- UNIVERSAL DATA LOADER ---
-@st.cache_data
-def load_data():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    paths = [
-        os.path.join(current_dir, "..", "data", "processed_data.csv"),
-        os.path.join(current_dir, "data", "processed_data.csv"),
-        "data/processed_data.csv"
-    ]
-    file_path = None
-    for p in paths:
-        if os.path.exists(p):
-            file_path = p
-            break
-            
-    if not file_path:
-        return None
-
-    df = pd.read_csv(file_path)
-    
-    # Fix Date
-    if 'Date' in df.columns:
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        
-    return df
+page_run = begin_page("Overview")
 
 # Logo Setup
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -40,31 +22,34 @@ if os.path.exists(logo_path):
 
 st.title("🎯 Strategic Performance Overview")
 
-# 2. Data Load
-df = load_data()
+# 2. Data Load: aggregates come from the embedded query backend as small result frames
+version = selected_version()
+backend = get_query_backend(version) if version else None
 
-if df is None:
+if backend is None:
     st.error("🚨 Waiting for data...")
     st.stop()
 
 # --- 3. SIDEBAR FILTERS ---
 st.sidebar.header("🔍 Filters")
 
-if 'State' in df.columns:
-    state_list = ["All India"] + sorted(df['State'].unique().tolist())
-    selected_state = st.sidebar.selectbox("Region / State", state_list)
-    if selected_state != "All India":
-        df = df[df['State'] == selected_state]
+states = backend.aggregate({'Records': ('count', '*')}, by=['State'])['State'].dropna()
+state_list = ["All India"] + sorted(states.astype(str))
+selected_state = shared_selectbox(st.sidebar, "Region / State", state_list, 'State', "All India", key="overview_state")
+state_filter = None if selected_state == "All India" else selected_state
 
 # --- 4. KEY METRICS ---
 # Check if we have strategic columns
-has_strategy = 'Risk Level' in df.columns
+has_strategy = 'Risk Level' in backend.columns
+if has_strategy:
+    # The district signals table lists rows, so only strategic data loads the row-level view
+    df = filtered_view(get_filter_engine(version), version, ['State'])
 
 col1, col2, col3, col4 = st.columns(4)
 
 # Calculate Metrics
-total = len(df)
 if has_strategy:
+    total = len(df)
     high_risk = len(df[df['Risk Level'] == 'High'])
     underperf = len(df[df['Underperformance Flag'] == 'Yes'])
     avg_megr = df['MEGR (%)'].mean()
@@ -74,9 +59,14 @@ if has_strategy:
     col3.metric("📉 Underperforming", underperf, delta="Attention", delta_color="inverse")
     col4.metric("📊 Avg MEGR", f"{avg_megr:.1f}%")
 else:
-    col1.metric("Selected Records", total)
-    col2.metric("Total Enrolments", f"{df['Enrolments'].sum():,}")
-    col3.metric("Avg Updates", f"{int(df['Updates'].mean()):,}")
+    kpis = backend.aggregate({
+        'Records': ('count', '*'),
+        'Enrolments': ('sum', 'Enrolments'),
+        'Updates': ('mean', 'Updates')
+    }, State=state_filter).iloc[0]
+    col1.metric("Selected Records", int(kpis['Records']))
+    col2.metric("Total Enrolments", f"{int(kpis['Enrolments']):,}")
+    col3.metric("Avg Updates", f"{int(kpis['Updates']):,}")
 
 st.divider()
 
@@ -102,29 +92,34 @@ if has_strategy:
 
 # --- 6. VISUAL CHARTS (Risk & Volatility) ---
 # Now we force these to show if the columns exist
+# Figures are cached per data version and state, so reruns reuse them
 col_viz1, col_viz2 = st.columns(2)
 
-if 'Risk Level' in df.columns:
+if 'Risk Level' in backend.columns:
     with col_viz1:
         st.markdown("### 🚨 Risk Distribution")
-        risk_counts = df['Risk Level'].value_counts().reset_index()
-        risk_counts.columns = ['Risk Level', 'Count']
-        fig_risk = px.pie(risk_counts, values='Count', names='Risk Level', 
-                         color='Risk Level', 
-                         color_discrete_map={'High':'red', 'Medium':'orange', 'Low':'green'},
-                         hole=0.4)
-        st.plotly_chart(fig_risk, use_container_width=True)
-
-if 'Volatility Level' in df.columns:
+        def risk_figure():
+            risk_counts = backend.aggregate({'Count': ('count', '*')}, by=['Risk Level'], order_by='Count',
+                                            State=state_filter)
+            return px.pie(risk_counts, values='Count', names='Risk Level', 
+                          color='Risk Level', 
+                          color_discrete_map={'High':'red', 'Medium':'orange', 'Low':'green'},
+                          hole=0.4)
+        render_chart(cached_figure("overview_risk_pie", version, [selected_state], risk_figure),
+                        use_container_width=True)
+
+if 'Volatility Level' in backend.columns:
     with col_viz2:
         st.markdown("### 🌊 Volatility Spread")
         # Bar chart for Volatility
-        vol_counts = df['Volatility Level'].value_counts().reset_index()
-        vol_counts.columns = ['Volatility Level', 'Count']
-        fig_vol = px.bar(vol_counts, x='Volatility Level', y='Count',
-                         color='Volatility Level',
-                         color_discrete_sequence=px.colors.qualitative.Pastel)
-        st.plotly_chart(fig_vol, use_container_width=True)
+        def volatility_figure():
+            vol_counts = backend.aggregate({'Count': ('count', '*')}, by=['Volatility Level'], order_by='Count',
+                                           State=state_filter)
+            return px.bar(vol_counts, x='Volatility Level', y='Count',
+                          color='Volatility Level',
+                          color_discrete_sequence=px.colors.qualitative.Pastel)
+        render_chart(cached_figure("overview_volatility", version, [selected_state], volatility_figure),
+                        use_container_width=True)
 
 # --- 7. STANDARD CHARTS (Enrolment Trends) ---
 # These will show below the risk charts
@@ -132,20 +127,87 @@ st.divider()
 col_chart1, col_chart2 = st.columns(2)
 
 # Chart 1: Daily/Monthly Trend
-if 'Date' in df.columns:
+if 'Date' in backend.columns:
     with col_chart1:
         st.subheader(f"📅 Enrolment Volume")
-        daily_trend = df.groupby("Date")[["Enrolments", "Updates"]].sum().reset_index()
-        fig_line = px.line(daily_trend, x="Date", y=["Enrolments", "Updates"],
-                        markers=True,
-                        color_discrete_sequence=["#ffaa00", "#0088ff"])
-        st.plotly_chart(fig_line, use_container_width=True)
+        def volume_figure():
+            daily_trend = backend.aggregate({
+                'Enrolments': ('sum', 'Enrolments'),
+                'Updates': ('sum', 'Updates')
+            }, by=['Date'], State=state_filter)
+            daily_trend = downsample(daily_trend, "Date", ["Enrolments", "Updates"])
+            return px.line(daily_trend, x="Date", y=["Enrolments", "Updates"],
+                           markers=True,
+                           color_discrete_sequence=["#ffaa00", "#0088ff"])
+        render_chart(cached_figure("overview_enrolment_volume", version, [selected_state], volume_figure),
+                        use_container_width=True)
 
 # Chart 2: Top Districts
-if 'District' in df.columns:
+if 'District' in backend.columns:
     with col_chart2:
         st.subheader(f"🏙️ Top 10 Districts")
-        district_data = df.groupby("District")['Enrolments'].sum().reset_index().sort_values(by="Enrolments", ascending=False)
-        fig_bar = px.bar(district_data.head(10), x="District", y="Enrolments",
-                        color="Enrolments", color_continuous_scale="Oranges")
-        st.plotly_chart(fig_bar, use_container_width=True)
\ No newline at end of file
+        def top_districts_figure():
+            district_data = backend.aggregate({'Enrolments': ('sum', 'Enrolments')}, by=['District'],
+                                              order_by='Enrolments', limit=10, State=state_filter)
+            return px.bar(district_data, x="District", y="Enrolments",
+                          color="Enrolments", color_continuous_scale="Oranges")
+        render_chart(cached_figure("overview_top_districts", version, [selected_state], top_districts_figure),
+                        use_container_width=True)
+
+# --- 8. GROWTH SIGNALS (from each district's own Enrolments series) ---
+if 'Enrolments_MoM' in backend.columns:
+    st.divider()
+    st.subheader("📈 Growth Signals")
+    col_growth1, col_growth2 = st.columns(2)
+
+    with col_growth1:
+        st.markdown("#### Month-over-Month Growth")
+        def growth_figure():
+            growth = backend.aggregate({
+                'Avg MoM Growth (%)': ('mean', 'Enrolments_MoM'),
+                'Avg Volatility (%)': ('mean', 'Enrolments_Volatility')
+            }, by=['Date'], State=state_filter)
+            growth[['Avg MoM Growth (%)', 'Avg Volatility (%)']] *= 100
+            return px.line(growth, x="Date", y=['Avg MoM Growth (%)', 'Avg Volatility (%)'], markers=True,
+                           color_discrete_sequence=["#0088ff", "#ff6b6b"])
+        render_chart(cached_figure("overview_growth", version, [selected_state], growth_figure),
+                        use_container_width=True)
+
+    with col_growth2:
+        st.markdown("#### Rolling Average Enrolments per District")
+        def rolling_figure():
+            rolling = backend.aggregate({
+                'Monthly': ('mean', 'Enrolments'),
+                '3M Avg': ('mean', 'Enrolments_3M_Avg'),
+                '6M Avg': ('mean', 'Enrolments_6M_Avg'),
+                '12M Avg': ('mean', 'Enrolments_12M_Avg')
+            }, by=['Date'], State=state_filter)
+            return px.line(rolling, x="Date", y=['Monthly', '3M Avg', '6M Avg', '12M Avg'],
+                           color_discrete_sequence=["#cccccc", "#ffaa00", "#51cf66", "#764ba2"])
+        render_chart(cached_figure("overview_rolling", version, [selected_state], rolling_figure),
+                        use_container_width=True)
+
+    # Districts whose trend is rising fastest in the latest month
+    latest = backend.aggregate({'Latest': ('max', 'Date')}, State=state_filter).iloc[0]['Latest']
+    if pd.notna(latest):
+        st.markdown(f"#### 🚀 Fastest Rising Districts ({pd.Timestamp(latest):%b %Y})")
+        rising = backend.aggregate({
+            'Trend (enrolments/month)': ('mean', 'Enrolments_Trend'),
+            'MoM Growth': ('mean', 'Enrolments_MoM'),
+            'Volatility': ('mean', 'Enrolments_Volatility'),
+            '3M Avg': ('mean', 'Enrolments_3M_Avg')
+        }, by=['State', 'District'], start=latest, end=latest, order_by='Trend (enrolments/month)', limit=10,
+            State=state_filter)
+        st.dataframe(
+            rising,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Trend (enrolments/month)": st.column_config.NumberColumn(format="%.1f"),
+                "MoM Growth": st.column_config.NumberColumn(format="percent"),
+                "Volatility": st.column_config.NumberColumn(format="percent"),
+                "3M Avg": st.column_config.NumberColumn(format="%.0f")
+            }
+        )
+
+end_page("Overview", page_run)
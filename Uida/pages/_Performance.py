@@ -0,0 +1,77 @@
+"""
+Performance Page (hidden from the sidebar)
+p50/p95 stage timings per page from this server process's instrumentation buffer
+"""
+
+import streamlit as st
+from core.figure_cache import FIGURE_CACHE
+from core.instrumentation import (
+    MEMORY_SAMPLE_EVERY, PAGE_STAGE, RING_SIZE, STAGES, clear, overhead_ratio, records, stage_summary
+)
+from core.startup import COLD_STARTS, lazy_import
+
+px = lazy_import("plotly.express")
+
+st.set_page_config(page_title="Performance", page_icon="⏱️", layout="wide")
+
+st.title("⏱️ Dashboard Performance")
+st.caption(f"Last {RING_SIZE:,} timed stages in this server process. "
+           f"Peak memory is traced on one page run in {MEMORY_SAMPLE_EVERY} and is process-wide: "
+           f"it includes whatever other sessions allocated during that run.")
+
+runs = records()
+if runs.empty:
+    st.info("ℹ️ No page runs recorded yet. Open the dashboard pages, then refresh this one.")
+    st.stop()
+
+# --- SIDEBAR ---
+st.sidebar.header("⏱️ Window")
+pages = sorted(runs['Page'].fillna('(background)').unique())
+selected_pages = st.sidebar.multiselect("Pages", pages, default=pages)
+last_minutes = st.sidebar.slider("Last N Minutes", min_value=1, max_value=240, value=60)
+if st.sidebar.button("🗑️ Clear Buffer"):
+    clear()
+    st.rerun()
+
+runs = runs[runs['Time'] >= runs['Time'].max() - last_minutes * 60]
+runs = runs[runs['Page'].fillna('(background)').isin(selected_pages)]
+summary = stage_summary(runs)
+
+# --- KPIs ---
+page_runs = runs[runs['Stage'] == PAGE_STAGE]
+ratio = overhead_ratio(runs)
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("📄 Page Runs", f"{len(page_runs):,}")
+col2.metric("⏱️ Run p50", f"{page_runs['Seconds'].quantile(0.5) * 1000:.0f} ms" if len(page_runs) else "—")
+col3.metric("🐢 Run p95", f"{page_runs['Seconds'].quantile(0.95) * 1000:.0f} ms" if len(page_runs) else "—")
+col4.metric("🔬 Instrumentation Overhead", f"{ratio:.3%}" if ratio is not None else "—")
+
+# --- PER STAGE ---
+st.subheader("📊 p50 / p95 per Stage and Page")
+stages = summary[summary['Stage'].isin(STAGES)]
+if not stages.empty:
+    fig = px.bar(stages, x='Stage', y='p95_ms', color='Page', barmode='group',
+                 category_orders={'Stage': STAGES}, labels={'p95_ms': 'p95 (ms)'},
+                 hover_data=['p50_ms', 'Calls', 'Rows_p50', 'Process_Peak_MB'])
+    st.plotly_chart(fig, use_container_width=True)
+
+col_p50, col_p95 = st.columns(2)
+with col_p50:
+    st.markdown("**p50 (ms)**")
+    st.dataframe(summary.pivot(index='Page', columns='Stage', values='p50_ms').round(1), use_container_width=True)
+with col_p95:
+    st.markdown("**p95 (ms)**")
+    st.dataframe(summary.pivot(index='Page', columns='Stage', values='p95_ms').round(1), use_container_width=True)
+
+with st.expander("📋 Full Stage Summary", expanded=False):
+    st.dataframe(summary.round(2), use_container_width=True, hide_index=True)
+
+# --- PROCESS STATE ---
+st.subheader("🧊 Cold Starts and Caches")
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown("**First run per page (s)**")
+    st.dataframe({page: round(secs, 3) for page, secs in COLD_STARTS.items()}, use_container_width=True)
+with col2:
+    st.markdown("**Figure cache**")
+    st.dataframe(FIGURE_CACHE.stats(), use_container_width=True)
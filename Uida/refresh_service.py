@@ -0,0 +1,66 @@
+"""
+Background Data Refresh Service for UIDAI Dashboard
+Watches the raw input folder and publishes a new data version whenever it changes
+"""
+
+import argparse
+import json
+import os
+import time
+import traceback
+
+from core.data_loader import APP_DIR, current_version_dir
+from enchanced_data_processor import input_signature, run_pipeline
+
+POLL_SECONDS = 10
+
+
+def published_signature():
+    """Input signature the live version was built from (None if unknown)"""
+    version_dir = current_version_dir()
+    if version_dir is None:
+        return None
+    try:
+        with open(os.path.join(version_dir, "inputs.json"), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def watch(input_dir, interval=POLL_SECONDS, once=False):
+    """Poll input_dir; rebuild and publish when its raw files change and have stopped changing"""
+    last = published_signature()
+    print(f"👀 Watching {input_dir} every {interval}s")
+    while True:
+        signature = input_signature(input_dir)
+        if signature and signature != last:
+            # Wait one more poll so a file that is still being copied is not processed half-written
+            time.sleep(interval)
+            if input_signature(input_dir) == signature:
+                print("🔄 Raw input changed, running pipeline...")
+                started = time.time()
+                try:
+                    run_pipeline(input_dir)
+                    last = signature
+                    print(f"⏱️ Refresh took {time.time() - started:.1f}s")
+                except Exception:
+                    # Keep serving the previous version and retry on the next change
+                    traceback.print_exc()
+                    last = signature
+                continue
+        if once:
+            return
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild dashboard data when the raw input files change")
+    parser.add_argument("--input-dir", default=APP_DIR, help="Folder holding the master/forecast CSVs")
+    parser.add_argument("--interval", type=float, default=POLL_SECONDS, help="Seconds between checks")
+    parser.add_argument("--once", action="store_true", help="Refresh if needed, then exit")
+    args = parser.parse_args()
+    watch(args.input_dir, args.interval, args.once)
+
+
+if __name__ == "__main__":
+    main()